@@ -0,0 +1,157 @@
+"""asyncio front end of SSHConfig
+
+Files are read and stat'ed in threads and parsed in chunks of lines which
+yield to the event loop, so loading a large config does not stall the other
+coroutines.
+"""
+import asyncio
+import os
+from typing import Dict, List, Tuple
+
+from ssh_config.client import Host, SSHConfig, INCLUDE_MAX_DEPTH, build_host
+from ssh_config.client import iter_parse_config, stat_key, _included_files, _read_tree
+from ssh_config.patterns import compile_patterns
+
+# Lines parsed, or hosts built or searched, between two yields to the loop
+CHUNK_SIZE = 2000
+
+
+def _read_text(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+async def parse_file(path: str, chunk_size: int = CHUNK_SIZE) -> Tuple:
+    """Read path in a thread and parse it, yielding every chunk_size lines
+    Returns:
+        (stat_key, hosts, global_options): the entry of the file in sources
+    """
+    key = await asyncio.to_thread(stat_key, path)
+    data = await asyncio.to_thread(_read_text, path)
+    steps = iter_parse_config(data, path, chunk_size)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            hosts, global_options = stop.value
+            break
+        await asyncio.sleep(0)
+    for host in hosts:
+        host["path"] = path
+    return key, hosts, global_options
+
+
+async def read_config_tree(path: str, chunk_size: int = CHUNK_SIZE) -> Tuple[List, Dict, Dict]:
+    """Read the ssh config from path like `ssh_config.client.read_config_tree`.
+    The files of each Include level are read concurrently.
+    Args:
+        path (str): ssh config path
+        chunk_size (int): lines parsed between two yields
+    Returns:
+        (list, dict, dict): List of hosts, global Attributes and the sources
+    """
+    if not await asyncio.to_thread(os.path.exists, path):
+        raise Exception(f"No file exist, {path}")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    parsed = {}
+    level = [path]
+    seen = {path}
+    for _ in range(INCLUDE_MAX_DEPTH + 1):
+        results = await asyncio.gather(*(parse_file(item, chunk_size) for item in level))
+        parsed.update(zip(level, results))
+        next_level = []
+        for item in level:
+            for include in await asyncio.to_thread(_included_files, parsed[item], base_dir):
+                if include not in seen:
+                    seen.add(include)
+                    next_level.append(include)
+        if not next_level:
+            break
+        level = next_level
+    sources = {}
+    # Only merges the parsed files in Include order
+    hosts, global_options = await asyncio.to_thread(_read_tree, path, base_dir, sources, parsed, 0)
+    return hosts, global_options, sources
+
+
+class AsyncSSHConfig:
+    """SSHConfig with coroutines for the blocking or long operations.
+    The underlying SSHConfig is `config`, its quick methods can be used as is.
+    """
+
+    def __init__(self, config: SSHConfig, chunk_size: int = CHUNK_SIZE):
+        """
+        Args:
+            config (SSHConfig): loaded config
+            chunk_size (int): hosts built or searched between two yields
+        """
+        self.config = config
+        self.chunk_size = chunk_size
+
+    @classmethod
+    async def load(cls, path: str = None, chunk_size: int = CHUNK_SIZE):
+        """Load the ssh config without blocking the event loop
+        Args:
+            path (str or None): the path of ssh_config file, ~/.ssh/config by default
+            chunk_size (int): lines parsed and hosts built between two yields
+        Returns:
+            AsyncSSHConfig
+        """
+        config = SSHConfig(path, load=False)
+        raw_hosts, global_options, sources = await read_config_tree(
+            config.config_path, chunk_size
+        )
+        hosts = []
+        for index, raw in enumerate(raw_hosts, 1):
+            hosts.append(build_host(raw))
+            if index % chunk_size == 0:
+                await asyncio.sleep(0)
+        config._set_tree(tuple(hosts), global_options, sources)
+        return cls(config, chunk_size)
+
+    def __repr__(self) -> str:
+        return f"AsyncSSHConfig<Path:{self.config.config_path}>"
+
+    def __iter__(self):
+        return iter(self.config.hosts)
+
+    def __len__(self):
+        return len(self.config.hosts)
+
+    @property
+    def hosts(self) -> Tuple:
+        return self.config.hosts
+
+    def get(self, name: str) -> Host:
+        """Get Host with name, see `SSHConfig.get`"""
+        return self.config.get(name)
+
+    async def find(self, pattern: str = "*") -> List[Host]:
+        """Find the hosts with a name matching the pattern list
+        Args:
+            pattern (str): like web* or "*.corp,!db*"
+        Returns:
+            List[Host]
+        """
+        pattern_set = compile_patterns(pattern)
+        found = []
+        for index, host in enumerate(self.config.hosts, 1):
+            if pattern_set.matches_any(host.name.split()):
+                found.append(host)
+            if index % self.chunk_size == 0:
+                await asyncio.sleep(0)
+        return found
+
+    async def resolve(self, name: str, user: str = None, expand: bool = False) -> Dict:
+        """Compute the effective options of name in a thread, `Match exec`
+        runs commands. See `SSHConfig.resolve`.
+        """
+        return await asyncio.to_thread(self.config.resolve, name, user, expand)
+
+    async def write(self, filename: str = None):
+        """Write the config in a thread, see `SSHConfig.write`"""
+        await asyncio.to_thread(self.config.write, filename)
+
+    async def reload_if_changed(self):
+        """Reload the changed files in a thread, see `SSHConfig.reload_if_changed`"""
+        return await asyncio.to_thread(self.config.reload_if_changed)
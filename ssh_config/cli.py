@@ -3,10 +3,13 @@
 from __future__ import print_function, absolute_import
 import os
 import stat
+import csv
 import json
 import getpass
+import platform
 
 import socket
+import subprocess
 import sys
 
 # windows does not have termios...
@@ -22,9 +25,24 @@ import click
 
 from ssh_config.client import Host
 from ssh_config.client import SSHConfig
+from ssh_config.errors import JournalError, KeywordError, RouteError, SelectorError
+from ssh_config.fmt import config_files, format_files
 from ssh_config.keywords import Keywords
+from ssh_config.identity import IdentityManager, load_identity
+from ssh_config.journal import Journal
+from ssh_config.known_hosts import OK, check_host
+from ssh_config.lint import ERROR, lint
+from ssh_config.mux import MuxManager
+from ssh_config.patterns import compile_patterns
+from ssh_config import profile
+from ssh_config.render import ENGINES, FORMATS, BlockTemplate, load_records, render_file
+from ssh_config.shard import STRATEGIES, merge_config, shard_config
+from ssh_config.route import DEFAULT_MAX_DEPTH, RouteGraph, is_pattern
 from ssh_config.version import __version__
 
+# Commands which do not load the config file of --path
+STANDALONE_COMMANDS = ("gen", "diff", "lint", "render", "fmt", "history", "undo")
+
 
 def get_sshconfig(configpath, create=True):
     config_fullpath = os.path.expanduser(configpath)
@@ -32,12 +50,81 @@ def get_sshconfig(configpath, create=True):
     return sshconfig
 
 
-def write_config(config, msg, success):
+def read_text(path):
+    if not os.path.exists(path):
+        return ""
+    with open(path) as f:
+        return f.read()
+
+
+def write_config(config, msg, success, op, name):
+    """Write the config if confirmed and record the edit in its journal"""
     if click.confirm(msg, abort=False):
+        before = read_text(config.config_path)
         config.write()
+        Journal(config.config_path).record(op, name, before, read_text(config.config_path))
         click.secho(success, fg="green")
 
 
+select_option = click.option(
+    "-s", "--select", "selector", metavar="SELECTOR",
+    help="Only the hosts matching the selector, like 'db-* User=postgres Port!=22'",
+)
+
+
+def selected_hosts(config, selector):
+    """Hosts of config matching selector, all of them if it is None"""
+    if selector is None:
+        return list(config.hosts)
+    try:
+        return config.select(selector)
+    except SelectorError as e:
+        raise click.BadParameter(str(e), param_hint="--select")
+
+
+def target_hosts(config, name, selector):
+    """Hosts edited by a command, the host NAME or the hosts matching --select
+    Raises:
+        click.UsageError: neither NAME nor --select
+        SystemExit: no host to edit
+    """
+    if selector is not None:
+        hosts = selected_hosts(config, selector)
+        if not hosts:
+            click.secho(f"No hosts found, {selector}", fg="red")
+            raise SystemExit
+        return hosts
+    if name is None:
+        raise click.UsageError("NAME or --select is required")
+    if not config.exists(name):
+        click.secho(f"{name} does not exist", fg="red")
+        raise SystemExit
+    return [config.get(name)]
+
+
+def concrete_names(hosts):
+    """Names of the Host blocks without the wildcard patterns"""
+    names = []
+    for host in hosts:
+        if host.keyword == "Host":
+            names.extend(name for name in host.name.split() if not is_pattern(name))
+    return list(dict.fromkeys(names))
+
+
+def parse_attributes(attributes):
+    """Convert key=value arguments to the attributes of a host"""
+    attrs = {}
+    for attribute in attributes:
+        key, sep, value = attribute.partition("=")
+        if not sep:
+            raise click.BadParameter(f"{attribute}, use key=value", param_hint="attributes")
+        attrs[key] = value
+    try:
+        return Keywords.convert_block(attrs, strict=True)
+    except (KeywordError, TypeError, ValueError) as e:
+        raise click.BadParameter(str(e), param_hint="attributes")
+
+
 def posix_shell(chan):
     from paramiko.py3compat import u
     import select
@@ -74,18 +161,24 @@ def posix_shell(chan):
     "-f", "--path", default=os.path.expanduser("~/.ssh/config"), show_default=True
 )
 @click.option("--debug/--no-debug", default=False)
+@click.option("--profile", "profile_", is_flag=True,
+              help="Print the time spent and the counters on stderr")
 @click.version_option(__version__)
 @click.pass_context
-def cli(ctx, path, debug):
+def cli(ctx, path, debug, profile_):
     ctx.ensure_object(dict)
     ctx.obj["DEBUG"] = debug
     ctx.obj["path"] = path
+    if profile_:
+        profile.enable()
+        ctx.call_on_close(lambda: click.echo(profile.stats.text(), err=True))
 
+    if ctx.invoked_subcommand in STANDALONE_COMMANDS:
+        return
     if os.path.exists(path):
         ctx.obj["config"] = get_sshconfig(path)
     else:
-        if ctx.invoked_subcommand != "gen":
-            raise SystemExit(f"SSH config does not exists, {path}")
+        raise SystemExit(f"SSH config does not exists, {path}")
 
 
 @cli.command("attributes")
@@ -105,35 +198,29 @@ def interactive_shell(ctx, name):
         click.secho(f"{name} does not exist", fg="red")
         raise SystemExit
     host = config.get(name)
-    import paramiko
-
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    if host.IdentityFile:
-        identity_file = os.path.expanduser(host.IdentityFile)
+    mux = MuxManager(config)
+    command = mux.command(name)
+    if command:
+        # OpenSSH opens or reuses the master of the ControlPath
+        raise SystemExit(subprocess.call(command))
+    # Keys are loaded once per process, the pool connects with the same one
+    pkey = load_identity(mux.options(name).get("IdentityFile") or [])
 
     port = host.Port or 22
     click.echo(f"{host.HostName}, {host.User}, {port}, {host.IdentityFile}")
-    if identity_file is None:
+    if pkey is None:
         password = getpass.getpass(f"{host.User}@{name}'s password: ")
     else:
         password = None
     try:
-        ssh.connect(
-            host.HostName,
-            username=host.User,
-            port=port,
-            password=password,
-            key_filename=identity_file,
-            allow_agent=True,
-        )
+        ssh = mux.client(name, password=password)
         channel = ssh.get_transport().open_session()
         channel.get_pty()
         channel.invoke_shell()
         posix_shell(channel)
     except Exception as e:
         click.secho(f"Failed to connect to ssh, {e}", fg="red")
-    ssh.close()
+    mux.close()
 
 
 @cli.command("gen")
@@ -159,11 +246,12 @@ def gen_config(ctx):
 
 @cli.command("ls")
 @click.option("-l", is_flag=True, help="More detail")
+@select_option
 @click.pass_context
-def list_config(ctx, l):
+def list_config(ctx, l, selector):
     """Enumerate the configs"""
     config = ctx.obj["config"]
-    for host in config:
+    for host in selected_hosts(config, selector):
         if l:
             click.echo(f"{host.name:20s}{host.HostName}")
         else:
@@ -227,22 +315,31 @@ def add_config(ctx, name: str, attributes: list[str]):
     host = Host(name, attrs)
     config.add(host)
     click.echo(host)
-    write_config(config, "Information is correct ?", "Added!")
+    write_config(config, "Information is correct ?", "Added!", "add", name)
 
 
 @cli.command("update")
-@click.argument("name")
+@click.argument("name", required=False)
 @click.argument("attributes", nargs=-1, metavar="<key=value>")
+@select_option
 @click.pass_context
-def update_config(ctx, name: str, attributes: list[str]):
-    """Update the ssh Host config Attribute key=value format"""
+def update_config(ctx, name: str, attributes: list[str], selector):
+    """Update the ssh Host config Attribute key=value format, of the host NAME
+    or of the hosts matching --select
+    """
     config = ctx.obj["config"]
 
-    if not config.exists(name):
-        click.secho(f"{name} does not exist, use `update` instead of `add`", fg="red")
-        raise SystemExit
-
-    host: Host = config.get(name)
+    if selector is not None:
+        # Without NAME the first argument is an attribute
+        attrs = parse_attributes(((name,) if name else ()) + attributes)
+        hosts = target_hosts(config, None, selector)
+        for host in hosts:
+            config.update(host.name, attrs)
+            click.echo(config.get(host.name))
+        write_config(config, f"Update {len(hosts)} hosts ?", "Updated!", "update", selector)
+        return
+
+    host: Host = target_hosts(config, name, None)[0]
     print(type(host))
     click.echo(host)
     click.echo("=" * 25)
@@ -252,6 +349,8 @@ def update_config(ctx, name: str, attributes: list[str]):
             for attr in host.attributes():
                 if attr.lower() == key.lower():
                     config.update(name, {attr: value})
+                    # update swaps in a new Host, show the edited one
+                    host = config.get(name)
                     break
             else:
                 raise Exception(f"No exists Attribute: {key}")
@@ -260,7 +359,7 @@ def update_config(ctx, name: str, attributes: list[str]):
             raise SystemExit
         click.echo(host)
 
-    write_config(config, "Information is correct ?", "Updated!")
+    write_config(config, "Information is correct ?", "Updated!", "update", name)
 
 
 @cli.command("rename")
@@ -273,22 +372,380 @@ def rename_config(ctx, name, new_name):
     if not config.exists(name):
         click.secho(f"{name} does not exist", fg="red")
         raise SystemExit
-    config.get(name).set_name(new_name)
+    config.rename(name, new_name)
     click.echo(config.get(new_name))
-    write_config(config, "Information is correct ?", "Renamed!")
+    write_config(config, "Information is correct ?", "Renamed!", "rename",
+                 f"{name} -> {new_name}")
 
 
 @cli.command("remove")
+@click.argument("name", required=False)
+@select_option
+@click.pass_context
+def remove_config(ctx, name, selector):
+    """Remove the host NAME or the hosts matching --select"""
+    config = ctx.obj["config"]
+    hosts = target_hosts(config, name, selector)
+    for host in hosts:
+        click.echo(host)
+        config.remove(host.name)
+    if selector is not None:
+        write_config(config, f"Do you want to remove {len(hosts)} hosts ?", "Removed!",
+                     "remove", selector)
+    else:
+        write_config(config, "Do you want to remove ?", "Removed!", "remove", name)
+
+
+@cli.command("exec", context_settings={"ignore_unknown_options": True})
+@select_option
+@click.argument("command", nargs=-1, required=True, type=click.UNPROCESSED)
+@click.pass_context
+def exec_config(ctx, selector, command):
+    """Run COMMAND with ssh on each host matching --select, one after another.
+    Use --select '*' to run it on every host.
+    """
+    if selector is None:
+        raise click.UsageError("--select is required, use --select '*' for every host")
+    config = ctx.obj["config"]
+    failed = 0
+    for name in concrete_names(selected_hosts(config, selector)):
+        click.secho(f"==> {name}", fg="cyan")
+        process = subprocess.run(["ssh", "-F", config.config_path, name, *command])
+        if process.returncode != 0:
+            click.secho(f"{name} exited with {process.returncode}", fg="red")
+            failed += 1
+    if failed:
+        raise SystemExit(1)
+
+
+@cli.command("ping")
+@select_option
+@click.option("-c", "--count", type=click.IntRange(min=1), default=1, show_default=True)
+@click.pass_context
+def ping_config(ctx, selector, count):
+    """Ping the HostName of each host matching --select"""
+    config = ctx.obj["config"]
+    unreachable = 0
+    # Windows ping counts the echo requests with -n
+    count_flag = "-n" if platform.system() == "Windows" else "-c"
+    for name in concrete_names(selected_hosts(config, selector)):
+        hostname = config.resolve(name, expand=True).get("HostName", name)
+        process = subprocess.run(
+            ["ping", count_flag, str(count), hostname],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        alive = process.returncode == 0
+        unreachable += not alive
+        click.echo(f"{name:30s} {hostname:30s} {'ok' if alive else 'unreachable'}")
+    if unreachable:
+        raise SystemExit(1)
+
+
+@cli.command("export")
+@select_option
+@click.option("--format", "format_", type=click.Choice(["ansible", "csv"]), default="ansible",
+              show_default=True)
+@click.option("-c", "--columns", default="HostName,User,Port,IdentityFile", show_default=True,
+              help="Comma separated keywords of the csv columns")
+@click.option("-o", "--output", type=click.File("w"), default="-", show_default=True)
+@click.pass_context
+def export_config(ctx, selector, format_, columns, output):
+    """Export the hosts matching --select as an Ansible INI inventory or csv"""
+    config = ctx.obj["config"]
+    hosts = [host for host in selected_hosts(config, selector) if host.keyword == "Host"]
+    if format_ == "csv":
+        columns = [Keywords.canonical(column) or column for column in columns.split(",")]
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(["Name"] + columns)
+        for host in hosts:
+            attrs = host.persist_attributes()
+            values = [attrs.get(column, "") for column in columns]
+            writer.writerow([host.name] + [
+                ",".join(map(str, value)) if isinstance(value, list) else value
+                for value in values
+            ])
+        return
+    for name in concrete_names(hosts):
+        options = config.resolve(name)
+        line = f"{name} ansible_host={options.get('HostName', name)}"
+        if options.get("Port"):
+            line += f" ansible_port={options['Port']}"
+        if options.get("User"):
+            line += f" ansible_user={options['User']}"
+        if options.get("IdentityFile"):
+            line += f" ansible_ssh_private_key_file={options['IdentityFile'][0]}"
+        click.echo(line, file=output)
+
+
+@cli.command("history")
+@click.option("-n", "--limit", type=click.IntRange(min=1), help="Only the last LIMIT edits")
+@click.pass_context
+def history_command(ctx, limit):
+    """List the recorded edits of the config, the last one first"""
+    journal = Journal(os.path.expanduser(ctx.obj["path"]))
+    try:
+        edits = journal.history()
+    except JournalError as e:
+        raise SystemExit(str(e))
+    for edit in edits[:limit]:
+        state = "undone" if edit["undone"] else "final" if edit["checkpointed"] else ""
+        click.echo(f"{edit['id']:>5} {edit['time']} {edit['op']:8s} {edit['name']}"
+                   + (f" ({state})" if state else ""))
+
+
+@cli.command("undo")
+@click.argument("count", type=click.IntRange(min=1), default=1)
+@click.pass_context
+def undo_command(ctx, count):
+    """Undo the last COUNT edits of the config"""
+    journal = Journal(os.path.expanduser(ctx.obj["path"]))
+    if not click.confirm(f"Undo {count} edits of {journal.config_path} ?", abort=False):
+        return
+    try:
+        undone = journal.undo(count)
+    except JournalError as e:
+        raise SystemExit(str(e))
+    for edit in undone:
+        click.echo(f"Undone {edit['id']} {edit['op']} {edit['name']}")
+
+
+@cli.command("diff")
+@click.argument("old", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "format_", type=click.Choice(["text", "json"]), default="text",
+              show_default=True)
+def diff_config(old, new, format_):
+    """Show hosts added, removed and changed from OLD to NEW, exit 1 if any"""
+    changes = SSHConfig(old).diff(SSHConfig(new))
+    if format_ == "json":
+        click.echo(json.dumps(changes.asdict(), indent=2))
+    elif changes:
+        click.echo(changes.text())
+    if changes:
+        raise SystemExit(1)
+
+
+@cli.command("render")
+@click.argument("template", type=click.Path(exists=True, dir_okay=False))
+@click.argument("data", type=click.Path(allow_dash=True, dir_okay=False))
+@click.option("-o", "--output", default="-", show_default=True,
+              help="File to write, - for stdout")
+@click.option("--format", "format_", type=click.Choice(FORMATS),
+              help="Format of DATA, guessed from the extension by default")
+@click.option("--engine", type=click.Choice(ENGINES), default="jinja2", show_default=True)
+@click.option("--merge", type=click.Path(exists=True, dir_okay=False),
+              help="Existing config whose blocks are kept unless rendered by name")
+def render_config(template, data, output, format_, engine, merge):
+    """Render a Host block per record of DATA (JSONL or CSV) with TEMPLATE"""
+    block = BlockTemplate.from_file(template, engine)
+    try:
+        count = render_file(block, load_records(data, format_), output, merge)
+    except (KeyError, ValueError) as e:
+        raise click.ClickException(f"Failed to render {data}, {e}")
+    if output != "-":
+        click.echo(f"Rendered {count} hosts to {output}", err=True)
+
+
+@cli.command("shard")
+@click.option("--by", type=click.Choice(STRATEGIES), required=True,
+              help="Key of the fragments: domain labels, name prefix or hash")
+@click.argument("size", type=click.IntRange(min=1))
+@click.option("-o", "--output", type=click.Path(file_okay=False), required=True,
+              help="Directory of the top-level config and the shards/ fragments")
+@click.pass_context
+def shard_command(ctx, by, size, output):
+    """Split the hosts into fragments by SIZE domain labels, prefix characters or hashes"""
+    top_path, paths = shard_config(ctx.obj["config"], output, by, size)
+    for key, path in paths.items():
+        click.echo(f"{key:20s}{path}")
+    click.echo(f"Wrote {top_path} including {len(paths)} fragments")
+
+
+@cli.command("merge")
+@click.option("-o", "--output", default="-", show_default=True,
+              help="File to write, - for stdout")
+@click.pass_context
+def merge_command(ctx, output):
+    """Inline the Included files into a single config"""
+    data = merge_config(ctx.obj["config"])
+    if output == "-":
+        click.echo(data, nl=False)
+        return
+    with open(output, "w") as f:
+        f.write(data)
+
+
+@cli.command("fmt")
+@click.argument("files", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option("--check", is_flag=True, help="Only list the files to format, exit 1 if any")
+@click.option("--no-include", is_flag=True, help="Do not format the Included files")
+@click.option("--workers", type=click.IntRange(min=0),
+              help="Processes formatting the files, 0 for one per CPU")
+@click.pass_context
+def fmt_command(ctx, files, check, no_include, workers):
+    """Format FILES, by default the config and its Included files, canonically"""
+    paths = []
+    for path in files or (ctx.obj["path"],):
+        paths.extend(config_files(path, include=not no_include))
+    changed = format_files(list(dict.fromkeys(paths)), check, workers)
+    for path in changed:
+        click.echo(f"{'Would format' if check else 'Formatted'} {path}")
+    if check and changed:
+        raise SystemExit(1)
+
+
+@cli.command("lint")
+@click.option("--format", "format_", type=click.Choice(["text", "json"]), default="text",
+              show_default=True)
+@click.option("--strict", is_flag=True, help="Exit 1 on warnings as well")
+@click.pass_context
+def lint_config(ctx, format_, strict):
+    """Check the config for errors and shadowed settings, exit 1 on errors"""
+    path = os.path.expanduser(ctx.obj["path"])
+    if not os.path.exists(path):
+        raise SystemExit(f"SSH config does not exists, {path}")
+    diagnostics = lint(path)
+    if format_ == "json":
+        click.echo(json.dumps([d.asdict() for d in diagnostics], indent=2))
+    else:
+        for diagnostic in diagnostics:
+            click.echo(str(diagnostic))
+    if any(strict or d.severity == ERROR for d in diagnostics):
+        raise SystemExit(1)
+
+
+@cli.command("route")
 @click.argument("name")
+@click.option("--max-depth", type=int, default=DEFAULT_MAX_DEPTH, show_default=True)
 @click.pass_context
-def remove_config(ctx, name):
+def route_config(ctx, name, max_depth):
+    """Print the jump hosts to reach NAME"""
     config = ctx.obj["config"]
-    if not config.exists(name):
-        click.secho(f"{name} does not exist", fg="red")
-        raise SystemExit
-    click.echo(config.get(name))
-    config.remove(name)
-    write_config(config, "Do you want to remove ?", "Removed!")
+    try:
+        route = RouteGraph(config.hosts, max_depth).route(name)
+    except RouteError as e:
+        click.secho(f"{e}", fg="red")
+        raise SystemExit(1)
+    click.echo(" -> ".join(route))
+
+
+@cli.command("routes")
+@click.option("--format", "format_", type=click.Choice(["text", "json"]), default="text",
+              show_default=True)
+@click.option("--max-depth", type=int, default=DEFAULT_MAX_DEPTH, show_default=True)
+@click.pass_context
+def routes_config(ctx, format_, max_depth):
+    """Print the jump hosts of every host"""
+    config = ctx.obj["config"]
+    routes, errors = RouteGraph(config.hosts, max_depth).routes()
+    if format_ == "json":
+        click.echo(json.dumps({
+            "routes": {name: list(route) for name, route in routes.items()},
+            "errors": {name: str(error) for name, error in errors.items()},
+        }, indent=2))
+    else:
+        for name, route in routes.items():
+            click.echo(f"{name}: {' -> '.join(route)}")
+        for name, error in errors.items():
+            click.secho(f"{name}: {error}", fg="red", err=True)
+    if errors:
+        raise SystemExit(1)
+
+
+@cli.group("mux")
+def mux():
+    """Manage the ControlMaster connections"""
+
+
+def host_names(config, pattern):
+    """Names of the hosts matching pattern, without the wildcard blocks"""
+    pattern_set = compile_patterns(pattern)
+    names = []
+    for host in config:
+        names.extend(
+            name for name in pattern_set.filter(host.name.split()) if not is_pattern(name)
+        )
+    return list(dict.fromkeys(names))
+
+
+@mux.command("status")
+@click.argument("pattern", default="*")
+@click.pass_context
+def mux_status(ctx, pattern):
+    """Show the control sockets of hosts matching PATTERN"""
+    config = ctx.obj["config"]
+    for name, path, alive in MuxManager(config).status(host_names(config, pattern)):
+        state = "running" if alive else "stopped"
+        click.echo(f"{name:30s} {state:8s} {path}")
+
+
+@mux.command("stop")
+@click.argument("pattern")
+@click.pass_context
+def mux_stop(ctx, pattern):
+    """Stop the masters of hosts matching PATTERN"""
+    config = ctx.obj["config"]
+    manager = MuxManager(config)
+    for name in host_names(config, pattern):
+        if manager.stop(name):
+            click.echo(f"Stopped {name}")
+
+
+@cli.group("hostkeys")
+def hostkeys():
+    """Look up the host keys in the known_hosts files"""
+
+
+@hostkeys.command("check")
+@click.argument("pattern", default="*")
+@click.option("--format", "format_", type=click.Choice(["text", "json"]), default="text",
+              show_default=True)
+@click.pass_context
+def hostkeys_check(ctx, pattern, format_):
+    """Show whether hosts matching PATTERN have known keys, exit 1 if not"""
+    config = ctx.obj["config"]
+    results = {}
+    for name in host_names(config, pattern):
+        known_name, status, entries = check_host(config, name)
+        results[name] = {
+            "host": known_name,
+            "status": status,
+            "keys": [entry.keytype for entry in entries if entry.marker is None],
+        }
+    if format_ == "json":
+        click.echo(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            click.echo(f"{name:30s} {result['status']:8s} {result['host']} "
+                       f"{','.join(result['keys'])}".rstrip())
+    if any(result["status"] != OK for result in results.values()):
+        raise SystemExit(1)
+
+
+@cli.group("keys")
+def keys():
+    """Inspect the IdentityFile keys"""
+
+
+@keys.command("audit")
+@click.option("--format", "format_", type=click.Choice(["text", "json"]), default="text",
+              show_default=True)
+@click.pass_context
+def keys_audit(ctx, format_):
+    """Report missing, unreadable and too open IdentityFile keys, exit 1 if any"""
+    manager = IdentityManager(ctx.obj["config"])
+    problems = manager.audit()
+    identities = manager.identities()
+    if format_ == "json":
+        click.echo(json.dumps({
+            path: {"problem": problem, "hosts": identities[path]}
+            for path, problem in problems.items()
+        }, indent=2))
+    else:
+        for path, problem in problems.items():
+            click.echo(f"{problem:15s} {path} ({', '.join(identities[path])})")
+    if problems:
+        raise SystemExit(1)
 
 
 @cli.command("inventory")
@@ -311,7 +768,7 @@ def inventory(ctx, list_, host):
                 "ansible_ssh_user": host.User or os.getenv("USER"),
             }
             if host.IdentityFile:
-                hostvars["ansible_ssh_private_key_file"] = host.IdentityFile
+                hostvars["ansible_ssh_private_key_file"] = host.get_all("IdentityFile")[0]
             inventory_data["_meta"]["hostvars"][host.name] = hostvars
             inventory_data["ungrouped"]["hosts"].append(host.name)
         click.echo(json.dumps(inventory_data, indent=2))
@@ -1,13 +1,28 @@
 """SSH Config client
 """
-from ssh_config.errors import HostExistsError
+from ssh_config.diff import diff_hosts
+from ssh_config.errors import ConfigSyntaxError, HostExistsError
 from ssh_config.keywords import Keywords
+from ssh_config.match import MatchContext, compile_criteria, evaluate
+from ssh_config.match import needs_final_pass
+from ssh_config.patterns import PatternSet, split_patterns
+from ssh_config.profile import stats
+from ssh_config.tokens import expand_options
+from array import array
 from typing import List, Dict, Tuple
+import copy
+import glob
+import hashlib
 import os
 import re
 import logging
+import threading
 
 HOST_START = re.compile(r"^(host|match)[ =](?P<name>.*)", re.IGNORECASE)
+# Same nesting limit as OpenSSH's READCONF_MAX_DEPTH
+INCLUDE_MAX_DEPTH = 16
+# Fewer files are parsed faster than a process pool starts
+PARALLEL_MIN_FILES = 32
 
 
 logger = logging.getLogger("ssh_config.client")
@@ -22,11 +37,28 @@ def is_skip(line):
     return False
 
 
+def split_comment(line: str) -> Tuple[str, str, str]:
+    """Split the inline comment off a line, # starts a comment only after
+    whitespace and outside of quotes, like `LocalCommand echo a#b`
+    Returns:
+        (str, str, str): text, the spacing before the comment and the comment
+    """
+    quote = None
+    for index, char in enumerate(line):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "#" and index and line[index - 1].isspace():
+            text = line[:index].rstrip()
+            return text, line[len(text):index], line[index:]
+    return line, "", ""
+
+
 def remove_comment(line):
-    """Remove the comment on the line"""
-    if line.find("#") != -1:
-        line = line[: line.find("#")]
-    return line
+    """Remove the comment on the line, see `split_comment`"""
+    return split_comment(line)[0]
 
 
 def get_attribute(line):
@@ -37,26 +69,126 @@ def get_attribute(line):
     try:
         key, value = line.split(delim, 1)
     except ValueError as error:
-        raise Exception(f"Failed to split, {line}, delim: '{delim}'") from error
+        raise ConfigSyntaxError(f"Failed to split, {line}, delim: '{delim}'") from error
     return key.strip(), value.strip()
 
 
-def parse_config(data: str) -> Tuple[List, Dict]:
+class SourceMap:
+    """Positions of the directives of a file in parallel arrays
+
+    Host and Match lines are recorded with the key None, the attributes of
+    a block follow its line.
+    """
+
+    __slots__ = ["path", "lines", "columns", "keys"]
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.lines = array("I")
+        self.columns = array("I")
+        self.keys = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key, line: int, column: int) -> int:
+        """Record a directive, return its index"""
+        self.lines.append(line)
+        self.columns.append(column)
+        self.keys.append(key)
+        return len(self.keys) - 1
+
+    def position(self, index: int) -> Tuple[str, int, int]:
+        """Return (path, line, column) of the directive at index"""
+        return self.path, self.lines[index], self.columns[index]
+
+    def find(self, start: int, key: str):
+        """Return the index of the first directive key in the block at start
+        Returns:
+            int or None
+        """
+        keys = self.keys
+        for index in range(start + 1, len(keys)):
+            if keys[index] is None:
+                break
+            if keys[index] == key:
+                return index
+        return None
+
+
+def _add_include(attrs: Dict, value: str):
+    """Include accepts several paths, so repeated lines are joined"""
+    if attrs.get("Include"):
+        value = f"{attrs['Include']} {value}"
+    attrs["Include"] = value
+
+
+def _add_multiple(attrs: Dict, key: str, value: str):
+    """Repeated values of a multiple keyword are kept in a list"""
+    if key not in attrs:
+        attrs[key] = value
+    elif isinstance(attrs[key], list):
+        attrs[key].append(value)
+    else:
+        attrs[key] = [attrs[key], value]
+
+
+def _add_attribute(attrs: Dict, key: str, value: str, keyword):
+    """Add a parsed attribute line to the attributes of a block"""
+    if key.lower() == "include":
+        _add_include(attrs, value)
+    elif keyword is not None and keyword.multiple:
+        _add_multiple(attrs, keyword.key, value)
+    else:
+        attrs[key] = value
+
+
+def parse_config(data: str, path: str = None) -> Tuple[List, Dict]:
     """Parse the ssh config
     Args:
         data (str): SSH Config string
+        path (str or None): file of data, for the positions and errors
     Returns:
-        (list, dict): List of hosts and global Attirbutes
+        (list, dict): List of hosts and global Attirbutes, every host has
+            "source": (SourceMap, index of its Host line)
     Raises:
-        No File Exists
+        ConfigSyntaxError: malformed line
+    """
+    steps = iter_parse_config(data, path)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def iter_parse_config(data: str, path: str = None, chunk_size: int = None):
+    """Parse the ssh config like `parse_config`, pausing every chunk_size
+    lines, so that callers like an event loop can do other work meanwhile
+    Args:
+        data (str): SSH Config string
+        path (str or None): file of data, for the positions and errors
+        chunk_size (int or None): lines between the pauses, None to never pause
+    Yields:
+        None: at every pause
+    Returns:
+        (list, dict): as the value of StopIteration, see `parse_config`
+    Raises:
+        ConfigSyntaxError: malformed line
     """
     if not isinstance(data, str):
         raise ValueError(f"Required str type, not {type(data)}")
     hosts = []
     global_options = {}
     host = None
-    for line in data.splitlines():
+    source = SourceMap(path)
+    lines = data.splitlines()
+    stats.count("lines_parsed", len(lines))
+    for number, line in enumerate(lines, 1):
+        if chunk_size and number % chunk_size == 0:
+            yield
         # START: Preprocessing
+        column = len(line) - len(line.lstrip()) + 1
         line = line.strip()
         # Skip the whitespace
         if is_skip(line):
@@ -69,32 +201,214 @@ def parse_config(data: str) -> Tuple[List, Dict]:
             if host:
                 hosts.append(host)
             name = match.group("name")
-            host = {"host": name, "attrs": {}}
+            host = {
+                "host": name,
+                "attrs": {},
+                "keyword": match.group(1).capitalize(),
+                "source": (source, source.add(None, number, column)),
+            }
             continue
         # Parsing Attributes
-        key, value = get_attribute(line)
-        if host:
-            host["attrs"][key] = value
-        else:
-            global_options[key] = value
+        try:
+            key, value = get_attribute(line)
+        except ConfigSyntaxError as error:
+            raise ConfigSyntaxError(str(error), path, number, column) from error
+        keyword = Keywords.get(key)
+        source.add(keyword.key if keyword else key, number, column)
+        _add_attribute(host["attrs"] if host else global_options, key, value, keyword)
     if host:
         hosts.append(host)
     return hosts, global_options
 
 
-def read_config(path: str) -> Tuple[List, Dict]:
-    """Read the ssh config from path
+def stat_key(path: str):
+    """Return the (inode, mtime, size) of path to detect changes, None if missing"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _parse_file(path: str) -> Tuple:
+    """Parse a single file
+    Returns:
+        (stat_key, hosts, global_options): the entry of the file in sources
+    """
+    key = stat_key(path)
+    with stats.timer("parse"):
+        with open(path) as f:
+            hosts, global_options = parse_config(f.read(), path)
+    stats.count("files_parsed")
+    for host in hosts:
+        host["path"] = path
+    return key, hosts, global_options
+
+
+def _is_fresh(path: str, cached) -> bool:
+    """Check whether the cached entry of path is parsed and unchanged"""
+    return bool(cached) and cached[1] is not None and cached[0] == stat_key(path)
+
+
+def _read_file(path: str, sources: Dict, cache: Dict) -> Tuple[List, Dict]:
+    """Parse a single file, reusing the cached result if it did not change"""
+    cached = cache.get(path)
+    if _is_fresh(path, cached):
+        stats.count("file_cache_hits")
+    else:
+        stats.count("file_cache_misses")
+        cached = _parse_file(path)
+    sources[path] = cached
+    return cached[1], cached[2]
+
+
+def _included_files(entry: Tuple, base_dir: str) -> List[str]:
+    """Return the files Included by a parsed file in Include order
+    Args:
+        entry (tuple): (stat_key, hosts, global_options) of the file
+        base_dir (str): directory of the relative Include paths
+    """
+    _, hosts, global_options = entry
+    values = [global_options.get("Include")]
+    values.extend(host["attrs"].get("Include") for host in hosts)
+    files = []
+    for value in filter(None, values):
+        files.extend(_include_paths(value, base_dir, {}))
+    return files
+
+
+def _parse_parallel(path: str, base_dir: str, cache: Dict, workers: int) -> Dict:
+    """Parse the Include tree of path level by level, the files of a level
+    in a process pool. Levels with less than PARALLEL_MIN_FILES files to
+    parse are parsed in this process.
     Args:
         path (str): ssh config path
+        base_dir (str): directory of the relative Include paths
+        cache (dict): sources of a previous read
+        workers (int): processes, 0 for one per CPU
     Returns:
-        (list, dict): List of hosts and global Attirbutes
+        dict: cache with an entry for every file of the tree, to be merged
+            in Include order by `_read_tree`
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    processes = workers or os.cpu_count() or 1
+    parsed = dict(cache)
+    level = [path]
+    seen = {path}
+    executor = None
+    try:
+        for _ in range(INCLUDE_MAX_DEPTH + 1):
+            todo = [item for item in level if not _is_fresh(item, parsed.get(item))]
+            if len(todo) < PARALLEL_MIN_FILES:
+                results = map(_parse_file, todo)
+            else:
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=processes)
+                chunksize = max(1, len(todo) // (processes * 4))
+                results = executor.map(_parse_file, todo, chunksize=chunksize)
+            parsed.update(zip(todo, results))
+
+            next_level = []
+            for item in level:
+                for include in _included_files(parsed[item], base_dir):
+                    if include not in seen:
+                        seen.add(include)
+                        next_level.append(include)
+            if not next_level:
+                break
+            level = next_level
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return parsed
+
+
+def _include_paths(value: str, base_dir: str, sources: Dict) -> List[str]:
+    """Expand the paths of an Include directive"""
+    paths = []
+    for pattern in value.split():
+        pattern = os.path.expanduser(pattern)
+        if not os.path.isabs(pattern):
+            pattern = os.path.join(base_dir, pattern)
+        if glob.has_magic(pattern):
+            # Watch the directory as well, so new fragments are noticed
+            directory = os.path.dirname(pattern)
+            sources.setdefault(directory, (stat_key(directory), None, None))
+        paths.extend(
+            path for path in sorted(glob.glob(pattern)) if os.path.isfile(path)
+        )
+    return paths
+
+
+def _read_tree(path: str, base_dir: str, sources: Dict, cache: Dict,
+               depth: int) -> Tuple[List, Dict]:
+    """Read path and splice the hosts of its Included files in place"""
+    if depth > INCLUDE_MAX_DEPTH:
+        raise Exception(f"Include nested too deeply, {path}")
+    hosts, global_options = _read_file(path, sources, cache)
+    global_options = dict(global_options)
+    result = []
+    if global_options.get("Include"):
+        # Top level Include always precedes the first Host block
+        for include in _include_paths(global_options["Include"], base_dir, sources):
+            sub_hosts, sub_options = _read_tree(include, base_dir, sources, cache, depth + 1)
+            for key, value in sub_options.items():
+                global_options.setdefault(key, value)
+            result.extend(sub_hosts)
+    for host in hosts:
+        if not host["attrs"].get("Include"):
+            result.append(host)
+            continue
+        host = dict(host, attrs=dict(host["attrs"]))
+        result.append(host)
+        for include in _include_paths(host["attrs"]["Include"], base_dir, sources):
+            sub_hosts, sub_options = _read_tree(include, base_dir, sources, cache, depth + 1)
+            for key, value in sub_options.items():
+                host["attrs"].setdefault(key, value)
+            result.extend(sub_hosts)
+    return result, global_options
+
+
+def read_config_tree(path: str, cache: Dict = None,
+                     workers: int = None) -> Tuple[List, Dict, Dict]:
+    """Read the ssh config from path, following Include directives
+    Args:
+        path (str): ssh config path
+        cache (dict or None): sources of a previous read, files whose
+            stat did not change are not parsed again
+        workers (int or None): parse the Included files in that many
+            processes, 0 for one per CPU, None to parse in this process
+    Returns:
+        (list, dict, dict): List of hosts, global Attributes and the sources
+            read, {path: (stat_key, hosts, global_options)}
     Raises:
         No File Exists
     """
     if not os.path.exists(path):
         raise Exception(f"No file exist, {path}")
-    with open(path) as f:
-        hosts, global_options = parse_config(f.read())
+    sources = {}
+    base_dir = os.path.dirname(os.path.abspath(path))
+    cache = cache or {}
+    with stats.timer("read"):
+        if workers is not None:
+            cache = _parse_parallel(path, base_dir, cache, workers)
+        hosts, global_options = _read_tree(path, base_dir, sources, cache, 0)
+    return hosts, global_options, sources
+
+
+def read_config(path: str, workers: int = None) -> Tuple[List, Dict]:
+    """Read the ssh config from path
+    Args:
+        path (str): ssh config path
+        workers (int or None): processes parsing the Included files, see
+            `read_config_tree`
+    Returns:
+        (list, dict): List of hosts and global Attirbutes
+    Raises:
+        No File Exists
+    """
+    hosts, global_options, _ = read_config_tree(path, workers=workers)
     return hosts, global_options
 
 
@@ -110,17 +424,16 @@ def test_read_config():
 class Host:
     """Host object contains information of Host"""
 
-    def __init__(self, name, attrs):
+    keyword = "Host"
+
+    def __init__(self, name, attrs, path=None, source=None):
         self.set_name(name)
-        self.__attrs = {}
-        attrs = {key.upper(): value for key, value in attrs.items()}
-        for keyword in Keywords:
-            if attrs.get(keyword.key.upper()):
-                self.__attrs[keyword.key] = keyword.type_converter(
-                    attrs.get(keyword.key.upper()))
+        self.path = path
+        self.source = source
+        self.__attrs = Keywords.convert_block(attrs)
 
     def set_name(self, name):
-        """Set Host name
+        """Set Host name and compile its patterns
         Args:
             name (list or str)
         """
@@ -130,18 +443,30 @@ class Host:
             self.__name = name.split()
         else:
             raise TypeError
+        self.__fingerprint = None
+        self.patterns = PatternSet(split_patterns(self.__name)) if self.keyword == "Host" else None
 
     def __repr__(self):
         return f"Host<{self.name}>"
 
     def __str__(self):
-        data = f"Host {self.name}\n"
+        data = f"{self.keyword} {self.name}\n"
         for key, value in self.__attrs.items():
-            data += f"    {key} {value}\n"
+            for item in (value if isinstance(value, list) else [value]):
+                data += f"    {key} {item}\n"
         return data
 
     def __getattr__(self, key):
-        return self.__attrs.get(key)
+        """Return the attribute named key, None for a keyword not set
+        Raises:
+            AttributeError: key is neither set nor an ssh_config keyword
+        """
+        if not key.startswith("_"):
+            if key in self.__attrs:
+                return self.__attrs[key]
+            if key in Keywords:
+                return None
+        raise AttributeError(f"{type(self).__name__} has no attribute {key}")
 
     def attributes(self, exclude=None, include=None):
         """Get attributes
@@ -160,25 +485,50 @@ class Host:
         return self.__attrs
 
     def persist_attributes(self):
-        converted_attributes = {}
-        for keyword in Keywords:
-            if keyword.key in self.attributes():
-                converted_attributes[keyword.key] = keyword.persist_converter(
-                    self.get(keyword.key))
-        return converted_attributes
+        return Keywords.persist_block(self.__attrs)
 
     @property
     def name(self):
         """Return name"""
         return " ".join(self.__name)
 
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the name and the persisted attributes, equal for blocks
+        written out identically. Computed once until the host is modified.
+        """
+        if self.__fingerprint is None:
+            digest = hashlib.sha1(self.name.encode())
+            for key, value in sorted(self.persist_attributes().items()):
+                digest.update(f"\n{key} {value}".encode())
+            self.__fingerprint = digest.hexdigest()
+        return self.__fingerprint
+
     def update(self, attrs: Dict):
-        """Update the attributes"""
+        """Update the attributes, the attributes set to None are removed"""
         if isinstance(attrs, dict):
-            self.__attrs.update(attrs)
+            for key, value in attrs.items():
+                if value is None:
+                    self.__attrs.pop(key, None)
+                else:
+                    self.__attrs[key] = value
+            self.__fingerprint = None
             return self
         raise AttributeError
 
+    def copy(self):
+        """Return a copy with its own attributes, modifying it leaves this host
+        untouched
+        Returns:
+            Host
+        """
+        host = copy.copy(self)
+        host.__attrs = {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in self.__attrs.items()
+        }
+        return host
+
     def get(self, key, default=None):
         """Get value by key name
         Args:
@@ -192,6 +542,56 @@ class Host:
     def set(self, key: str, value):
         """Set attribute"""
         self.__attrs[key] = value
+        self.__fingerprint = None
+
+    def get_all(self, key) -> List:
+        """Get all values of a multiple keyword like IdentityFile
+        Args:
+            key (str)
+        Returns:
+            list: empty if the attribute is not set
+        """
+        value = self.__attrs.get(key)
+        if value is None:
+            return []
+        return list(value) if isinstance(value, list) else [value]
+
+    def append(self, key: str, value):
+        """Add a value to a multiple keyword like LocalForward"""
+        current = self.__attrs.get(key)
+        if current is None:
+            self.__attrs[key] = value
+        elif isinstance(current, list):
+            current.append(value)
+        else:
+            self.__attrs[key] = [current, value]
+        self.__fingerprint = None
+
+    def position(self, key: str = None):
+        """Return where the block or one of its attributes is in the file
+        Args:
+            key (str or None): attribute, None for the Host line
+        Returns:
+            (str, int, int) or None: (path, line, column), None if unknown
+        """
+        if self.source is None:
+            return None
+        source, index = self.source
+        if key is not None:
+            index = source.find(index, Keywords.canonical(key) or key)
+            if index is None:
+                return None
+        return source.position(index)
+
+    def expanded(self, name: str = None, user: str = None) -> Dict:
+        """Return the attributes with the tokens like %h and ${ENV} expanded
+        Args:
+            name (str or None): host name for %n, default the first name
+            user (str or None): remote user given on the command line
+        Returns:
+            dict
+        """
+        return expand_options(self.__attrs, name or self.__name[0], user)
 
     def command(self, cmd="ssh"):
         """Return the ssh command based on option"""
@@ -214,23 +614,174 @@ class Host:
         pass
 
 
+class Match(Host):
+    """Match block, the name is its criteria"""
+
+    keyword = "Match"
+
+    def set_name(self, name):
+        """Set the criteria and compile them
+        Args:
+            name (list or str)
+        """
+        super().set_name(name)
+        self.criteria = compile_criteria(self.name)
+
+    def __repr__(self):
+        return f"Match<{self.name}>"
+
+    def matches(self, context: MatchContext) -> bool:
+        """Evaluate the criteria in order
+        Args:
+            context (MatchContext)
+        Returns:
+            bool
+        """
+        return evaluate(self.criteria, context)
+
+
+def host_text(host: Host, exclude=()) -> str:
+    """Return the block of host as written in the config file
+    Args:
+        host (Host)
+        exclude (Sequence[str]): attributes left out
+    """
+    lines = [f"{host.keyword} {host.name}\n"]
+    for attr, value in host.persist_attributes().items():
+        if attr in exclude:
+            continue
+        for item in (value if isinstance(value, list) else [value]):
+            lines.append(f"{' '*4}{attr} {item}\n")
+    return "".join(lines)
+
+
+def global_text(global_options: Dict) -> str:
+    """Return the global options as written before the first block"""
+    lines = []
+    for key, value in global_options.items():
+        for item in (value if isinstance(value, list) else [value]):
+            lines.append(f"{key} {item}\n")
+    return "".join(lines)
+
+
+def build_host(raw: Dict) -> Host:
+    """Create Host or Match from a block of `parse_config`
+    Raises:
+        ConfigSyntaxError: malformed Match criteria or attribute value, at
+            the Host or Match line of the block
+    """
+    cls = Match if raw.get("keyword") == "Match" else Host
+    stats.count("hosts_built")
+    try:
+        return cls(raw["host"], raw["attrs"], raw.get("path"), raw.get("source"))
+    except ValueError as error:
+        position = ()
+        if raw.get("source") is not None:
+            source, index = raw["source"]
+            position = source.position(index)
+        raise ConfigSyntaxError(str(error), *position) from error
+
+
+def _apply_block(host: Host, options: Dict, multiple: Dict):
+    """Add the options not set yet, collect the values of multiple keywords"""
+    for key, value in host.attributes().items():
+        keyword = Keywords.get(key)
+        if keyword is not None and keyword.multiple:
+            multiple.setdefault(key, []).append(value)
+        else:
+            options.setdefault(key, value)
+
+
+def _apply_blocks(hosts, name: str, user: str, options: Dict, multiple: Dict, final: bool):
+    """Add the options of the matching blocks, which are not set yet"""
+    canonical = final and str(options.get("CanonicalizeHostname", "no")).lower() != "no"
+    for host in hosts:
+        if host.keyword == "Match":
+            hostname = options.get("HostName")
+            context = MatchContext(
+                name,
+                host=hostname.replace("%h", name) if hostname else name,
+                user=user or options.get("User"),
+                port=options.get("Port"),
+                canonical=canonical,
+                final=final,
+            )
+            if not host.matches(context):
+                continue
+        elif not host.patterns.matches(name):
+            continue
+        _apply_block(host, options, multiple)
+
+
+def resolve_options(hosts, global_options: Dict, name: str, user: str = None,
+                    expand: bool = False) -> Dict:
+    """Compute the effective options of name from the blocks in order,
+    see `SSHConfig.resolve`
+    Args:
+        hosts (Sequence[Host]): Host and Match blocks in file order, any
+            objects with `keyword`, `name`, `attributes()` and for Match
+            blocks `criteria` and `matches(context)`
+        global_options (dict): options before the first block
+        name (str): host name given on the command line
+        user (str or None): remote user given on the command line
+        expand (bool): expand the tokens like %h and ${ENV} of the values
+    Returns:
+        dict: the effective options
+    """
+    with stats.timer("resolve"):
+        options = {}
+        multiple = {}
+        _apply_block(Host(name, global_options), options, multiple)
+        _apply_blocks(hosts, name, user, options, multiple, final=False)
+        if any(host.keyword == "Match" and needs_final_pass(host.criteria) for host in hosts):
+            _apply_blocks(hosts, name, user, options, multiple, final=True)
+        for key, values in multiple.items():
+            merged = []
+            for value in values:
+                merged.extend(value if isinstance(value, list) else [value])
+            options[key] = list(dict.fromkeys(merged))
+        if expand:
+            return expand_options(options, name, user)
+        return options
+
+
 class SSHConfig:
-    """ssh_config file."""
+    """ssh_config file.
 
-    __slots__ = ["hosts", "raw", "config_path", "global_options"]
+    `hosts` is an immutable tuple, it is never modified in place. `add`,
+    `update`, `rename`, `remove` and `reload_if_changed` build a new tuple,
+    with copies of the modified hosts, and swap it in under a lock held only
+    by writers. Readers take `hosts` once and get a consistent view without
+    locking, while other threads keep writing.
+    """
+
+    __slots__ = [
+        "hosts", "raw", "config_path", "global_options", "workers", "_sources",
+        "_subscribers", "_lock", "_index",
+    ]
 
-    def __init__(self, path=None):
+    def __init__(self, path=None, workers=None, load=True):
         """Initialize an instance of a ssh_config file
         Args:
              path(str or None): the path of ssh_config file to manage
+             workers(int or None): processes parsing large Include trees,
+                0 for one per CPU, None to parse in this process
+             load(bool): read the file now, False leaves the config empty
         """
-        self.hosts = []
+        self.hosts = ()
+        self.global_options = {}
+        self.workers = workers
         self.raw = None
+        self._sources = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._index = None
         if path is None:
             self.config_path = os.path.expanduser("~/.ssh/config")
         else:
             self.config_path = path
-        self.load_hosts()
+        if load:
+            self.load_hosts()
 
     def __repr__(self) -> str:
         return f"SSHConfig<Path:{self.config_path}>"
@@ -261,10 +812,92 @@ class SSHConfig:
 
     def load_hosts(self):
         """Load the ssh_config file into `hosts` with config_path"""
-        hosts, global_options = read_config(self.config_path)
-        for host in hosts:
-            self.hosts.append(Host(host["host"], host["attrs"]))
-        self.global_options = global_options
+        hosts, global_options, sources = read_config_tree(
+            self.config_path, workers=self.workers
+        )
+        self._set_tree(tuple(build_host(host) for host in hosts), global_options, sources)
+
+    def _set_tree(self, hosts: Tuple, global_options: Dict, sources: Dict):
+        """Add the hosts read from the config files"""
+        with self._lock:
+            self._sources = sources
+            self.global_options = global_options
+            self.hosts = self.hosts + hosts
+
+    def changed(self) -> bool:
+        """Check whether the config file or one of its Included files changed
+        Returns:
+            bool
+        """
+        return any(
+            stat_key(path) != source[0] for path, source in self._sources.items()
+        )
+
+    def reload_if_changed(self):
+        """Reload the hosts if the config file or its Included files changed.
+        Only the changed files are parsed again, hosts of the other files are
+        kept as they are, including their unsaved modifications.
+        Returns:
+            ConfigChanges or None: changes of hosts, None if nothing changed
+        """
+        if not self.changed():
+            return None
+        with self._lock:
+            old_sources = self._sources
+            raw_hosts, global_options, sources = read_config_tree(
+                self.config_path, old_sources, self.workers
+            )
+            changed_paths = {
+                path for path, source in sources.items()
+                if path not in old_sources or old_sources[path][0] != source[0]
+            }
+            reusable = {}
+            for host in self.hosts:
+                if host.path and host.path not in changed_paths and host.Include is None:
+                    reusable.setdefault((host.path, host.name), []).append(host)
+            hosts = []
+            for raw in raw_hosts:
+                candidates = reusable.get((raw["path"], " ".join(raw["host"].split())))
+                if candidates:
+                    hosts.append(candidates.pop(0))
+                else:
+                    hosts.append(build_host(raw))
+
+            changes = diff_hosts(self.hosts, hosts)
+            self.global_options = global_options
+            self._sources = sources
+            self.hosts = tuple(hosts)
+        if changes:
+            for callback in self._subscribers:
+                callback(changes)
+        return changes
+
+    def subscribe(self, callback):
+        """Register a callback called with ConfigChanges on every reload
+        Args:
+            callback (callable): function accepting ConfigChanges
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Remove a callback registered with `subscribe`"""
+        self._subscribers.remove(callback)
+
+    def watch(self, callback=None, interval: float = 1.0):
+        """Poll the config files in a background thread and reload on change
+        Args:
+            callback (callable or None): subscribed to the changes if given
+            interval (float): seconds between polls
+        Returns:
+            Watcher: the started thread, call `stop()` to end watching
+        """
+        from ssh_config.watch import Watcher
+
+        if callback:
+            self.subscribe(callback)
+        watcher = Watcher(self, interval)
+        watcher.start()
+        return watcher
 
     def update(self, name: str, attrs: Dict):
         """Update the host with name and attributes
@@ -275,9 +908,9 @@ class SSHConfig:
         returns:
             None
         """
-        idx, host = self.get_host_with_index(name)
-        host.update(attrs)
-        self.hosts[idx] = host
+        with self._lock:
+            idx, host = self.get_host_with_index(name)
+            self._replace(idx, host.copy().update(attrs))
 
     def rename(self, name: str, new_name: str):
         """Rename the host name(pattern)
@@ -287,9 +920,19 @@ class SSHConfig:
         Returns:
             None
         """
-        idx, host = self.get_host_with_index(name)
-        host.setname(new_name)
-        self.hosts[idx] = host
+        with self._lock:
+            idx, host = self.get_host_with_index(name)
+            host = host.copy()
+            host.set_name(new_name)
+            self._replace(idx, host)
+
+    def _replace(self, idx: int, host: Host):
+        """Swap in a new hosts tuple with the host at idx replaced, the caller
+        holds the lock
+        """
+        hosts = list(self.hosts)
+        hosts[idx] = host
+        self.hosts = tuple(hosts)
 
     def exists(self, name: str):
         """Check exist the host with name
@@ -321,11 +964,12 @@ class SSHConfig:
         """
         if not isinstance(host, Host):
             raise TypeError
-        try:
-            self.get(host.name)
-        except NameError:
-            self.hosts.append(host)
-            return
+        with self._lock:
+            try:
+                self.get(host.name)
+            except NameError:
+                self.hosts = self.hosts + (host,)
+                return
         raise HostExistsError(host.name)
 
     def remove(self, name: str):
@@ -333,23 +977,172 @@ class SSHConfig:
         Args:
             name (str): host name
         """
-        _, host = self.get_host_with_index(name)
-        self.hosts.remove(host)
+        with self._lock:
+            idx, _ = self.get_host_with_index(name)
+            self.hosts = self.hosts[:idx] + self.hosts[idx + 1:]
 
     def write(self, filename=None):
         """Write the current ssh_config to self.config_path or given filename
         It changes the self.config_path, if the filename is given.
+        The global options, Include included, are written before the hosts.
+        Hosts of an Included file are written back to that file when one of
+        them was changed or removed, new hosts go to the config file.
+        Written to another filename, the config holds every host and global
+        option without Include, the Included files are left untouched.
         Args:
             filename (str): target filename to be written.
         """
-        if filename:
-            self.config_path = filename
+        with self._lock:
+            if filename and filename != self.config_path:
+                self.config_path = filename
+                # The copy no longer reads nor writes the Included files
+                self._sources = {}
+            sources, hosts = self._sources, self.hosts
+        if sources:
+            writes = self._source_writes(sources, hosts)
+        else:
+            options = {key: value for key, value in self.global_options.items()
+                       if key != "Include"}
+            writes = [(self.config_path, options, hosts)]
+        exclude = () if sources else ("Include",)
+        for path, options, file_hosts in writes:
+            data = global_text(options) + "".join(
+                host_text(host, exclude=exclude) for host in file_hosts
+            )
+            with stats.timer("write"):
+                with open(path, "w") as f:
+                    f.write(data)
+            if stats.enabled:
+                stats.count("bytes_written", len(data.encode()))
 
-        with open(self.config_path, "w") as f:
-            for host in self.hosts:
-                f.write(f"Host {host.name}\n")
-                for attr, value in host.persist_attributes().items():
-                    f.write(f"{' '*4}{attr} {value}\n")
+    def _source_writes(self, sources: Dict, hosts: Tuple) -> List[Tuple[str, Dict, List]]:
+        """Return (path, global options, hosts) of the config file and of the
+        Included files whose hosts changed
+        """
+        # The config file is read first, the rest are Included files
+        paths = list(sources)
+        files = {path: [] for path in paths[1:] if sources[path][1] is not None}
+        top = []
+        for host in hosts:
+            files[host.path].append(host) if host.path in files else top.append(host)
+        writes = [(self.config_path, self._own_options(sources, files), top)]
+        for path, file_hosts in files.items():
+            _, raw_hosts, file_options = sources[path]
+            original = [build_host(raw).fingerprint for raw in raw_hosts]
+            if [host.fingerprint for host in file_hosts] != original:
+                writes.append((path, file_options, file_hosts))
+        return writes
+
+    def _own_options(self, sources: Dict, files: Dict) -> Dict:
+        """Global options of the config file, without the ones merged from
+        the Included files and not changed since
+        """
+        own = next(iter(sources.values()))[2]
+        included = {}
+        for path in files:
+            for key, value in sources[path][2].items():
+                included.setdefault(key, value)
+        return {
+            key: value for key, value in self.global_options.items()
+            if key in own or included.get(key) != value
+        }
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash over the global options and the fingerprints of the hosts in
+        order, equal fingerprints mean nothing changed.
+        """
+        digest = hashlib.sha1()
+        for key, value in sorted(self.global_options.items()):
+            digest.update(f"{key} {value}\n".encode())
+        for host in self.hosts:
+            digest.update(host.fingerprint.encode())
+        return digest.hexdigest()
+
+    def resolve(self, name: str, user: str = None, expand: bool = False) -> Dict:
+        """Compute the effective options for connecting to name like ssh does.
+        The first obtained value of an option is used, the Host patterns are
+        matched against name and the Match criteria are evaluated in order.
+        If a Match block uses `canonical` or `final`, the blocks are
+        evaluated once more as the final pass. Multiple keywords like
+        IdentityFile collect the values of all blocks into a list.
+        Args:
+            name (str): host name given on the command line
+            user (str or None): remote user given on the command line
+            expand (bool): expand the tokens like %h and ${ENV} of the values
+        Returns:
+            dict: the effective options
+        """
+        return resolve_options(self.hosts, self.global_options, name, user, expand)
+
+    @staticmethod
+    def stats(reset: bool = False) -> Dict:
+        """Return the counters and timers collected since enabling them with
+        `ssh_config.profile.enable()`. They are process wide, not per config.
+        Args:
+            reset (bool): clear them after reading
+        Returns:
+            dict: see `ssh_config.profile.Stats.snapshot`
+        """
+        snapshot = stats.snapshot()
+        if reset:
+            stats.reset()
+        return snapshot
+
+    def freeze(self):
+        """Return an immutable, hashable snapshot of the global options and hosts
+        Returns:
+            FrozenConfig
+        """
+        from ssh_config.frozen import FrozenConfig
+
+        return FrozenConfig.from_config(self)
+
+    def write_snapshot(self, path: str):
+        """Write a binary snapshot of the hosts for worker processes, which
+        map it with `ssh_config.shared.SharedConfig` instead of parsing
+        Args:
+            path (str): snapshot file
+        """
+        from ssh_config.shared import write_snapshot
+
+        write_snapshot(self, path)
+
+    def host_index(self):
+        """Return the index of the hosts by name and attribute value used by
+        selectors, built again when the hosts were changed
+        Returns:
+            HostIndex
+        """
+        hosts = self.hosts
+        index = self._index
+        if index is None or index.hosts is not hosts:
+            from ssh_config.selector import HostIndex
+
+            index = self._index = HostIndex(hosts)
+        return index
+
+    def select(self, selector: str) -> List[Host]:
+        """Return the hosts matching a selector like "db-* User=postgres Port!=22"
+        Args:
+            selector (str): see `ssh_config.selector`
+        Returns:
+            List[Host]: in file order
+        Raises:
+            SelectorError: invalid selector
+        """
+        from ssh_config.selector import compile_selector
+
+        return compile_selector(selector).select(self)
+
+    def diff(self, other):
+        """Compare the hosts with the other config by name
+        Args:
+            other (SSHConfig): the new config
+        Returns:
+            ConfigChanges: hosts added, removed and changed in other
+        """
+        return diff_hosts(self.hosts, other.hosts)
 
     def asdict(self):
         """Return dict from list of hosts
@@ -370,6 +1163,7 @@ class SSHConfig:
         Returns:
             idx, Host
         """
+        stats.count("lookups")
         for idx, host in enumerate(self.hosts):
             if name == host.name:
                 return idx, host
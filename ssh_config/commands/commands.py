@@ -2,12 +2,13 @@ import os
 import stat
 import csv
 import platform
-import fnmatch
 
 from subprocess import run
 from jinja2 import Template
 
 from ..client import Host
+from ..keywords import Keywords
+from ..patterns import select_hosts
 
 from .base import BaseCommand
 from .base import ArgumentRequired
@@ -120,7 +121,9 @@ class Add(BaseCommand):
 
     def pre_command(self):
         template = Template(self.__doc__, trim_blocks=True, lstrip_blocks=True)
-        self.__doc__ = template.render(attrs=Host.attrs)
+        self.__doc__ = template.render(
+            attrs=[(keyword.key, keyword.type_converter) for keyword in Keywords]
+        )
 
     def execute(self):
         hostname = self.options.get("<HOSTNAME>")
@@ -173,7 +176,9 @@ class Update(BaseCommand):
 
     def pre_command(self):
         template = Template(self.__doc__, trim_blocks=True, lstrip_blocks=True)
-        self.__doc__ = template.render(attrs=Host.attrs)
+        self.__doc__ = template.render(
+            attrs=[(keyword.key, keyword.type_converter) for keyword in Keywords]
+        )
 
     def execute(self):
         verbose = self.options.get("--verbose")
@@ -192,9 +197,7 @@ class Update(BaseCommand):
         use_pattern = self.options.get("--use-pattern")
         if use_pattern:
             """use-pattern is only accept update, not add"""
-            hosts = [
-                host for host in self.config if fnmatch.fnmatch(host.name, hostname)
-            ]
+            hosts = select_hosts(self.config, hostname)
             if hosts:
                 for host in hosts:
                     self.config.update(host.name, attrs)
@@ -443,9 +446,11 @@ class Bastion(BaseCommand):
             if host is None:
                 print(f"{server} does not exist")
                 return
-            if host.get("ProxyCommand", None):
+            proxy = host.get("ProxyJump", None) or host.get("ProxyCommand", None)
+            if proxy:
                 if not self.options.get("--yes") and not input_is_yes(
-                    f"{host} has ProxyComamnd, {host.ProxyComamnd}", default="n"
+                    f"{host} has proxy, {proxy}", default="n"
                 ):
                     return
-            host.set("ProxyCommand", "ProxyCommand ssh -q -A bastion -W %h:%p")
+            # ProxyCommand would win over ProxyJump
+            self.config.update(server, {"ProxyJump": bastion, "ProxyCommand": None})
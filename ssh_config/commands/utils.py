@@ -1,6 +1,7 @@
-import fnmatch
 from texttable import Texttable
 
+from ..patterns import compile_patterns
+
 
 def input_is_yes(msg, default="n"):
     if default not in ["y", "n"]:
@@ -26,13 +27,14 @@ def coroutine(func):
 
 @coroutine
 def grep(pattern, target):
+    pattern_set = compile_patterns(pattern) if pattern is not None else None
     while True:
         host = yield
         name = host.name
         hostname = str(host.HostName)
         if (
             pattern is None
-            or fnmatch.fnmatch(host.name, pattern)
+            or pattern_set.matches_any(name.split())
             or pattern in name
             or pattern in hostname
         ):
@@ -51,8 +53,8 @@ def ssh_format_print():
     while True:
         host = yield
         line = "ssh"
-        if host.IdentityFile:
-            line += f" -i {host.IdentityFile}"
+        for identity_file in host.get_all("IdentityFile"):
+            line += f" -i {identity_file}"
         if host.Port and host.Port != 22:
             line += f" -p {host.Port}"
         line += f" {host.User}@{host.HostName}"
@@ -0,0 +1,126 @@
+"""Differences between two lists of hosts
+"""
+from typing import Dict, List
+
+
+class ConfigChanges:
+    """Added, removed and changed hosts between two configs
+
+    Hosts are compared by name, the first block wins when a name is repeated.
+    """
+
+    __slots__ = ["added", "removed", "changed"]
+
+    def __init__(self, added: List, removed: List, changed: List):
+        """
+        Args:
+            added (List[Host]): hosts only in the new config
+            removed (List[Host]): hosts only in the old config
+            changed (List[Tuple[Host, Host]]): (old, new) hosts with the same name
+        """
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return (
+            f"ConfigChanges<added:{len(self.added)}, removed:{len(self.removed)}, "
+            f"changed:{len(self.changed)}>"
+        )
+
+    def asdict(self) -> Dict:
+        """Return dict of the changes with the attribute changes of changed hosts
+        Returns:
+            {"added": [name], "removed": [name], "changed": {name: {attr: [old, new]}},
+             "locations": {name: "path:line:column"}}
+        """
+        locations = {}
+        for host in self.added + self.removed + [new for _, new in self.changed]:
+            position = host.position()
+            if position:
+                locations[host.name] = format_position(position)
+        return {
+            "added": [host.name for host in self.added],
+            "removed": [host.name for host in self.removed],
+            "changed": {
+                new.name: {
+                    key: list(values)
+                    for key, values in attribute_changes(old, new).items()
+                }
+                for old, new in self.changed
+            },
+            "locations": locations,
+        }
+
+    def text(self) -> str:
+        """Return the changes in a human readable format"""
+        lines = [f"+ {host.keyword} {host.name}{location(host)}" for host in self.added]
+        lines.extend(f"- {host.keyword} {host.name}{location(host)}" for host in self.removed)
+        for old, new in self.changed:
+            lines.append(f"~ {new.keyword} {new.name}{location(new)}")
+            for key, (before, after) in attribute_changes(old, new).items():
+                where = location(new, key) if after is not None else location(old, key)
+                lines.append(f"{' '*4}{key}: {before} -> {after}{where}")
+        return "\n".join(lines)
+
+
+def format_position(position) -> str:
+    """Return 'path:line:column' of a (path, line, column) position"""
+    path, line, column = position
+    return f"{path or '<string>'}:{line}:{column}"
+
+
+def location(host, key: str = None) -> str:
+    """Return ' (path:line:column)' of the host or its attribute, '' if unknown"""
+    position = host.position(key)
+    return f" ({format_position(position)})" if position else ""
+
+
+def attribute_changes(old, new) -> Dict:
+    """Compare the persisted attributes of two hosts
+    Args:
+        old (Host)
+        new (Host)
+    Returns:
+        dict: {attribute: (old value, new value)}, None for a missing value
+    """
+    before = old.persist_attributes()
+    after = new.persist_attributes()
+    changes = {}
+    for key in list(before) + [key for key in after if key not in before]:
+        if before.get(key) != after.get(key):
+            changes[key] = (before.get(key), after.get(key))
+    return changes
+
+
+def index_hosts(hosts) -> dict:
+    """Map the name to the first host with the name"""
+    index = {}
+    for host in hosts:
+        index.setdefault(host.name, host)
+    return index
+
+
+def diff_hosts(old_hosts, new_hosts) -> ConfigChanges:
+    """Compare two lists of hosts by name
+    Args:
+        old_hosts (List[Host])
+        new_hosts (List[Host])
+    Returns:
+        ConfigChanges
+    """
+    old = index_hosts(old_hosts)
+    new = index_hosts(new_hosts)
+    added = [host for name, host in new.items() if name not in old]
+    removed = [host for name, host in old.items() if name not in new]
+    changed = []
+    for name, host in new.items():
+        previous = old.get(name)
+        if previous is None or previous is host:
+            continue
+        if previous.fingerprint != host.fingerprint:
+            changed.append((previous, host))
+    return ConfigChanges(added, removed, changed)
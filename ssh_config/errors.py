@@ -24,3 +24,44 @@ class HostExistsError(Exception):
 class KeywordError(Exception):
     def __init__(self, keyword):
         super().__init__(f"Not supported keyword: {keyword}")
+
+
+class RouteError(Exception):
+    """Exception"""
+
+
+class RouteCycleError(RouteError):
+    def __init__(self, cycle):
+        super().__init__(f"Jump hosts form a cycle: {' -> '.join(cycle)}")
+        self.cycle = cycle
+
+
+class RouteDepthError(RouteError):
+    def __init__(self, name, max_depth):
+        super().__init__(f"Route to {name} exceeds {max_depth} jumps")
+        self.name = name
+        self.max_depth = max_depth
+
+
+class ConfigSyntaxError(Exception):
+    """Exception"""
+
+    def __init__(self, message, path=None, line=None, column=None):
+        location = ":".join(str(part) for part in (path or "<string>", line, column) if part)
+        super().__init__(f"{location}: {message}" if line else message)
+        self.message = message
+        self.path = path
+        self.line = line
+        self.column = column
+
+    def __reduce__(self):
+        # Keep the position when raised in a parsing worker process
+        return (type(self), (self.message, self.path, self.line, self.column))
+
+
+class SelectorError(ValueError):
+    """Exception"""
+
+
+class JournalError(Exception):
+    """Exception"""
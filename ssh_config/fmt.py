@@ -0,0 +1,159 @@
+"""Canonical formatting of ssh config files
+
+- keywords are spelled like in the Keywords table, `key=value` becomes `key value`
+- Host and Match lines start at column 1, Host patterns are separated by
+  single spaces, the attributes of the blocks are indented by 4 spaces
+- the attributes of a block are ordered like the Keywords table, repeated
+  keywords keep their order and no attribute moves across an Include
+- comments stay attached to the line below them, inline comments to their line
+- blocks are separated by one blank line, other blank lines are dropped
+
+Formatting is idempotent, formatting the output again gives the same text.
+"""
+from typing import List, Tuple
+import re
+
+from ssh_config.client import HOST_START, PARALLEL_MIN_FILES, read_config_tree, split_comment
+from ssh_config.keywords import Keywords
+
+INDENT = " " * 4
+# The keyword is separated from the value by whitespace or one =
+ATTRIBUTE = re.compile(r"(?P<key>[^\s=]+)(?:\s*=\s*|\s+)(?P<value>.*)")
+# Unknown keywords go after the known ones
+UNKNOWN = len(Keywords) + 1
+
+
+def _split_attribute(line: str) -> Tuple[str, str]:
+    """Split `key value` or `key=value` like ssh, the value may contain ="""
+    match = ATTRIBUTE.match(line)
+    if match is None:
+        return line, ""
+    return match.group("key"), match.group("value").strip()
+
+
+def _format_attribute(line: str) -> Tuple[int, str]:
+    """Return the order and the canonical text of an attribute line"""
+    text, spacing, comment = split_comment(line)
+    key, value = _split_attribute(text)
+    keyword = Keywords.get(key)
+    if keyword is not None:
+        key = keyword.key
+    order = keyword.index if keyword is not None else UNKNOWN
+    formatted = f"{key} {value}" if value else key
+    if comment:
+        formatted = f"{formatted}{spacing}{comment}"
+    return order, formatted
+
+
+def _sort_attributes(entries: List[Tuple[int, str, List[str]]]) -> List[Tuple]:
+    """Order the attributes like Keywords, not across Include lines"""
+    result = []
+    segment = []
+    for entry in entries:
+        if entry[0] == Keywords["Include"].index:
+            result.extend(sorted(segment, key=lambda item: item[0]))
+            result.append(entry)
+            segment = []
+        else:
+            segment.append(entry)
+    result.extend(sorted(segment, key=lambda item: item[0]))
+    return result
+
+
+def format_config(data: str) -> str:
+    """Return the canonical text of an ssh config
+    Args:
+        data (str): ssh config
+    Returns:
+        str
+    """
+    # Sections: the global options, then one per Host or Match block, as
+    # (header lines, [(order, attribute, comments above)])
+    sections = [([], [])]
+    comments = []
+    for raw in data.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            comments.append(line)
+            continue
+        match = HOST_START.match(line)
+        if match:
+            keyword = match.group(1).capitalize()
+            name, spacing, comment = split_comment(match.group("name"))
+            # Match exec commands keep their spacing
+            name = " ".join(name.split()) if keyword == "Host" else name.strip()
+            header = f"{keyword} {name}"
+            if comment:
+                header = f"{header}{spacing}{comment}"
+            sections.append((comments + [header], []))
+            comments = []
+            continue
+        order, attribute = _format_attribute(line)
+        sections[-1][1].append((order, attribute, comments))
+        comments = []
+
+    blocks = []
+    for index, (header, attributes) in enumerate(sections):
+        indent = INDENT if index else ""
+        lines = list(header)
+        for _, attribute, above in _sort_attributes(attributes):
+            lines.extend(f"{indent}{comment}" for comment in above)
+            lines.append(f"{indent}{attribute}")
+        if lines:
+            blocks.append("\n".join(lines))
+    if comments:
+        blocks.append("\n".join(comments))
+    return "\n\n".join(blocks) + "\n" if blocks else ""
+
+
+def format_file(path: str, check: bool = False) -> bool:
+    """Format the file in place if its text is not canonical
+    Args:
+        path (str)
+        check (bool): only report, do not write
+    Returns:
+        bool: True if the file is not canonical
+    """
+    with open(path) as f:
+        data = f.read()
+    formatted = format_config(data)
+    if formatted == data:
+        return False
+    if not check:
+        with open(path, "w") as f:
+            f.write(formatted)
+    return True
+
+
+def config_files(path: str, include: bool = True) -> List[str]:
+    """Return path and the files it Includes
+    Args:
+        path (str): ssh config
+        include (bool): follow the Include directives
+    """
+    if not include:
+        return [path]
+    _, _, sources = read_config_tree(path)
+    return [source_path for source_path, source in sources.items() if source[1] is not None]
+
+
+def format_files(paths: List[str], check: bool = False, workers: int = None) -> List[str]:
+    """Format the files, in a process pool when there are many of them
+    Args:
+        paths (List[str])
+        check (bool): only report, do not write
+        workers (int or None): processes, 0 for one per CPU, None to use the
+            pool only for PARALLEL_MIN_FILES files or more
+    Returns:
+        List[str]: the files which were, or with check would be, changed
+    """
+    if workers is None and len(paths) < PARALLEL_MIN_FILES:
+        changed = [format_file(path, check) for path in paths]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers or None) as executor:
+            changed = list(executor.map(format_file, paths, [check] * len(paths)))
+    return [path for path, is_changed in zip(paths, changed) if is_changed]
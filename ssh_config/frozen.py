@@ -0,0 +1,205 @@
+"""Immutable, hashable snapshots of hosts and configs
+
+`SSHConfig.freeze()` returns a FrozenConfig. Attributes are stored as tuples
+of (key, value) pairs with list values turned into tuples, so snapshots can
+be used as `lru_cache` keys, put in sets and pickled to other processes.
+"""
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from ssh_config.client import Host, Match, resolve_options
+from ssh_config.keywords import Keywords
+from ssh_config.profile import stats
+
+
+def freeze_value(value):
+    """Return value with lists turned into tuples"""
+    if isinstance(value, list):
+        return tuple(freeze_value(item) for item in value)
+    return value
+
+
+def thaw_value(value):
+    """Return value with tuples turned back into lists"""
+    if isinstance(value, tuple):
+        return [thaw_value(item) for item in value]
+    return value
+
+
+def freeze_attributes(attrs: Dict) -> Tuple:
+    """Return ((key, value), ...) of the attributes in their order"""
+    return tuple((key, freeze_value(value)) for key, value in attrs.items())
+
+
+class Frozen:
+    """Base of the read-only snapshots, the hash is computed once"""
+
+    __slots__ = ["_hash"]
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def _fields(self) -> Tuple:
+        raise NotImplementedError
+
+    def _init(self, *values):
+        for key, value in zip(self.__slots__, values):
+            object.__setattr__(self, key, value)
+        object.__setattr__(self, "_hash", hash((type(self).__name__,) + values))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._hash == other._hash and self._fields() == other._fields()
+
+    def __reduce__(self):
+        # The hash of str is salted per process, it is computed again on load
+        return (type(self), self._fields())
+
+
+class FrozenHost(Frozen):
+    """Read-only Host or Match block"""
+
+    __slots__ = ["keyword", "name", "attrs", "path"]
+
+    def __init__(self, keyword: str, name: str, attrs: Tuple, path: str = None):
+        """
+        Args:
+            keyword (str): Host or Match
+            name (str): patterns or criteria
+            attrs (tuple): ((key, value), ...) with tuple values
+            path (str or None): file of the block
+        """
+        self._init(keyword, name, attrs, path)
+
+    @classmethod
+    def from_host(cls, host: Host):
+        """Freeze a Host or Match"""
+        return cls(host.keyword, host.name, freeze_attributes(host.attributes()), host.path)
+
+    def _fields(self) -> Tuple:
+        return (self.keyword, self.name, self.attrs, self.path)
+
+    def __repr__(self):
+        return f"Frozen{self.keyword}<{self.name}>"
+
+    def __getattr__(self, key):
+        """Return the attribute named key, None for a keyword not set
+        Raises:
+            AttributeError: key is neither set nor an ssh_config keyword
+        """
+        if not key.startswith("_"):
+            for name, value in self.attrs:
+                if name == key:
+                    return value
+            if key in Keywords:
+                return None
+        raise AttributeError(f"{type(self).__name__} has no attribute {key}")
+
+    def get(self, key: str, default=None):
+        """Get value by key name"""
+        for name, value in self.attrs:
+            if name == key:
+                return value
+        return default
+
+    def get_all(self, key: str) -> Tuple:
+        """Get all values of a multiple keyword like IdentityFile"""
+        value = self.get(key)
+        if value is None:
+            return ()
+        return value if isinstance(value, tuple) else (value,)
+
+    def attributes(self) -> Dict:
+        """Return the attributes as a new dict with list values"""
+        return {key: thaw_value(value) for key, value in self.attrs}
+
+    def thaw(self) -> Host:
+        """Return a mutable Host or Match with the same attributes"""
+        cls = Match if self.keyword == "Match" else Host
+        host = cls(self.name, {}, self.path)
+        host.update(self.attributes())
+        return host
+
+
+class FrozenConfig(Frozen):
+    """Read-only snapshot of an SSHConfig"""
+
+    __slots__ = ["config_path", "global_options", "hosts"]
+
+    def __init__(self, config_path: str, global_options: Tuple, hosts: Tuple):
+        """
+        Args:
+            config_path (str): path of the config file
+            global_options (tuple): ((key, value), ...) before the first block
+            hosts (Tuple[FrozenHost])
+        """
+        self._init(config_path, global_options, hosts)
+
+    @classmethod
+    def from_config(cls, config):
+        """Freeze an SSHConfig, its hosts are read once"""
+        return cls(
+            config.config_path,
+            freeze_attributes(config.global_options),
+            tuple(FrozenHost.from_host(host) for host in config.hosts),
+        )
+
+    def _fields(self) -> Tuple:
+        return (self.config_path, self.global_options, self.hosts)
+
+    def __repr__(self):
+        return f"FrozenConfig<Path:{self.config_path}>"
+
+    def __iter__(self):
+        return iter(self.hosts)
+
+    def __len__(self):
+        return len(self.hosts)
+
+    def get(self, name: str) -> FrozenHost:
+        """Get the first host with name
+        Raises:
+            NameError: no host with name
+        """
+        for host in self.hosts:
+            if host.name == name:
+                return host
+        raise NameError(f"No name found in config, {name}")
+
+    def names(self) -> List[str]:
+        """Return the names of the Host blocks"""
+        return [host.name for host in self.hosts if host.keyword == "Host"]
+
+    def resolve(self, name: str, user: str = None, expand: bool = False) -> Dict:
+        """Effective options of name, see `SSHConfig.resolve`. The results
+        are memoized per snapshot.
+        Returns:
+            dict: a new dict on every call
+        """
+        options = _resolve(self, name, user, expand)
+        return {key: thaw_value(value) for key, value in options}
+
+
+@lru_cache(maxsize=16)
+@lru_cache(maxsize=8)
+def _thaw(config: FrozenConfig) -> Tuple:
+    """Hosts of config, kept with their compiled patterns across resolves"""
+    return tuple(host.thaw() for host in config.hosts)
+
+
+@lru_cache(maxsize=1024)
+def _resolve(config: FrozenConfig, name: str, user: str, expand: bool) -> Tuple:
+    global_options = {key: thaw_value(value) for key, value in config.global_options}
+    options = resolve_options(_thaw(config), global_options, name, user, expand)
+    return freeze_attributes(options)
+
+
+stats.register_cache("frozen_thaw", _thaw)
+stats.register_cache("frozen_resolve", _resolve)
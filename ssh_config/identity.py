@@ -0,0 +1,136 @@
+"""IdentityFile inventory and key loading cache
+"""
+from typing import Dict, List
+import os
+import stat
+import logging
+
+from ssh_config.client import Match, stat_key
+from ssh_config.profile import stats
+from ssh_config.route import is_pattern
+from ssh_config.tokens import expand_value, TokenValues
+
+logger = logging.getLogger("ssh_config.identity")
+
+MISSING = "missing"
+UNREADABLE = "unreadable"
+WORLD_READABLE = "world-readable"
+GROUP_READABLE = "group-readable"
+
+_keys = {}
+
+
+def load_key(path: str, passphrase: str = None):
+    """Load a private key once per process, again only if the file changed
+    Args:
+        path (str): expanded path of the key
+        passphrase (str or None)
+    Returns:
+        paramiko.PKey
+    Raises:
+        paramiko.SSHException: the key can not be loaded
+        OSError: the file can not be read
+    """
+    import paramiko
+
+    key = (path, stat_key(path))
+    cached = _keys.get(key)
+    if cached is not None:
+        stats.count("key_cache_hits")
+        return cached
+    stats.count("key_cache_misses")
+    pkey = paramiko.PKey.from_path(path, passphrase)
+    _keys[key] = pkey
+    return pkey
+
+
+def load_identity(paths: List[str]):
+    """Return the first key of paths which can be loaded without a passphrase
+    Args:
+        paths (List[str]): expanded IdentityFile values
+    Returns:
+        paramiko.PKey or None
+    """
+    import paramiko
+
+    for path in paths:
+        try:
+            return load_key(path)
+        except (OSError, paramiko.SSHException) as e:
+            logger.debug("Failed to load %s: %s", path, e)
+    return None
+
+
+def check_identity(path: str):
+    """Check the key file like ssh does before using it
+    Returns:
+        str or None: MISSING, UNREADABLE, WORLD_READABLE, GROUP_READABLE or None
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return MISSING
+    except OSError:
+        return UNREADABLE
+    if not os.access(path, os.R_OK):
+        return UNREADABLE
+    if st.st_mode & (stat.S_IROTH | stat.S_IWOTH | stat.S_IXOTH):
+        return WORLD_READABLE
+    if st.st_mode & (stat.S_IRGRP | stat.S_IWGRP | stat.S_IXGRP):
+        return GROUP_READABLE
+    return None
+
+
+class IdentityManager:
+    """IdentityFile paths of all hosts, deduplicated"""
+
+    def __init__(self, config):
+        """
+        Args:
+            config (SSHConfig)
+        """
+        self.config = config
+        self._identities = None
+
+    def identities(self) -> Dict[str, List[str]]:
+        """Return the expanded IdentityFile paths and the names using them
+        Returns:
+            dict: {path: [name of block]}
+        """
+        if self._identities is not None:
+            return self._identities
+        identities = {}
+        for host in self.config.hosts:
+            names = [] if isinstance(host, Match) else [
+                name for name in host.name.split() if not is_pattern(name)
+            ]
+            for value in host.get_all("IdentityFile"):
+                if value.lower() == "none":
+                    continue
+                if "%" in value or "${" in value:
+                    # Tokens depend on the host, expand them for every name
+                    paths = [
+                        expand_value("IdentityFile", value, TokenValues.from_options(
+                            self.config.resolve(name), name))
+                        for name in names
+                    ]
+                else:
+                    paths = [os.path.expanduser(value)]
+                for path in paths:
+                    users = identities.setdefault(path, [])
+                    if host.name not in users:
+                        users.append(host.name)
+        self._identities = identities
+        return identities
+
+    def audit(self) -> Dict[str, str]:
+        """Check every IdentityFile once
+        Returns:
+            dict: {path: problem} of the paths having a problem
+        """
+        problems = {}
+        for path in self.identities():
+            problem = check_identity(path)
+            if problem:
+                problems[path] = problem
+        return problems
@@ -0,0 +1,216 @@
+"""Append-only journal of the edits of a config file, to audit and undo them
+
+The journal is a JSON lines file next to the config, `config.journal`. It
+starts with a checkpoint, the text of the config before the first recorded
+edit. Every edit then only stores the lines it replaced, so the text after
+any edit is rebuilt by replaying the edits onto the checkpoint, one entry per
+line (the second one is wrapped here):
+
+    {"id": 1, "time": "...", "op": "checkpoint", "text": "Host a\\n...", "sha": "..."}
+    {"id": 2, "time": "...", "op": "update", "name": "a",
+     "patch": [[1, 2, ["    Port 22\\n"]]], "sha": "..."}
+    {"id": 3, "time": "...", "op": "undo", "undone": [2], "sha": "..."}
+
+Undo appends an entry marking the last edits undone and writes the text
+replayed without them. If the config was changed outside of the journal, a
+new checkpoint is taken before the next edit and the edits before it cannot
+be undone anymore.
+"""
+from typing import Dict, List, Tuple
+import difflib
+import hashlib
+import json
+import os
+import time
+
+from ssh_config.errors import JournalError
+
+SUFFIX = ".journal"
+CHECKPOINT = "checkpoint"
+UNDO = "undo"
+OPERATIONS = ("add", "update", "rename", "remove")
+
+
+def text_sha(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def make_patch(before: str, after: str) -> List:
+    """Return the replaced line ranges turning before into after
+    Returns:
+        list: [[start, end, [new lines]]] over the lines of before
+    """
+    old = before.splitlines(keepends=True)
+    new = after.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    return [
+        [i1, i2, new[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"
+    ]
+
+
+def apply_patch(text: str, patch: List) -> str:
+    """Apply a patch of `make_patch` to text"""
+    lines = text.splitlines(keepends=True)
+    for start, end, replacement in reversed(patch):
+        lines[start:end] = replacement
+    return "".join(lines)
+
+
+class Journal:
+    """Journal of a config file, see the module documentation"""
+
+    __slots__ = ["config_path", "path"]
+
+    def __init__(self, config_path: str, path: str = None):
+        """
+        Args:
+            config_path (str): the config file
+            path (str or None): the journal, config_path + .journal by default
+        """
+        self.config_path = config_path
+        self.path = path or f"{config_path}{SUFFIX}"
+
+    def __repr__(self):
+        return f"Journal<{self.path}>"
+
+    def entries(self) -> List[Dict]:
+        """Return every entry in order, empty without a journal
+        Raises:
+            JournalError: a line is not valid JSON
+        """
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError as e:
+                    raise JournalError(f"{self.path}:{number}: {e}")
+        return entries
+
+    def _append(self, entries: List[Dict], entry: Dict) -> Dict:
+        entry = {"id": entries[-1]["id"] + 1 if entries else 1,
+                 "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **entry}
+        # The journal holds the config, keep it private like the config
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        entries.append(entry)
+        return entry
+
+    @staticmethod
+    def _live(entries: List[Dict]) -> Tuple[Dict, List[Dict]]:
+        """Return the last checkpoint and the edits after it not undone"""
+        checkpoint = None
+        live = []
+        for entry in entries:
+            if entry["op"] == CHECKPOINT:
+                checkpoint, live = entry, []
+            elif entry["op"] == UNDO:
+                undone = set(entry["undone"])
+                live = [edit for edit in live if edit["id"] not in undone]
+            elif entry["op"] in OPERATIONS:
+                live.append(entry)
+            else:
+                raise JournalError(f"Unknown operation {entry['op']} of entry {entry['id']}")
+        return checkpoint, live
+
+    @staticmethod
+    def _replay(checkpoint: Dict, live: List[Dict], skip: int) -> str:
+        text = checkpoint["text"]
+        for entry in live[:len(live) - skip]:
+            text = apply_patch(text, entry["patch"])
+        return text
+
+    def record(self, op: str, name: str, before: str, after: str) -> Dict:
+        """Append an edit of the config
+        Args:
+            op (str): add, update, rename or remove
+            name (str): the edited hosts, for the history
+            before (str): text of the config before the edit
+            after (str): text written
+        Returns:
+            dict: the entry
+        """
+        if op not in OPERATIONS:
+            raise JournalError(f"Unknown operation, {op}")
+        entries = self.entries()
+        if not entries or entries[-1]["sha"] != text_sha(before):
+            # First edit or the config was changed outside of the journal
+            self._append(entries, {"op": CHECKPOINT, "text": before, "sha": text_sha(before)})
+        return self._append(entries, {
+            "op": op, "name": name, "patch": make_patch(before, after), "sha": text_sha(after),
+        })
+
+    def history(self) -> List[Dict]:
+        """Return the edits with an `undone` flag, the last one first.
+        Edits before the last checkpoint cannot be undone anymore and are
+        flagged `checkpointed`.
+        """
+        entries = self.entries()
+        if not entries:
+            return []
+        checkpoint, live = self._live(entries)
+        live_ids = {entry["id"] for entry in live}
+        edits = []
+        for entry in entries:
+            if entry["op"] in (CHECKPOINT, UNDO):
+                continue
+            edits.append({
+                "id": entry["id"], "time": entry["time"], "op": entry["op"],
+                "name": entry["name"],
+                "undone": entry["id"] not in live_ids and entry["id"] > checkpoint["id"],
+                "checkpointed": entry["id"] < checkpoint["id"],
+            })
+        return edits[::-1]
+
+    def replay(self, skip: int = 0) -> str:
+        """Rebuild the text of the config from the last checkpoint
+        Args:
+            skip (int): leave out the last skip edits
+        Returns:
+            str
+        Raises:
+            JournalError: empty journal or not as many edits to skip
+        """
+        checkpoint, live = self._live(self.entries())
+        if checkpoint is None:
+            raise JournalError(f"No journal of {self.config_path}")
+        if skip > len(live):
+            raise JournalError(f"Only {len(live)} edits can be undone")
+        return self._replay(checkpoint, live, skip)
+
+    def undo(self, count: int = 1) -> List[Dict]:
+        """Undo the last count edits and write the config
+        Args:
+            count (int)
+        Returns:
+            List[dict]: the undone edits, the last one first
+        Raises:
+            JournalError: the config was changed outside of the journal or
+                there are fewer edits to undo
+        """
+        entries = self.entries()
+        checkpoint, live = self._live(entries)
+        if checkpoint is None:
+            raise JournalError(f"No journal of {self.config_path}")
+        if count < 1 or count > len(live):
+            raise JournalError(f"Only {len(live)} edits can be undone")
+        current = ""
+        if os.path.exists(self.config_path):
+            with open(self.config_path) as f:
+                current = f.read()
+        if text_sha(current) != entries[-1]["sha"]:
+            raise JournalError(f"{self.config_path} was changed outside of the journal")
+        text = self._replay(checkpoint, live, count)
+        with open(self.config_path, "w") as f:
+            f.write(text)
+        undone = live[len(live) - count:]
+        self._append(entries, {
+            "op": UNDO, "undone": [entry["id"] for entry in undone], "sha": text_sha(text),
+        })
+        return undone[::-1]
@@ -1,3 +1,13 @@
+from typing import Dict, List
+import re
+
+from ssh_config.errors import KeywordError
+from ssh_config.profile import stats
+
+TIME_INTERVAL = re.compile(r"(\d+)([smhdw]?)", re.IGNORECASE)
+TIME_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
 def yes_or_no(value: str) -> bool:
     """Convert 'yes' or 'no' to True or False
     Args:
@@ -28,112 +38,321 @@ def yes_or_no_str(value: bool) -> str:
     return "yes" if value else "no"
 
 
+def time_interval(value: str) -> int:
+    """Convert sshd time format like '90', '10m' or '1h30m' to seconds
+    Args:
+        value (str): time interval
+    Returns:
+        int: seconds
+    Raises:
+        ValueError: the value is not a time interval
+    """
+    value = str(value).strip()
+    if not value:
+        raise ValueError("Time interval is required")
+    seconds = 0
+    pos = 0
+    for match in TIME_INTERVAL.finditer(value):
+        if match.start() != pos:
+            break
+        seconds += int(match.group(1)) * TIME_UNITS[match.group(2).lower()]
+        pos = match.end()
+    if pos != len(value):
+        raise ValueError(f"Invalid time interval: {value}")
+    return seconds
+
+
+def choice(*choices):
+    """Validator accepting one of choices, case-insensitive"""
+    allowed = {value.lower() for value in choices}
+
+    def validate(value):
+        if str(value).lower() not in allowed:
+            raise ValueError(f"Expected one of {', '.join(choices)}, not {value}")
+
+    return validate
+
+
+def int_range(minimum: int = None, maximum: int = None):
+    """Validator accepting integers between minimum and maximum"""
+
+    def validate(value):
+        number = int(value)
+        if (minimum is not None and number < minimum) or (
+                maximum is not None and number > maximum):
+            raise ValueError(f"Expected {minimum} to {maximum}, not {value}")
+
+    return validate
+
+
+def time_or_choice(*choices):
+    """Validator accepting a time interval or one of choices"""
+    check_choice = choice(*choices)
+
+    def validate(value):
+        try:
+            check_choice(value)
+        except ValueError:
+            time_interval(value)
+
+    return validate
+
+
+YES_NO = choice("yes", "no")
+COUNT = int_range(0)
+
+
 class Keyword:
     def __init__(self, key: str, type_converter: type,
-                 persist_converter: type = None) -> None:
+                 persist_converter: type = None, validator=None,
+                 multiple: bool = False) -> None:
         self.key = key
         self.type_converter = type_converter
         self.persist_converter = persist_converter if persist_converter else type_converter
+        self.validator = validator
+        # Repeated directives add values instead of keeping one, like IdentityFile
+        self.multiple = multiple
+        # Position in the KeywordRegistry, used to order the attributes
+        self.index = None
+
+    def __repr__(self):
+        return f"Keyword<{self.key}>"
+
+    def validate(self, value):
+        """Check the raw value
+        Raises:
+            ValueError: the value is invalid for the keyword
+        """
+        for item in (value if isinstance(value, list) else [value]):
+            if self.validator:
+                self.validator(item)
+                continue
+            try:
+                self.type_converter(item)
+            except TypeError as error:
+                raise ValueError(str(error)) from error
+
+    def convert(self, value):
+        """Convert the raw value, each value of a list for multiple keyword"""
+        if isinstance(value, list):
+            return [self.type_converter(item) for item in value]
+        return self.type_converter(value)
+
+    def persist(self, value):
+        """Convert the value to its persisted format"""
+        if isinstance(value, list):
+            return [self.persist_converter(item) for item in value]
+        return self.persist_converter(value)
+
+
+class KeywordRegistry:
+    """Keywords looked up by case-insensitive name
+
+    Iterates the unique keywords in definition order.
+    """
 
+    def __init__(self, keywords: List[Keyword]):
+        """
+        Args:
+            keywords (List[Keyword]): keywords, later duplicates are ignored
+        """
+        self._keywords = {}
+        self._unique = []
+        for keyword in keywords:
+            lower = keyword.key.lower()
+            if lower in self._keywords:
+                continue
+            keyword.index = len(self._unique)
+            self._keywords[lower] = keyword
+            self._unique.append(keyword)
 
-Keywords = [
+    def __iter__(self):
+        return iter(self._unique)
+
+    def __len__(self):
+        return len(self._unique)
+
+    def __contains__(self, name):
+        return isinstance(name, str) and name.lower() in self._keywords
+
+    def __getitem__(self, name: str) -> Keyword:
+        keyword = self.get(name)
+        if keyword is None:
+            raise KeywordError(name)
+        return keyword
+
+    def get(self, name: str, default=None):
+        """Get Keyword by name, case-insensitive"""
+        return self._keywords.get(name.lower(), default)
+
+    def canonical(self, name: str):
+        """Return the key of the keyword named name, None if unknown"""
+        keyword = self._keywords.get(name.lower())
+        return keyword.key if keyword else None
+
+    def convert_block(self, raw_attrs: Dict, strict: bool = False,
+                      validate: bool = False) -> Dict:
+        """Convert the raw attributes of a host at once
+        Args:
+            raw_attrs (dict): {name: value}, empty values are skipped, the
+                value of a multiple keyword can be a list
+            strict (bool): raise KeywordError for unknown keywords
+            validate (bool): run the validators of the keywords
+        Returns:
+            dict: {key: converted value} in the keyword order
+        Raises:
+            KeywordError: unknown keyword with strict
+            ValueError: invalid value with validate
+        """
+        found = {}
+        get = self._keywords.get
+        for name, value in raw_attrs.items():
+            if not value:
+                continue
+            keyword = get(name.lower())
+            if keyword is None:
+                if strict:
+                    raise KeywordError(name)
+                continue
+            if validate:
+                keyword.validate(value)
+            found[keyword.index] = value
+        unique = self._unique
+        converted = {}
+        for index in sorted(found):
+            keyword = unique[index]
+            converted[keyword.key] = keyword.convert(found[index])
+        stats.count("keyword_conversions", len(converted))
+        return converted
+
+    def persist_block(self, attrs: Dict) -> Dict:
+        """Convert the attributes of a host to their persisted format
+        Args:
+            attrs (dict): {name: value}, unknown keywords are skipped
+        Returns:
+            dict: {key: persisted value} in the keyword order
+        """
+        found = {}
+        get = self._keywords.get
+        for name, value in attrs.items():
+            keyword = get(name.lower())
+            if keyword is not None:
+                found[keyword.index] = value
+        unique = self._unique
+        persisted = {}
+        for index in sorted(found):
+            keyword = unique[index]
+            persisted[keyword.key] = keyword.persist(found[index])
+        return persisted
+
+
+KEYWORDS = [
     Keyword("HostName", str),
     Keyword("User", str),
-    Keyword("Port", int),
-    Keyword("IdentityFile", str),
-    Keyword("AddressFamily", str),  # any, inet, inet6
-    Keyword("BatchMode", str),
+    Keyword("Port", int, validator=int_range(1, 65535)),
+    Keyword("IdentityFile", str, multiple=True),
+    Keyword("AddressFamily", str, validator=choice("any", "inet", "inet6")),  # any, inet, inet6
+    Keyword("BatchMode", str, validator=YES_NO),
     Keyword("BindAddress", str),
-    Keyword("ChallengeResponseAuthentication", str),  # yes, no
-    Keyword("CheckHostIP", str),  # yes, no
+    Keyword("ChallengeResponseAuthentication", str, validator=YES_NO),  # yes, no
+    Keyword("CheckHostIP", str, validator=YES_NO),  # yes, no
     Keyword("Cipher", str),
     Keyword("Ciphers", str),
-    Keyword("ClearAllForwardings", str),  # yes, no
-    Keyword("Compression", str),  # yes, no
-    Keyword("CompressionLevel", int),  # 1 to 9
-    Keyword("ConnectionAttempts", int),  # default: 1
-    Keyword("ConnectTimeout", int),
-    Keyword("ControlMaster", str),  # yes, no
+    Keyword("ClearAllForwardings", str, validator=YES_NO),  # yes, no
+    Keyword("Compression", str, validator=YES_NO),  # yes, no
+    Keyword("CompressionLevel", int, validator=int_range(1, 9)),  # 1 to 9
+    Keyword("ConnectionAttempts", int, validator=COUNT),  # default: 1
+    Keyword("ConnectTimeout", int, validator=COUNT),
+    Keyword("ControlMaster", str, validator=choice("yes", "no", "ask", "auto", "autoask")),
     Keyword("ControlPath", str),
-    Keyword("DynamicForward", str),  # [bind_address:]port, [bind_adderss/]port
-    Keyword("EnableSSHKeysign", str),  # yes, no
+    Keyword("DynamicForward", str, multiple=True),  # [bind_address:]port, [bind_adderss/]port
+    Keyword("EnableSSHKeysign", str, validator=YES_NO),  # yes, no
     Keyword("EscapeChar", str),  # default: '~'
-    Keyword("ExitOnForwardFailure", str),  # yes, no
+    Keyword("ExitOnForwardFailure", str, validator=YES_NO),  # yes, no
     Keyword("ForwardAgent", str),  # yes, no
-    Keyword("ForwardX11", str),  # yes, no
-    Keyword("ForwardX11Trusted", str),  # yes, no
-    Keyword("GatewayPorts", str),  # yes, no
+    Keyword("ForwardX11", str, validator=YES_NO),  # yes, no
+    Keyword("ForwardX11Trusted", str, validator=YES_NO),  # yes, no
+    Keyword("GatewayPorts", str, validator=YES_NO),  # yes, no
     Keyword("GlobalKnownHostsFile", str),  # yes, no
-    Keyword("GSSAPIAuthentication", str),  # yes, no
+    Keyword("GSSAPIAuthentication", str, validator=YES_NO),  # yes, no
     Keyword("LocalCommand", str),
-    Keyword("LocalForward", str),
-    Keyword("LogLevel", str),
+    Keyword("LocalForward", str, multiple=True),
+    Keyword("LogLevel", str, validator=choice(
+        "QUIET", "FATAL", "ERROR", "INFO", "VERBOSE", "DEBUG", "DEBUG1", "DEBUG2", "DEBUG3"
+    )),
     Keyword("ProxyCommand", str),
     Keyword("ProxyJump", str),
     Keyword("Match", str),
     Keyword("AddKeysToAgent", str),
     Keyword("BindInterface", str),
-    Keyword("CanonicalizeHostname", str),  # yes, no
-    Keyword("CanonicalizeMaxDots", int),
+    Keyword("CanonicalizeHostname", str, validator=choice("yes", "no", "always", "none")),
+    Keyword("CanonicalizeMaxDots", int, validator=COUNT),
     Keyword("CanonicalDomains", str),
     Keyword("CanonicalizePermittedCNAMEs", str),
     Keyword("CanonicalizeFallbackLocal", str),
     Keyword("IdentityAgent", str),
     Keyword("PreferredAuthentications", str),
-    Keyword("ServerAliveInterval", int),
-    Keyword("ServerAliveCountMax", int),
-    Keyword("UsePrivilegedPort", str),  # yes, no
-    Keyword("TCPKeepAlive", str),  # yes, no
+    Keyword("ServerAliveInterval", int, validator=COUNT),
+    Keyword("ServerAliveCountMax", int, validator=COUNT),
+    Keyword("UsePrivilegedPort", str, validator=YES_NO),  # yes, no
+    Keyword("TCPKeepAlive", str, validator=YES_NO),  # yes, no
     Keyword("Include", str),
     Keyword("IPQoS", str),
     Keyword("GlobalKnownHostsFile", str),
     Keyword("UserKnownHostsFile", str),
-    Keyword("GSSAPIDelegateCredentials", str),
+    Keyword("GSSAPIDelegateCredentials", str, validator=YES_NO),
     Keyword("PKCS11Provider", str),
     Keyword("XAuthLocation", str),
     Keyword("PasswordAuthentication", yes_or_no, yes_or_no_str),  # default: yes
-    Keyword("KbdInteractiveAuthentication", str),
+    Keyword("KbdInteractiveAuthentication", str, validator=YES_NO),
     Keyword("KbdInteractiveDevices", str),
-    Keyword("PubkeyAuthentication", str),
-    Keyword("HostbasedAuthentication", str),
+    Keyword("PubkeyAuthentication", str, validator=choice("yes", "no", "unbound", "host-bound")),
+    Keyword("HostbasedAuthentication", str, validator=YES_NO),
     Keyword("IdentitiesOnly", yes_or_no, yes_or_no_str),  # default: no
-    Keyword("CertificateFile", str),
+    Keyword("CertificateFile", str, multiple=True),
     Keyword("HostKeyAlias", str),
     Keyword("MACs", str),
-    Keyword("RemoteForward", str),
+    Keyword("RemoteForward", str, multiple=True),
     Keyword("PermitRemoteOpen", str),
-    Keyword("StrictHostKeyChecking", yes_or_no, yes_or_no_str),
+    Keyword("StrictHostKeyChecking", str,
+            validator=choice("yes", "no", "ask", "accept-new", "off")),
     Keyword("NumberOfPasswordPrompts", str),
     Keyword("SyslogFacility", str),
     Keyword("LogVerbose", str),
     Keyword("HostKeyAlgorithms", str),
     Keyword("CASignatureAlgorithms", str),
-    Keyword("VerifyHostKeyDNS", str),
-    Keyword("NoHostAuthenticationForLocalhost", str),
+    Keyword("VerifyHostKeyDNS", str, validator=choice("yes", "no", "ask")),
+    Keyword("NoHostAuthenticationForLocalhost", str, validator=YES_NO),
     Keyword("RekeyLimit", str),
-    Keyword("SendEnv", str),
-    Keyword("SetEnv", str),
-    Keyword("ControlPersist", str),
-    Keyword("HashKnownHosts", str),
-    Keyword("Tunnel", str),
+    Keyword("SendEnv", str, multiple=True),
+    Keyword("SetEnv", str, multiple=True),
+    Keyword("ControlPersist", str, validator=time_or_choice("yes", "no")),
+    Keyword("HashKnownHosts", str, validator=YES_NO),
+    Keyword("Tunnel", str, validator=choice("yes", "no", "point-to-point", "ethernet")),
     Keyword("TunnelDevice", str),
-    Keyword("PermitLocalCommand", str),
+    Keyword("PermitLocalCommand", str, validator=YES_NO),
     Keyword("RemoteCommand", str),
-    Keyword("VisualHostKey", str),
+    Keyword("VisualHostKey", str, validator=YES_NO),
     Keyword("KexAlgorithms", str),
-    Keyword("RequestTTY", str),
-    Keyword("SessionType", str),
-    Keyword("StdinNull", str),
-    Keyword("ForkAfterAuthentication", str),
-    Keyword("ProxyUseFdpass", str),
+    Keyword("RequestTTY", str, validator=choice("yes", "no", "force", "auto")),
+    Keyword("SessionType", str, validator=choice("none", "subsystem", "default")),
+    Keyword("StdinNull", str, validator=YES_NO),
+    Keyword("ForkAfterAuthentication", str, validator=YES_NO),
+    Keyword("ProxyUseFdpass", str, validator=YES_NO),
     Keyword("StreamLocalBindMask", str),
-    Keyword("StreamLocalBindUnlink", str),
+    Keyword("StreamLocalBindUnlink", str, validator=YES_NO),
     Keyword("RevokedHostKeys", str),
-    Keyword("FingerprintHash", str),  # md5 or sha256
-    Keyword("UpdateHostKeys", str),
+    Keyword("FingerprintHash", str, validator=choice("md5", "sha256")),  # md5 or sha256
+    Keyword("UpdateHostKeys", str, validator=choice("yes", "no", "ask")),
     Keyword("HostbasedAcceptedAlgorithms", str),
     Keyword("PubkeyAcceptedAlgorithms", str),
+    # Older names, kept as written since older OpenSSH rejects the new ones
+    Keyword("PubkeyAcceptedKeyTypes", str),
+    Keyword("HostbasedKeyTypes", str),
+    Keyword("HostbasedAcceptedKeyTypes", str),
     Keyword("IgnoreUnknown", str),
     Keyword("SecurityKeyProvider", str),
     Keyword("KnownHostsCommand", str),
 ]
+
+Keywords = KeywordRegistry(KEYWORDS)
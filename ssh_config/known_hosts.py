@@ -0,0 +1,242 @@
+"""known_hosts index for host key verification
+"""
+from typing import Dict, List, Tuple
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import logging
+
+from ssh_config.client import stat_key
+from ssh_config.patterns import compile_patterns
+from ssh_config.profile import stats
+
+logger = logging.getLogger("ssh_config.known_hosts")
+
+DEFAULT_USER_KNOWN_HOSTS = "~/.ssh/known_hosts ~/.ssh/known_hosts2"
+DEFAULT_GLOBAL_KNOWN_HOSTS = "/etc/ssh/ssh_known_hosts /etc/ssh/ssh_known_hosts2"
+HASH_MAGIC = "|1|"
+
+OK = "ok"
+UNKNOWN = "unknown"
+MISMATCH = "mismatch"
+REVOKED = "revoked"
+
+
+def host_key(host: str, port: int = 22) -> str:
+    """Return the name of host in known_hosts, '[host]:port' for other ports"""
+    host = host.lower()
+    if port and int(port) != 22:
+        return f"[{host}]:{port}"
+    return host
+
+
+class KnownHostEntry:
+    """A line of known_hosts"""
+
+    __slots__ = ["marker", "hosts", "keytype", "key", "path", "line"]
+
+    def __init__(self, marker: str, hosts: str, keytype: str, key: str,
+                 path: str = None, line: int = None):
+        self.marker = marker
+        self.hosts = hosts
+        self.keytype = keytype
+        self.key = key
+        self.path = path
+        self.line = line
+
+    def __repr__(self):
+        return f"KnownHostEntry<{self.path}:{self.line} {self.keytype}>"
+
+    @property
+    def revoked(self) -> bool:
+        return self.marker == "@revoked"
+
+    @property
+    def cert_authority(self) -> bool:
+        return self.marker == "@cert-authority"
+
+
+class KnownHosts:
+    """Index of known_hosts files
+
+    Plain host names are looked up in a dict, wildcard patterns are scanned
+    and hashed names are grouped by salt, so one HMAC is computed per salt.
+    The entries found for a host are cached.
+    """
+
+    def __init__(self):
+        self._exact = {}
+        self._patterns = []
+        self._hashed = {}
+        self._cache = {}
+        self.paths = []
+
+    def load(self, path: str):
+        """Add the entries of a known_hosts file, a missing file is skipped"""
+        path = os.path.expanduser(path)
+        if not os.path.isfile(path):
+            return self
+        self.paths.append(path)
+        with open(path, errors="replace") as f:
+            for number, line in enumerate(f, 1):
+                self.add_line(line, path, number)
+        self._cache.clear()
+        return self
+
+    def add_line(self, line: str, path: str = None, number: int = None):
+        """Parse and index a known_hosts line"""
+        line = line.strip()
+        if not line or line[0] == "#":
+            return
+        fields = line.split()
+        marker = None
+        if fields[0].startswith("@"):
+            marker, fields = fields[0], fields[1:]
+        if len(fields) < 3:
+            logger.debug("Invalid known_hosts line %s:%s", path, number)
+            return
+        entry = KnownHostEntry(marker, fields[0], fields[1], fields[2], path, number)
+        if entry.hosts.startswith(HASH_MAGIC):
+            try:
+                salt, digest = entry.hosts[len(HASH_MAGIC):].split("|", 1)
+                salt = base64.b64decode(salt)
+                digest = base64.b64decode(digest)
+            except (ValueError, binascii.Error):
+                logger.debug("Invalid hashed host %s:%s", path, number)
+                return
+            self._hashed.setdefault(salt, {}).setdefault(digest, []).append(entry)
+            return
+        patterns = entry.hosts.lower().split(",")
+        if any(char in entry.hosts for char in "*?!"):
+            self._patterns.append((compile_patterns(patterns), entry))
+        else:
+            for pattern in patterns:
+                self._exact.setdefault(pattern, []).append(entry)
+
+    def lookup(self, host: str, port: int = 22) -> Tuple[KnownHostEntry, ...]:
+        """Return the entries of host
+        Args:
+            host (str): host name, address or HostKeyAlias
+            port (int)
+        Returns:
+            Tuple[KnownHostEntry]
+        """
+        name = host_key(host, port)
+        entries = self._cache.get(name)
+        if entries is not None:
+            stats.count("known_hosts_cache_hits")
+            return entries
+        stats.count("known_hosts_cache_misses")
+        found = list(self._exact.get(name, ()))
+        found.extend(entry for pattern_set, entry in self._patterns if pattern_set.matches(name))
+        encoded = name.encode()
+        for salt, digests in self._hashed.items():
+            digest = hmac.new(salt, encoded, hashlib.sha1).digest()
+            found.extend(digests.get(digest, ()))
+        entries = tuple(found)
+        self._cache[name] = entries
+        return entries
+
+    def verify(self, host: str, port: int, keytype: str, key: str) -> str:
+        """Check the key presented by host
+        Args:
+            host (str)
+            port (int)
+            keytype (str): e.g. 'ssh-ed25519'
+            key (str): base64 of the key
+        Returns:
+            str: OK, UNKNOWN, MISMATCH or REVOKED
+        """
+        entries = self.lookup(host, port)
+        for entry in entries:
+            if entry.revoked and entry.key == key:
+                return REVOKED
+        for entry in entries:
+            if entry.marker is None and entry.keytype == keytype and entry.key == key:
+                return OK
+        if any(entry.marker is None for entry in entries):
+            return MISMATCH
+        return UNKNOWN
+
+
+_loaded = {}
+
+
+def load_known_hosts(paths: List[str]) -> KnownHosts:
+    """Return the index of paths, files are read again only when they changed"""
+    paths = tuple(os.path.expanduser(path) for path in paths)
+    keys = tuple(stat_key(path) for path in paths)
+    loaded = _loaded.get(paths)
+    if loaded and loaded[0] == keys:
+        return loaded[1]
+    known_hosts = KnownHosts()
+    for path in paths:
+        known_hosts.load(path)
+    _loaded[paths] = (keys, known_hosts)
+    return known_hosts
+
+
+def known_hosts_files(options: Dict) -> List[str]:
+    """Return the UserKnownHostsFile and GlobalKnownHostsFile paths of options"""
+    paths = []
+    for key, default in (("UserKnownHostsFile", DEFAULT_USER_KNOWN_HOSTS),
+                         ("GlobalKnownHostsFile", DEFAULT_GLOBAL_KNOWN_HOSTS)):
+        value = options.get(key) or default
+        if isinstance(value, list):
+            value = " ".join(value)
+        paths.extend(path for path in value.split() if path.lower() != "none")
+    return paths
+
+
+def check_host(config, name: str) -> Tuple[str, str, Tuple[KnownHostEntry, ...]]:
+    """Look up the known host keys of a host of config
+    Args:
+        config (SSHConfig)
+        name (str): host name
+    Returns:
+        (str, str, tuple): known_hosts name, OK/UNKNOWN/REVOKED and the entries
+    """
+    options = config.resolve(name, expand=True)
+    port = options.get("Port") or 22
+    if options.get("HostKeyAlias"):
+        host, port = options["HostKeyAlias"], 22
+    else:
+        host = options.get("HostName") or name
+    entries = load_known_hosts(known_hosts_files(options)).lookup(host, port)
+    keys = [entry for entry in entries if entry.marker is None]
+    if keys:
+        status = OK
+    elif any(entry.revoked for entry in entries):
+        status = REVOKED
+    else:
+        status = UNKNOWN
+    return host_key(host, port), status, entries
+
+
+def host_key_policy(options: Dict):
+    """Return a paramiko policy verifying keys against the known_hosts files
+
+    Unknown keys are rejected if StrictHostKeyChecking is yes, accepted
+    otherwise. Changed and revoked keys are always rejected.
+    """
+    import paramiko
+
+    known_hosts = load_known_hosts(known_hosts_files(options))
+    strict = str(options.get("StrictHostKeyChecking")).lower() in ("yes", "true")
+
+    class KnownHostsPolicy(paramiko.MissingHostKeyPolicy):
+        def missing_host_key(self, client, hostname, key):
+            if hostname.startswith("["):
+                host, port = hostname[1:].rsplit("]:", 1)
+            else:
+                host, port = hostname, 22
+            if options.get("HostKeyAlias"):
+                host, port = options["HostKeyAlias"], 22
+            status = known_hosts.verify(host, int(port), key.get_name(), key.get_base64())
+            if status == OK or (status == UNKNOWN and not strict):
+                return
+            raise paramiko.SSHException(f"Host key for {hostname} is {status}")
+
+    return KnownHostsPolicy()
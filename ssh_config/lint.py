@@ -0,0 +1,208 @@
+"""Lint the ssh config in a single pass
+"""
+from typing import Dict, List, Tuple
+import os
+
+from ssh_config.client import (
+    HOST_START, INCLUDE_MAX_DEPTH, _include_paths, get_attribute, is_skip, remove_comment,
+)
+from ssh_config.diff import format_position
+from ssh_config.errors import ConfigSyntaxError, KeywordError
+from ssh_config.keywords import Keywords
+from ssh_config.match import UnsupportedCriterion, compile_criteria, match_patterns
+from ssh_config.patterns import PatternSet, split_patterns
+from ssh_config.route import is_pattern
+
+ERROR = "error"
+WARNING = "warning"
+
+
+class Diagnostic:
+    """A problem found at a line of a config file"""
+
+    __slots__ = ["path", "line", "column", "severity", "code", "message"]
+
+    def __init__(self, path: str, line: int, column: int, severity: str, code: str,
+                 message: str):
+        self.path = path
+        self.line = line
+        self.column = column
+        self.severity = severity
+        self.code = code
+        self.message = message
+
+    def __repr__(self):
+        return f"Diagnostic<{self.path}:{self.line} {self.code}>"
+
+    def __str__(self):
+        return (f"{self.path}:{self.line}:{self.column}: {self.severity}: {self.message} "
+                f"[{self.code}]")
+
+    def asdict(self) -> Dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+class Block:
+    """Host or Match block being linted"""
+
+    __slots__ = ["keyword", "name", "names", "position", "attrs"]
+
+    def __init__(self, keyword: str, name: str, position: Tuple[str, int, int]):
+        self.keyword = keyword
+        self.name = name
+        self.names = name.split()
+        self.position = position
+        # {key: (path, line, column)} of the first value of each keyword
+        self.attrs = {}
+
+
+class Linter:
+    """Collect the diagnostics of a config and its Included files
+
+    Shadowing is checked against a dict of the attributes set for each
+    host name and the list of the pattern blocks, so the cost grows with
+    the number of blocks times the number of pattern blocks.
+    """
+
+    def __init__(self):
+        self.diagnostics = []
+        self._names = {}
+        self._exact = {}
+        self._patterns = []
+        self._ignore = []
+        self._block = None
+
+    def report(self, position: Tuple[str, int, int], severity: str, code: str, message: str):
+        self.diagnostics.append(Diagnostic(*position, severity, code, message))
+
+    def lint(self, path: str) -> List[Diagnostic]:
+        """Lint path and the files it Includes
+        Returns:
+            List[Diagnostic]: sorted by line within each file
+        """
+        self._block = Block("Host", "*", (path, 0, 0))
+        self._lint_file(path, os.path.dirname(os.path.abspath(path)), 0)
+        self._end_block()
+        files = {}
+        for diagnostic in self.diagnostics:
+            files.setdefault(diagnostic.path, len(files))
+        self.diagnostics.sort(key=lambda d: (files[d.path], d.line))
+        return self.diagnostics
+
+    def _lint_file(self, path: str, base_dir: str, depth: int):
+        with open(path) as f:
+            data = f.read()
+        for number, line in enumerate(data.splitlines(), 1):
+            position = (path, number, len(line) - len(line.lstrip()) + 1)
+            line = line.strip()
+            if is_skip(line):
+                continue
+            line = remove_comment(line)
+            match = HOST_START.match(line)
+            if match:
+                self._end_block()
+                self._start_block(match.group(1).capitalize(), match.group("name"), position)
+                continue
+            try:
+                key, value = get_attribute(line)
+            except ConfigSyntaxError:
+                self.report(position, ERROR, "syntax", f"Failed to parse: {line}")
+                continue
+            if key.lower() == "include":
+                if depth >= INCLUDE_MAX_DEPTH:
+                    self.report(position, ERROR, "include-depth", "Include nested too deeply")
+                    continue
+                includes = _include_paths(value, base_dir, {})
+                if not includes:
+                    self.report(position, WARNING, "missing-include",
+                                f"No file matches Include {value}")
+                for include in includes:
+                    self._lint_file(include, base_dir, depth + 1)
+                continue
+            self._attribute(key, value, position)
+
+    def _start_block(self, keyword: str, name: str, position: Tuple[str, int, int]):
+        block = self._block = Block(keyword, name, position)
+        if keyword == "Match":
+            try:
+                criteria = compile_criteria(name)
+            except ValueError as e:
+                self.report(position, ERROR, "invalid-match", str(e))
+                return
+            for criterion in criteria:
+                if isinstance(criterion, UnsupportedCriterion):
+                    self.report(position, WARNING, "unsupported-match",
+                                f"Match {criterion.name} is not evaluated, the block never matches")
+            return
+        first = self._names.get(" ".join(block.names))
+        if first:
+            self.report(position, WARNING, "duplicate-host",
+                        f"Host {name} is already defined at {format_position(first)}")
+        else:
+            self._names[" ".join(block.names)] = position
+
+    def _attribute(self, key: str, value: str, position: Tuple[str, int, int]):
+        keyword = Keywords.get(key)
+        if keyword is None:
+            if not match_patterns(self._ignore, key):
+                self.report(position, ERROR, "unknown-keyword", str(KeywordError(key)))
+            return
+        try:
+            keyword.validate(value)
+        except ValueError as e:
+            self.report(position, ERROR, "invalid-value", f"{keyword.key}: {e}")
+        if keyword.key == "IgnoreUnknown":
+            self._ignore.extend(value.split(","))
+        if keyword.multiple:
+            return
+        attrs = self._block.attrs
+        if keyword.key in attrs:
+            self.report(position, WARNING, "repeated",
+                        f"{keyword.key} is already set at "
+                        f"{format_position(attrs[keyword.key])}, the first value is used")
+            return
+        attrs[keyword.key] = position
+
+    def _shadowing(self, name: str, key: str):
+        """Return where key is set by an earlier block matching name"""
+        if not is_pattern(name):
+            found = self._exact.get(name, {}).get(key)
+            if found:
+                return found
+            for names, patterns, attrs in self._patterns:
+                if key in attrs and patterns.matches(name):
+                    return attrs[key]
+            return None
+        for names, patterns, attrs in self._patterns:
+            if key in attrs and (name in names or names == ["*"]):
+                return attrs[key]
+        return None
+
+    def _end_block(self):
+        block = self._block
+        if block is None or block.keyword == "Match":
+            return
+        for key, position in block.attrs.items():
+            shadows = [self._shadowing(name, key) for name in block.names]
+            if shadows and all(shadows):
+                self.report(position, WARNING, "shadowed",
+                            f"{key} of {block.keyword} {block.name} never applies, it is "
+                            f"set before at {format_position(shadows[0])}")
+        if any(is_pattern(name) for name in block.names):
+            self._patterns.append((block.names, PatternSet(split_patterns(block.names)),
+                                   block.attrs))
+        else:
+            for name in block.names:
+                attrs = self._exact.setdefault(name, {})
+                for key, position in block.attrs.items():
+                    attrs.setdefault(key, position)
+
+
+def lint(path: str) -> List[Diagnostic]:
+    """Lint the config file at path and its Included files
+    Args:
+        path (str): ssh config path
+    Returns:
+        List[Diagnostic]
+    """
+    return Linter().lint(path)
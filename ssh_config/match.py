@@ -0,0 +1,234 @@
+"""Match block criteria
+"""
+from typing import List
+import getpass
+import shlex
+import subprocess
+import time
+import logging
+
+from ssh_config.patterns import compile_patterns
+from ssh_config.tokens import TokenValues, expand
+
+logger = logging.getLogger("ssh_config.match")
+
+CRITERIA = ("all", "canonical", "final", "exec", "host", "originalhost", "user", "localuser")
+
+
+def match_patterns(patterns: List[str], value: str) -> bool:
+    """Match value against ssh pattern list, '!pattern' excludes the value
+    Args:
+        patterns (List[str]): patterns like ["*.corp", "!db.corp"]
+        value (str)
+    Returns:
+        bool: True if any pattern matches and no negated pattern matches
+    """
+    return compile_patterns(patterns).matches(value)
+
+
+class MatchContext:
+    """State of the connection the criteria are evaluated against"""
+
+    __slots__ = ["original_host", "host", "user", "local_user", "port",
+                 "canonical", "final"]
+
+    def __init__(self, original_host: str, host: str = None, user: str = None,
+                 local_user: str = None, port: int = None,
+                 canonical: bool = False, final: bool = False):
+        self.original_host = original_host
+        self.host = host or original_host
+        self.local_user = local_user or getpass.getuser()
+        self.user = user or self.local_user
+        self.port = port or 22
+        self.canonical = canonical
+        self.final = final
+
+
+class ExecCache:
+    """Results of `Match exec` commands per (command, host), kept for ttl seconds"""
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._results = {}
+
+    def run(self, command: str, host: str) -> bool:
+        """Run the command with the shell unless a fresh result is cached
+        Returns:
+            bool: True if the command exited with 0
+        """
+        key = (command, host)
+        now = time.monotonic()
+        cached = self._results.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        logger.debug("Match exec: %s", command)
+        result = subprocess.run(
+            command, shell=True, stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ).returncode == 0
+        self._results[key] = (now + self.ttl, result)
+        return result
+
+    def clear(self):
+        """Drop all cached results"""
+        self._results.clear()
+
+
+exec_cache = ExecCache()
+
+
+class Criterion:
+    """Base class of a compiled criterion, `negate` inverts the result"""
+
+    name = None
+
+    def __init__(self, negate: bool = False):
+        self.negate = negate
+
+    def __call__(self, context: MatchContext) -> bool:
+        return self.evaluate(context) != self.negate
+
+    def evaluate(self, context: MatchContext) -> bool:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{'!' if self.negate else ''}{self.name}"
+
+
+class AllCriterion(Criterion):
+    name = "all"
+
+    def evaluate(self, context):
+        return True
+
+
+class CanonicalCriterion(Criterion):
+    name = "canonical"
+
+    def evaluate(self, context):
+        return context.canonical
+
+
+class FinalCriterion(Criterion):
+    name = "final"
+
+    def evaluate(self, context):
+        return context.final
+
+
+class PatternCriterion(Criterion):
+    """host, originalhost, user and localuser criteria"""
+
+    fields = {
+        "host": "host",
+        "originalhost": "original_host",
+        "user": "user",
+        "localuser": "local_user",
+    }
+
+    def __init__(self, name: str, patterns: str, negate: bool = False):
+        super().__init__(negate)
+        self.name = name
+        self.patterns = patterns.split(",")
+        self.pattern_set = compile_patterns(self.patterns)
+
+    def evaluate(self, context):
+        return self.pattern_set.matches(getattr(context, self.fields[self.name]))
+
+    def __repr__(self):
+        return f"{super().__repr__()} {','.join(self.patterns)}"
+
+
+class ExecCriterion(Criterion):
+    name = "exec"
+
+    def __init__(self, command: str, negate: bool = False, cache: ExecCache = None):
+        super().__init__(negate)
+        self.command = command
+        self.cache = cache or exec_cache
+
+    def expand(self, context: MatchContext) -> str:
+        """Expand the tokens of the command"""
+        values = TokenValues(
+            context.original_host, hostname=context.host, port=context.port,
+            user=context.user, local_user=context.local_user,
+        )
+        return expand(self.command, values)
+
+    def evaluate(self, context):
+        return self.cache.run(self.expand(context), context.host)
+
+    def __repr__(self):
+        return f"{super().__repr__()} {shlex.quote(self.command)}"
+
+
+class UnsupportedCriterion(Criterion):
+    """Criterion this module cannot evaluate, like localnetwork or tagged,
+    kept as written and never matching, negated or not
+    """
+
+    def __init__(self, name: str, argument: str, negate: bool = False):
+        super().__init__(negate)
+        self.name = name
+        self.argument = argument
+
+    def __call__(self, context: MatchContext) -> bool:
+        return False
+
+    def evaluate(self, context):
+        return False
+
+    def __repr__(self):
+        return f"{super().__repr__()} {self.argument}"
+
+
+def compile_criteria(text: str) -> List[Criterion]:
+    """Compile the criteria of a Match line
+    Args:
+        text (str): criteria, e.g. 'host *.corp user deploy exec "test -f %h"'
+    Returns:
+        List[Criterion]: all of them have to match
+    Raises:
+        ValueError: missing argument
+    """
+    tokens = shlex.split(text)
+    criteria = []
+    idx = 0
+    while idx < len(tokens):
+        token = tokens[idx]
+        negate = token.startswith("!")
+        name = token.lstrip("!").lower()
+        idx += 1
+        if name == "all":
+            criteria.append(AllCriterion(negate))
+        elif name == "canonical":
+            criteria.append(CanonicalCriterion(negate))
+        elif name == "final":
+            criteria.append(FinalCriterion(negate))
+        else:
+            if idx >= len(tokens):
+                raise ValueError(f"Missing argument for Match {name}")
+            argument = tokens[idx]
+            idx += 1
+            if name == "exec":
+                criteria.append(ExecCriterion(argument, negate))
+            elif name in CRITERIA:
+                criteria.append(PatternCriterion(name, argument, negate))
+            else:
+                # Newer criteria like localnetwork or tagged take an argument too
+                logger.warning("Unsupported Match criterion %s, the block never matches", name)
+                criteria.append(UnsupportedCriterion(name, argument, negate))
+    return criteria
+
+
+def evaluate(criteria: List[Criterion], context: MatchContext) -> bool:
+    """Evaluate the criteria in order, stop at the first one failing"""
+    for criterion in criteria:
+        if not criterion(context):
+            return False
+    return True
+
+
+def needs_final_pass(criteria: List[Criterion]) -> bool:
+    """Check the criteria depend on the canonical or final pass"""
+    return any(isinstance(c, (CanonicalCriterion, FinalCriterion)) for c in criteria)
@@ -0,0 +1,165 @@
+"""Connection multiplexing for hosts asking for ControlMaster
+"""
+from typing import Dict, List, Tuple
+import os
+import shutil
+import subprocess
+import time
+import logging
+
+from ssh_config.identity import load_identity
+from ssh_config.keywords import time_interval
+from ssh_config.known_hosts import host_key_policy
+
+logger = logging.getLogger("ssh_config.mux")
+
+MUX_MODES = ("yes", "auto", "ask", "autoask")
+CHECK_TIMEOUT = 5
+
+
+class MuxManager:
+    """Control sockets of OpenSSH masters and a pool of paramiko clients
+
+    Control sockets outlive the process, so the `ssh` command goes through
+    them when the config asks for multiplexing. paramiko clients can not be
+    shared between processes, they are reused within the process until
+    ControlPersist expires.
+    """
+
+    def __init__(self, config, ssh: str = "ssh"):
+        """
+        Args:
+            config (SSHConfig)
+            ssh (str): OpenSSH client to talk to the masters
+        """
+        self.config = config
+        self.ssh = ssh
+        self._options = {}
+        self._clients = {}
+
+    def options(self, name: str) -> Dict:
+        """Return the expanded effective options of name"""
+        options = self._options.get(name)
+        if options is None:
+            options = self._options[name] = self.config.resolve(name, expand=True)
+        return options
+
+    def socket(self, name: str):
+        """Return the ControlPath of name if it asks for multiplexing
+        Returns:
+            str or None
+        """
+        options = self.options(name)
+        path = options.get("ControlPath")
+        if str(options.get("ControlMaster", "no")).lower() not in MUX_MODES:
+            return None
+        if not path or path.lower() == "none":
+            return None
+        return path
+
+    def _control(self, name: str, command: str) -> bool:
+        path = self.socket(name)
+        if path is None or not os.path.exists(path) or not shutil.which(self.ssh):
+            return False
+        args = [self.ssh, "-F", self.config.config_path, "-S", path, "-O", command, name]
+        try:
+            result = subprocess.run(
+                args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL, timeout=CHECK_TIMEOUT,
+            )
+        except subprocess.TimeoutExpired:
+            logger.debug("Timeout: %s", " ".join(args))
+            return False
+        return result.returncode == 0
+
+    def is_alive(self, name: str) -> bool:
+        """Check a master is listening on the control socket of name"""
+        return self._control(name, "check")
+
+    def stop(self, name: str) -> bool:
+        """Ask the master of name to exit
+        Returns:
+            bool: True if a master was stopped
+        """
+        return self._control(name, "exit")
+
+    def status(self, names: List[str]) -> List[Tuple[str, str, bool]]:
+        """Return (name, ControlPath, alive) of the names asking for multiplexing"""
+        status = []
+        for name in names:
+            path = self.socket(name)
+            if path is not None:
+                status.append((name, path, self.is_alive(name)))
+        return status
+
+    def command(self, name: str) -> List[str]:
+        """Return the OpenSSH command opening or reusing the master of name
+        Returns:
+            list or None: None if name does not ask for multiplexing or
+                there is no OpenSSH client
+        """
+        if self.socket(name) is None or not shutil.which(self.ssh):
+            return None
+        return [self.ssh, "-F", self.config.config_path, name]
+
+    def persist(self, name: str):
+        """Return seconds an idle client is kept, None for the process lifetime"""
+        persist = str(self.options(name).get("ControlPersist", "no")).lower()
+        if persist in ("yes", "no"):
+            return None
+        try:
+            return time_interval(persist)
+        except ValueError:
+            return None
+
+    def client(self, name: str, password: str = None):
+        """Return a connected paramiko SSHClient for name, reused when the
+        config asks for multiplexing
+        Args:
+            name (str): host name
+            password (str or None)
+        Returns:
+            paramiko.SSHClient
+        """
+        import paramiko
+
+        options = self.options(name)
+        key = (options.get("HostName", name), options.get("Port") or 22, options.get("User"))
+        pooled = self._clients.get(key)
+        if pooled:
+            client, expires = pooled
+            transport = client.get_transport()
+            alive = expires is None or expires > time.monotonic()
+            if transport and transport.is_active() and alive:
+                self._touch(name, key, client)
+                return client
+            client.close()
+            del self._clients[key]
+
+        identity_files = options.get("IdentityFile") or []
+        pkey = load_identity(identity_files)
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(host_key_policy(options))
+        client.connect(
+            key[0],
+            port=key[1],
+            username=key[2],
+            password=password,
+            pkey=pkey,
+            key_filename=None if pkey else identity_files or None,
+            allow_agent=True,
+        )
+        if self.socket(name) is not None:
+            self._touch(name, key, client)
+        return client
+
+    def _touch(self, name: str, key: Tuple, client):
+        persist = self.persist(name)
+        expires = None if persist is None else time.monotonic() + persist
+        self._clients[key] = (client, expires)
+
+    def close(self):
+        """Close the pooled clients"""
+        for client, _ in self._clients.values():
+            client.close()
+        self._clients.clear()
@@ -0,0 +1,131 @@
+"""ssh pattern lists compiled once into an anchored regex
+
+A pattern list like "web*,!web-old*" or ["*.corp", "!db.corp"] matches a
+value if no negated pattern matches it and at least one pattern does, as in
+OpenSSH. `*` matches any characters and `?` one character, every other
+character, including `[`, matches itself.
+
+Host blocks compile their own PatternSet once, see `Host.set_name`. The
+cache of `compile_patterns` is for the patterns given at runtime, like the
+arguments of the command line.
+"""
+from functools import lru_cache
+from typing import Iterable, List, Tuple, Union
+import re
+
+from ssh_config.profile import stats
+
+PATTERN_CACHE_SIZE = 1024
+SEPARATORS = re.compile(r"[,\s]+")
+
+
+def _translate(pattern: str) -> str:
+    """Return the regex of a single pattern"""
+    return "".join(
+        ".*" if char == "*" else "." if char == "?" else re.escape(char) for char in pattern
+    )
+
+
+class PatternSet:
+    """Compiled pattern list, use `compile_patterns` to share the compiled sets.
+    A list of plain names is matched with a set lookup instead of a regex.
+    """
+
+    __slots__ = ["patterns", "positive", "negative", "literals", "regex"]
+
+    def __init__(self, patterns: Tuple[str, ...], ignore_case: bool = False):
+        """
+        Args:
+            patterns (tuple): patterns, negated ones start with !
+            ignore_case (bool): match case-insensitively
+        """
+        self.patterns = patterns
+        self.negative = tuple(pattern[1:] for pattern in patterns if pattern.startswith("!"))
+        self.positive = tuple(
+            pattern for pattern in patterns if not pattern.startswith("!")
+        ) if self.negative else patterns
+        self.literals = None
+        self.regex = None
+        if not ignore_case and not self.negative and not any(
+            "*" in pattern or "?" in pattern for pattern in patterns
+        ):
+            self.literals = frozenset(patterns)
+            return
+        regex = ""
+        if self.negative:
+            regex += f"(?!(?:{'|'.join(map(_translate, self.negative))})\\Z)"
+        if self.positive:
+            regex += f"(?:{'|'.join(map(_translate, self.positive))})\\Z"
+        else:
+            # Only negated patterns never match
+            regex += "(?!)"
+        self.regex = re.compile(regex, re.DOTALL | (re.IGNORECASE if ignore_case else 0))
+
+    def __repr__(self):
+        return f"PatternSet<{','.join(self.patterns)}>"
+
+    def matches(self, value: str) -> bool:
+        """Check value against the pattern list"""
+        if self.literals is not None:
+            return value in self.literals
+        return self.regex.match(value) is not None
+
+    __call__ = matches
+
+    def matches_any(self, values: Iterable[str]) -> bool:
+        """Check whether one of values matches, like the names of a Host block"""
+        if self.literals is not None:
+            return not self.literals.isdisjoint(values)
+        match = self.regex.match
+        return any(match(value) is not None for value in values)
+
+    def filter(self, values: Iterable[str]) -> List[str]:
+        """Return the values which match"""
+        if self.literals is not None:
+            return [value for value in values if value in self.literals]
+        match = self.regex.match
+        return [value for value in values if match(value) is not None]
+
+    def select(self, hosts) -> List:
+        """Return the hosts with a name matching, see `select_hosts`"""
+        return [host for host in hosts if self.matches_any(host.name.split())]
+
+
+def split_patterns(patterns: Union[str, Iterable[str]]) -> Tuple[str, ...]:
+    """Split a pattern list given as text, separated by commas or spaces"""
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    result = []
+    for item in patterns:
+        result.extend(part for part in SEPARATORS.split(item) if part)
+    return tuple(result)
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _compile(patterns: Tuple[str, ...], ignore_case: bool) -> PatternSet:
+    return PatternSet(patterns, ignore_case)
+
+
+def compile_patterns(patterns: Union[str, Iterable[str]], ignore_case: bool = False) -> PatternSet:
+    """Return the compiled PatternSet of a pattern list, cached
+    Args:
+        patterns (str or Iterable[str]): "a*,!ab*", "a* !ab*" or ["a*", "!ab*"]
+        ignore_case (bool): match case-insensitively
+    Returns:
+        PatternSet
+    """
+    return _compile(split_patterns(patterns), ignore_case)
+
+
+def select_hosts(hosts, patterns: Union[str, Iterable[str]]) -> List:
+    """Return the hosts which have a name matching the pattern list
+    Args:
+        hosts (Iterable[Host])
+        patterns (str or Iterable[str]): see `compile_patterns`
+    Returns:
+        List[Host]
+    """
+    return compile_patterns(patterns).select(hosts)
+
+
+stats.register_cache("patterns", _compile)
@@ -0,0 +1,168 @@
+"""Opt-in timers and counters for parsing, resolving and writing
+
+Instrumentation is disabled by default, the call sites only check
+`stats.enabled` then. Enable it with `enable()`, read it with
+`SSHConfig.stats()` or `stats.snapshot()` and forward it to a metrics system
+by adding a Hook:
+
+    class StatsdHook(Hook):
+        def count(self, name, value):
+            statsd.incr(f"ssh_config.{name}", value)
+
+        def timing(self, name, seconds):
+            statsd.timing(f"ssh_config.{name}", seconds * 1000)
+
+    stats.add_hook(StatsdHook())
+    enable()
+"""
+import threading
+import time
+from typing import Dict
+
+
+class Hook:
+    """Receives every count and timing while the stats are enabled"""
+
+    def count(self, name: str, value: int):
+        """Counter name was increased by value"""
+
+    def timing(self, name: str, seconds: float):
+        """Timer name measured seconds"""
+
+
+class _Timer:
+    """Context manager adding the elapsed time to a timer"""
+
+    __slots__ = ["stats", "name", "start"]
+
+    def __init__(self, stats, name: str):
+        self.stats = stats
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.stats.add_time(self.name, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    """Timer doing nothing while the stats are disabled"""
+
+    __slots__ = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Stats:
+    """Process wide counters and timers, safe to update from threads"""
+
+    def __init__(self):
+        self.enabled = False
+        self.hooks = []
+        self._counters = {}
+        self._timers = {}
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, value: int = 1):
+        """Increase counter name by value"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+        for hook in self.hooks:
+            hook.count(name, value)
+
+    def add_time(self, name: str, seconds: float):
+        """Add a measured duration to timer name"""
+        if not self.enabled:
+            return
+        with self._lock:
+            calls, total = self._timers.get(name, (0, 0.0))
+            self._timers[name] = (calls + 1, total + seconds)
+        for hook in self.hooks:
+            hook.timing(name, seconds)
+
+    def timer(self, name: str):
+        """Return a context manager timing its block as timer name"""
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, name)
+
+    def add_hook(self, hook: Hook):
+        """Forward the counts and timings to hook"""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Hook):
+        """Remove a hook added with `add_hook`"""
+        self.hooks.remove(hook)
+
+    def register_cache(self, name: str, function):
+        """Report the hits and misses of an lru_cache decorated function"""
+        self._caches[name] = function
+
+    def reset(self):
+        """Clear the counters and timers"""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def snapshot(self) -> Dict:
+        """Return the current values
+        Returns:
+            {"counters": {name: value},
+             "timers": {name: {"calls": int, "seconds": float}},
+             "caches": {name: {"hits": int, "misses": int, "size": int}}}
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {
+                name: {"calls": calls, "seconds": total}
+                for name, (calls, total) in self._timers.items()
+            }
+        caches = {}
+        for name, function in self._caches.items():
+            info = function.cache_info()
+            caches[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+        return {"counters": counters, "timers": timers, "caches": caches}
+
+    def text(self) -> str:
+        """Return the values as a human readable breakdown"""
+        snapshot = self.snapshot()
+        lines = ["Timers:"]
+        for name, timer in sorted(snapshot["timers"].items()):
+            lines.append(
+                f"{' '*4}{name:<24} {timer['calls']:>8} calls {timer['seconds'] * 1000:>10.3f} ms"
+            )
+        lines.append("Counters:")
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{' '*4}{name:<24} {value:>8}")
+        lines.append("Caches:")
+        for name, cache in sorted(snapshot["caches"].items()):
+            lines.append(
+                f"{' '*4}{name:<24} {cache['hits']:>8} hits {cache['misses']:>8} misses"
+            )
+        return "\n".join(lines)
+
+
+stats = Stats()
+
+
+def enable():
+    """Start collecting the counters and timers"""
+    stats.enabled = True
+
+
+def disable():
+    """Stop collecting, the values collected so far are kept"""
+    stats.enabled = False
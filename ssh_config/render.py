@@ -0,0 +1,166 @@
+"""Generate Host blocks from host records and a template
+
+Records are read one at a time from JSONL or CSV, each one is rendered with
+the template compiled once and the output is written as it is generated,
+so memory does not grow with the number of hosts.
+"""
+from typing import Dict, Iterator, TextIO
+import csv
+import json
+import os
+import shutil
+import sys
+
+from ssh_config.client import HOST_START, parse_config
+
+FORMATS = ("jsonl", "csv")
+ENGINES = ("jinja2", "python")
+
+
+def load_records(path: str, format_: str = None) -> Iterator[Dict]:
+    """Read host records one by one
+    Args:
+        path (str): JSONL or CSV file, - for stdin
+        format_ (str or None): jsonl or csv, guessed from the extension if None
+    Yields:
+        dict: one record per JSON line or CSV row
+    Raises:
+        ValueError: a JSON line is not an object
+    """
+    if format_ is None:
+        format_ = "csv" if path.lower().endswith(".csv") else "jsonl"
+    f = sys.stdin if path == "-" else open(path, newline="")
+    try:
+        if format_ == "csv":
+            yield from csv.DictReader(f)
+            return
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}:{number}: Expected a JSON object")
+            yield record
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+class BlockTemplate:
+    """Template of the block of one host, compiled once
+
+    jinja2 templates get the fields of the record as variables and the whole
+    record as `record`. python templates are str.format strings like
+    "Host {name}\\n    HostName {ip}\\n".
+    """
+
+    def __init__(self, source: str, engine: str = "jinja2"):
+        """
+        Args:
+            source (str): the template
+            engine (str): jinja2 or python
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown template engine, {engine}")
+        self.engine = engine
+        self.source = source
+        if engine == "jinja2":
+            from jinja2 import Environment
+
+            environment = Environment(
+                trim_blocks=True, lstrip_blocks=True, keep_trailing_newline=True
+            )
+            self.template = environment.from_string(source)
+
+    @classmethod
+    def from_file(cls, path: str, engine: str = "jinja2"):
+        with open(path) as f:
+            return cls(f.read(), engine)
+
+    def generate(self, record: Dict) -> Iterator[str]:
+        """Yield the rendered text of record in chunks"""
+        if self.engine == "jinja2":
+            return self.template.generate(record, record=record)
+        return iter((self.source.format_map(record),))
+
+
+def block_names(text: str):
+    """Return the names of the Host and Match blocks in text"""
+    names = []
+    for line in text.splitlines():
+        match = HOST_START.match(line.strip())
+        if match:
+            names.append(" ".join(match.group("name").split()))
+    return names
+
+
+def _write_attrs(out: TextIO, attrs: Dict, indent: str):
+    for key, value in attrs.items():
+        for item in (value if isinstance(value, list) else [value]):
+            out.write(f"{indent}{key} {item}\n")
+
+
+def render(template: BlockTemplate, records, out: TextIO, merge: str = None) -> int:
+    """Render every record and write the blocks to out
+    Args:
+        template (BlockTemplate)
+        records (Iterable[dict])
+        out (TextIO): output
+        merge (str or None): existing config merged by name: its global
+            options come first, then the rendered blocks, then its own blocks
+            which were not rendered. Its Include directives are kept as is.
+    Returns:
+        int: number of records rendered
+    """
+    existing_hosts = []
+    if merge:
+        with open(merge) as f:
+            existing_hosts, global_options = parse_config(f.read(), merge)
+        _write_attrs(out, global_options, "")
+    rendered = set()
+    count = 0
+    for count, record in enumerate(records, 1):
+        chunks = template.generate(record)
+        if merge:
+            # One block is small, keep it to read its name
+            text = "".join(chunks)
+            rendered.update(block_names(text))
+            chunks = (text,)
+        last = ""
+        for chunk in chunks:
+            if chunk:
+                out.write(chunk)
+                last = chunk
+        if last and not last.endswith("\n"):
+            out.write("\n")
+    for host in existing_hosts:
+        if " ".join(host["host"].split()) in rendered:
+            continue
+        out.write(f"{host['keyword']} {host['host']}\n")
+        _write_attrs(out, host["attrs"], " " * 4)
+    return count
+
+
+def render_file(template: BlockTemplate, records, output: str, merge: str = None) -> int:
+    """Render to the file output, replaced at once when done
+    Args:
+        template (BlockTemplate)
+        records (Iterable[dict])
+        output (str): path, - for stdout
+        merge (str or None): see `render`, can be output itself
+    Returns:
+        int: number of records rendered
+    """
+    if output == "-":
+        return render(template, records, sys.stdout, merge)
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as out:
+            count = render(template, records, out, merge)
+        if os.path.exists(output):
+            shutil.copymode(output, tmp_path)
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
@@ -0,0 +1,171 @@
+"""Jump host routes from ProxyJump and ProxyCommand
+"""
+from typing import List, Tuple
+import os
+import shlex
+
+from ssh_config.client import Match
+from ssh_config.errors import RouteCycleError, RouteDepthError
+
+DEFAULT_MAX_DEPTH = 16
+# ssh options taking an argument, the host is the first other argument
+SSH_ARG_OPTIONS = "BbcDEeFIiJLlmOoPpQRSWw"
+
+
+def is_pattern(name: str) -> bool:
+    """Check the Host name is a pattern rather than a host"""
+    return any(char in name for char in "*?!")
+
+
+def parse_jump(jump: str) -> str:
+    """Return the host of a ProxyJump entry, [user@]host[:port] or ssh://[user@]host[:port]"""
+    if jump.startswith("ssh://"):
+        jump = jump[len("ssh://"):]
+    host = jump.rsplit("@", 1)[-1]
+    if host.startswith("["):
+        return host[1:host.find("]")]
+    return host.split(":", 1)[0]
+
+
+def proxy_command_host(command: str):
+    """Return the host an `ssh` ProxyCommand connects through
+    Args:
+        command (str): e.g. 'ssh -q -A bastion -W %h:%p'
+    Returns:
+        str or None: None if the command is not ssh
+    """
+    try:
+        args = shlex.split(command)
+    except ValueError:
+        return None
+    if args and args[0] == "ProxyCommand":
+        args = args[1:]
+    if not args or os.path.basename(args[0]) != "ssh":
+        return None
+    idx = 1
+    while idx < len(args):
+        arg = args[idx]
+        if arg.startswith("-") and len(arg) > 1:
+            if arg[-1] in SSH_ARG_OPTIONS and len(arg) == 2:
+                idx += 1
+            idx += 1
+            continue
+        return parse_jump(arg)
+    return None
+
+
+def proxy_jumps(host):
+    """Return the jump hosts of a Host block
+    Args:
+        host (Host)
+    Returns:
+        List[str] or None: [] for 'none' or a non-ssh ProxyCommand,
+            None if the block sets no proxy
+    """
+    if host.ProxyJump:
+        if host.ProxyJump.lower() == "none":
+            return []
+        return [parse_jump(jump.strip()) for jump in host.ProxyJump.split(",")]
+    if host.ProxyCommand:
+        jump = proxy_command_host(host.ProxyCommand)
+        return [jump] if jump else []
+    return None
+
+
+class RouteGraph:
+    """Jump host graph of the Host blocks, routes are memoized
+
+    Like ssh, the first block setting ProxyJump or ProxyCommand for a name
+    decides its jump hosts. Match blocks are not considered since their
+    criteria depend on the connection.
+    """
+
+    def __init__(self, hosts, max_depth: int = DEFAULT_MAX_DEPTH):
+        """
+        Args:
+            hosts (List[Host]): blocks in config order
+            max_depth (int): maximum number of jumps of a route
+        """
+        self.max_depth = max_depth
+        self.names = []
+        self._exact = {}
+        self._patterns = []
+        self._routes = {}
+        for order, host in enumerate(hosts):
+            if isinstance(host, Match):
+                continue
+            names = host.name.split()
+            self.names.extend(name for name in names if not is_pattern(name))
+            jumps = proxy_jumps(host)
+            if jumps is None:
+                continue
+            if any(is_pattern(name) for name in names):
+                self._patterns.append((order, host.patterns, jumps))
+            else:
+                for name in names:
+                    self._exact.setdefault(name, (order, jumps))
+        self.names = list(dict.fromkeys(self.names))
+
+    def jumps(self, name: str) -> List[str]:
+        """Return the jump hosts configured for name"""
+        exact = self._exact.get(name)
+        for order, patterns, jumps in self._patterns:
+            if exact and order > exact[0]:
+                break
+            if patterns.matches(name):
+                return jumps
+        return exact[1] if exact else []
+
+    def route(self, name: str) -> Tuple[str, ...]:
+        """Return the full path to name, starting with the first jump host
+        Args:
+            name (str): host name
+        Returns:
+            Tuple[str]: the jump hosts in connection order followed by name
+        Raises:
+            RouteCycleError: the jump hosts form a cycle
+            RouteDepthError: the route is longer than max_depth jumps
+        """
+        return self._route(name, ())
+
+    def _route(self, name: str, stack: Tuple[str, ...]) -> Tuple[str, ...]:
+        route = self._routes.get(name)
+        if route is not None:
+            return route
+        if name in stack:
+            raise RouteCycleError(stack[stack.index(name):] + (name,))
+        if len(stack) >= self.max_depth:
+            raise RouteDepthError(stack[0], self.max_depth)
+        jumps = self.jumps(name)
+        if jumps:
+            route = self._route(jumps[0], stack + (name,)) + tuple(jumps[1:])
+            if name in route:
+                raise RouteCycleError(route[route.index(name):] + (name,))
+            route += (name,)
+            if len(route) > self.max_depth + 1:
+                raise RouteDepthError(stack[0] if stack else name, self.max_depth)
+        else:
+            route = (name,)
+        self._routes[name] = route
+        return route
+
+    def routes(self):
+        """Compute the routes of every named host
+        Returns:
+            (dict, dict): {name: route} and {name: error} of failed routes
+        """
+        routes, errors = {}, {}
+        for name in self.names:
+            try:
+                routes[name] = self.route(name)
+            except (RouteCycleError, RouteDepthError) as e:
+                errors[name] = e
+        return routes, errors
+
+    def cycles(self) -> List[Tuple[str, ...]]:
+        """Return the distinct cycles of jump hosts"""
+        cycles = {}
+        for error in self.routes()[1].values():
+            if isinstance(error, RouteCycleError):
+                cycles.setdefault(frozenset(error.cycle), error.cycle)
+        return list(cycles.values())
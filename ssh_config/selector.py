@@ -0,0 +1,358 @@
+"""Selector language for sets of hosts
+
+A selector is a list of terms, all of which a host must match:
+
+    db-* User=postgres not ProxyJump=bastion-eu Port!=22
+
+- `PATTERNS` or `name=PATTERNS` matches the names of Host blocks, PATTERNS is
+  a pattern list like "web*,!web-old*", see `ssh_config.patterns`
+- `Keyword=PATTERNS` matches if one value of the keyword written in the block
+  matches, `Keyword!=PATTERNS` if none does or the keyword is not set
+- `not TERM`, `TERM and TERM`, `TERM or TERM` and parentheses combine terms,
+  `and` binds tighter than `or` and can be left out
+- values with spaces are quoted, like `RemoteCommand="tmux attach"`
+
+Only the attributes written in each block are compared, not the effective
+options of `SSHConfig.resolve`. A selector is compiled once into a plan of
+predicates. Name and `=` predicates look up a `HostIndex` of the names and
+values, so only the candidate hosts are tested instead of every block.
+"""
+from typing import Dict, List, Optional, Set, Tuple
+import re
+
+from ssh_config.errors import SelectorError
+from ssh_config.keywords import Keywords
+from ssh_config.patterns import compile_patterns
+from ssh_config.profile import stats
+
+TOKEN = re.compile(
+    r"""\s*(?:(?P<quoted>"[^"]*"|'[^']*')|(?P<op>!=|=|\(|\))|(?P<word>(?:[^\s()=!"']|!(?!=))+))"""
+)
+OPERATORS = ("and", "or", "not")
+SYMBOLS = ("=", "!=", "(", ")")
+
+
+class HostIndex:
+    """Positions of the hosts by name and by attribute value
+
+    The attribute indexes are built on first use of each keyword. The index
+    is valid for the hosts it was built from, `SSHConfig.host_index` builds a new
+    one when its hosts change.
+    """
+
+    __slots__ = ["hosts", "names", "_values"]
+
+    def __init__(self, hosts):
+        """
+        Args:
+            hosts (Sequence[Host]): blocks in file order
+        """
+        self.hosts = hosts
+        self.names = {}
+        for position, host in enumerate(hosts):
+            if host.keyword == "Host":
+                for name in host.name.split():
+                    self.names.setdefault(name, []).append(position)
+        self._values = {}
+
+    def values(self, key: str) -> Dict[str, List[int]]:
+        """Return {value: positions} of the keyword key, key is canonical"""
+        values = self._values.get(key)
+        if values is None:
+            values = self._values[key] = {}
+            for position, host in enumerate(self.hosts):
+                for value in _values(host, key):
+                    values.setdefault(value, []).append(position)
+        return values
+
+
+def _values(host, key: str) -> List[str]:
+    """Persisted values of the keyword key in the block of host"""
+    value = host.get(key)
+    if value is None:
+        return []
+    value = Keywords[key].persist(value)
+    return [str(item) for item in (value if isinstance(value, list) else [value])]
+
+
+def _positions(index: Dict[str, List[int]], pattern_set) -> Set[int]:
+    """Positions of the index keys matching, the keys are far fewer than hosts"""
+    found = set()
+    for key in pattern_set.filter(index):
+        found.update(index[key])
+    return found
+
+
+class Predicate:
+    """Node of a selector plan"""
+
+    __slots__ = []
+
+    def matches(self, host) -> bool:
+        raise NotImplementedError
+
+    def candidates(self, index: HostIndex) -> Optional[Set[int]]:
+        """Positions of the hosts which can match, None if the index does not
+        narrow them down
+        """
+        return None
+
+
+class NamePredicate(Predicate):
+    __slots__ = ["patterns"]
+
+    def __init__(self, patterns: str):
+        self.patterns = compile_patterns(patterns)
+
+    def __repr__(self):
+        return f"name={','.join(self.patterns.patterns)}"
+
+    def matches(self, host) -> bool:
+        return host.keyword == "Host" and self.patterns.matches_any(host.name.split())
+
+    def candidates(self, index: HostIndex) -> Optional[Set[int]]:
+        return _positions(index.names, self.patterns)
+
+
+class AttributePredicate(Predicate):
+    __slots__ = ["key", "patterns", "negate"]
+
+    def __init__(self, key: str, patterns: str, negate: bool = False):
+        keyword = Keywords.get(key)
+        if keyword is None:
+            raise SelectorError(f"Unknown keyword, {key}")
+        self.key = keyword.key
+        self.patterns = compile_patterns(patterns)
+        self.negate = negate
+
+    def __repr__(self):
+        return f"{self.key}{'!=' if self.negate else '='}{','.join(self.patterns.patterns)}"
+
+    def matches(self, host) -> bool:
+        return self.patterns.matches_any(_values(host, self.key)) != self.negate
+
+    def candidates(self, index: HostIndex) -> Optional[Set[int]]:
+        if self.negate:
+            return None
+        return _positions(index.values(self.key), self.patterns)
+
+
+class NotPredicate(Predicate):
+    __slots__ = ["operand"]
+
+    def __init__(self, operand: Predicate):
+        self.operand = operand
+
+    def __repr__(self):
+        return f"not {self.operand!r}"
+
+    def matches(self, host) -> bool:
+        return not self.operand.matches(host)
+
+
+class AndPredicate(Predicate):
+    __slots__ = ["operands"]
+
+    def __init__(self, operands: List[Predicate]):
+        self.operands = operands
+
+    def __repr__(self):
+        return f"({' and '.join(map(repr, self.operands))})"
+
+    def matches(self, host) -> bool:
+        return all(operand.matches(host) for operand in self.operands)
+
+    def candidates(self, index: HostIndex) -> Optional[Set[int]]:
+        found = None
+        for operand in self.operands:
+            positions = operand.candidates(index)
+            if positions is not None:
+                found = positions if found is None else found & positions
+                if not found:
+                    break
+        return found
+
+
+class OrPredicate(Predicate):
+    __slots__ = ["operands"]
+
+    def __init__(self, operands: List[Predicate]):
+        self.operands = operands
+
+    def __repr__(self):
+        return f"({' or '.join(map(repr, self.operands))})"
+
+    def matches(self, host) -> bool:
+        return any(operand.matches(host) for operand in self.operands)
+
+    def candidates(self, index: HostIndex) -> Optional[Set[int]]:
+        found = set()
+        for operand in self.operands:
+            positions = operand.candidates(index)
+            if positions is None:
+                return None
+            found |= positions
+        return found
+
+
+def tokenize(text: str) -> List[Tuple[str, bool]]:
+    """Split a selector into words, quoted values and operators
+    Returns:
+        List[(str, bool)]: tokens and whether they were quoted, a quoted
+            `and` is a host name
+    Raises:
+        SelectorError: unexpected character like an unterminated quote
+    """
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None:
+            raise SelectorError(f"Unexpected character at {position + 1}: {text[position:]}")
+        quoted = match.group("quoted")
+        if quoted:
+            tokens.append((quoted[1:-1], True))
+        else:
+            tokens.append((match.group("op") or match.group("word"), False))
+        position = match.end()
+    return tokens
+
+
+class Parser:
+    """Recursive descent parser of the selector grammar
+
+        selector := and ("or" and)*
+        and      := unary (["and"] unary)*
+        unary    := "not" unary | "(" selector ")" | term
+        term     := PATTERNS | KEY ("=" | "!=") PATTERNS
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        """Next operator or keyword, None at the end or for a value"""
+        if self.position < len(self.tokens):
+            token, quoted = self.tokens[self.position]
+            if not quoted and (token in SYMBOLS or token in OPERATORS):
+                return token
+        return None
+
+    def at_end(self) -> bool:
+        return self.position >= len(self.tokens)
+
+    def take(self) -> str:
+        if self.at_end():
+            raise SelectorError(f"Unexpected end of selector, {self.text}")
+        token = self.tokens[self.position][0]
+        self.position += 1
+        return token
+
+    def take_value(self) -> str:
+        if self.peek() is not None:
+            raise SelectorError(f"Unexpected {self.peek()!r} in selector, {self.text}")
+        return self.take()
+
+    def parse(self) -> Predicate:
+        predicate = self.parse_or()
+        if not self.at_end():
+            raise SelectorError(f"Unexpected {self.take()!r} in selector, {self.text}")
+        return predicate
+
+    def parse_or(self) -> Predicate:
+        operands = [self.parse_and()]
+        while self.peek() == "or":
+            self.take()
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else OrPredicate(operands)
+
+    def parse_and(self) -> Predicate:
+        operands = [self.parse_unary()]
+        while not self.at_end() and self.peek() not in ("or", ")"):
+            if self.peek() == "and":
+                self.take()
+            operands.append(self.parse_unary())
+        return operands[0] if len(operands) == 1 else AndPredicate(operands)
+
+    def parse_unary(self) -> Predicate:
+        operator = self.peek()
+        if operator == "not":
+            self.take()
+            return NotPredicate(self.parse_unary())
+        if operator == "(":
+            self.take()
+            predicate = self.parse_or()
+            if self.at_end() or self.take() != ")":
+                raise SelectorError(f"Missing ) in selector, {self.text}")
+            return predicate
+        token = self.take_value()
+        if self.peek() in ("=", "!="):
+            operator = self.take()
+            value = self.take_value()
+            if token.lower() == "name":
+                predicate = NamePredicate(value)
+                return NotPredicate(predicate) if operator == "!=" else predicate
+            return AttributePredicate(token, value, negate=operator == "!=")
+        return NamePredicate(token)
+
+
+class Selector:
+    """Compiled selector, use `compile_selector`"""
+
+    __slots__ = ["text", "plan"]
+
+    def __init__(self, text: str):
+        """
+        Args:
+            text (str): selector, see the module documentation
+        Raises:
+            SelectorError: invalid selector
+        """
+        self.text = text
+        self.plan = Parser(text).parse()
+
+    def __repr__(self):
+        return f"Selector<{self.plan!r}>"
+
+    def matches(self, host) -> bool:
+        """Check whether host is selected"""
+        return self.plan.matches(host)
+
+    def select(self, config) -> List:
+        """Return the selected hosts in file order
+        Args:
+            config (SSHConfig or Sequence[Host]): hosts, the index of
+                `config.host_index()` is used when config has one
+        Returns:
+            List[Host]
+        """
+        index = config.host_index() if hasattr(config, "host_index") else None
+        hosts = index.hosts if index is not None else tuple(config)
+        positions = self.plan.candidates(index) if index is not None else None
+        if positions is None:
+            positions = range(len(hosts))
+        else:
+            positions = sorted(positions)
+        stats.count("selector_candidates", len(positions))
+        matches = self.plan.matches
+        return [hosts[position] for position in positions if matches(hosts[position])]
+
+
+def compile_selector(text: str) -> Selector:
+    """Compile a selector, an empty one selects every host
+    Args:
+        text (str): selector like "db-* User=postgres Port!=22"
+    Returns:
+        Selector
+    Raises:
+        SelectorError: invalid selector
+    """
+    return Selector(text.strip() or "*")
+
+
+def select(config, text: str) -> List:
+    """Return the hosts of config selected by text, see `Selector.select`"""
+    return compile_selector(text).select(config)
@@ -0,0 +1,151 @@
+"""Split a config into fragment files by a key of the host names, and merge
+them back into one file
+
+The top-level file of a sharded config keeps the global options and has one
+dispatch stanza per fragment, a Host block whose patterns match every name
+of the fragment and which Includes it:
+
+    Host *.corp.example
+        Include /path/shards/corp.example.conf
+
+Only blocks of concrete names are moved to the fragments. Pattern and Match
+blocks stay in the top-level file in their order, after the stanzas, as do
+concrete blocks which a preceding pattern or Match block may apply to, so
+the first obtained value of every option stays the same.
+"""
+from typing import Dict, List, Tuple
+import os
+import re
+import zlib
+
+from ssh_config.client import host_text
+from ssh_config.route import is_pattern
+
+STRATEGIES = ("domain", "prefix", "hash")
+# Fragment of the names without a key, like names with fewer labels than
+# needed for the domain
+REST = "_rest"
+UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def shard_key(name: str, by: str, size: int) -> Tuple[str, str]:
+    """Return the fragment of a host name and the dispatch pattern matching it
+    Args:
+        name (str): concrete host name
+        by (str): domain, prefix or hash
+        size (int): labels of the domain, characters of the prefix or
+            number of fragments of the hash
+    Returns:
+        (str, str): key and pattern
+    """
+    if by == "domain":
+        labels = name.split(".")
+        if len(labels) <= size:
+            return REST, "*"
+        domain = ".".join(labels[-size:])
+        return domain, f"*.{domain}"
+    if by == "prefix":
+        prefix = name[:size]
+        return prefix, f"{prefix}*"
+    if by == "hash":
+        return f"hash-{zlib.crc32(name.encode()) % size:04}", "*"
+    raise ValueError(f"Unknown shard strategy, {by}")
+
+
+def plan_shards(hosts, by: str, size: int) -> Tuple[Dict, List]:
+    """Assign the hosts to fragments, keeping the blocks whose order matters
+    Args:
+        hosts (Sequence[Host]): blocks in file order
+        by (str): see `shard_key`
+        size (int): see `shard_key`
+    Returns:
+        (dict, list): {key: (pattern, [Host])} and the blocks staying in the
+            top-level file in their order
+    """
+    shards = {}
+    top = []
+    preceding = []
+    after_match = False
+    for host in hosts:
+        names = host.name.split()
+        if host.keyword == "Match":
+            after_match = True
+        elif not any(is_pattern(name) for name in names):
+            keys = {shard_key(name, by, size) for name in names}
+            applies = any(patterns.matches_any(names) for patterns in preceding)
+            if len(keys) == 1 and not after_match and not applies:
+                key, pattern = keys.pop()
+                shards.setdefault(key, (pattern, []))[1].append(host)
+                continue
+        else:
+            preceding.append(host.patterns)
+        top.append(host)
+    return shards, top
+
+
+def _global_lines(global_options: Dict) -> List[str]:
+    """Lines of the global options without the Include directives"""
+    lines = []
+    for key, value in global_options.items():
+        if key == "Include":
+            continue
+        for item in (value if isinstance(value, list) else [value]):
+            lines.append(f"{key} {item}\n")
+    return lines
+
+
+def _inlined_text(host) -> str:
+    """Return the block of host without Include, the hosts it Included are
+    in the config already. A block which only Includes files is left out.
+    """
+    attrs = host.persist_attributes()
+    if "Include" in attrs and len(attrs) == 1:
+        return ""
+    return host_text(host, exclude=("Include",))
+
+
+def _write(path: str, data: str):
+    with open(path, "w") as f:
+        f.write(data)
+
+
+def shard_config(config, directory: str, by: str, size: int) -> Tuple[str, Dict]:
+    """Write config as a top-level file and fragment files in directory
+    Args:
+        config (SSHConfig): the config, its Included files are followed
+        directory (str): output directory, `config` and `shards/` are written
+        by (str): domain, prefix or hash
+        size (int): see `shard_key`
+    Returns:
+        (str, dict): path of the top-level file and {key: path of the fragment}
+    """
+    if size < 1:
+        raise ValueError("The shard size must be positive")
+    shards, top = plan_shards(config.hosts, by, size)
+    shard_dir = os.path.abspath(os.path.join(directory, "shards"))
+    os.makedirs(shard_dir, exist_ok=True)
+    paths = {}
+    lines = _global_lines(config.global_options)
+    for key, (pattern, hosts) in sorted(shards.items()):
+        path = paths[key] = os.path.join(shard_dir, f"{UNSAFE.sub('_', key)}.conf")
+        _write(path, "".join(_inlined_text(host) for host in hosts))
+        lines.append(f"Host {pattern}\n{' '*4}Include {path}\n")
+    lines.extend(_inlined_text(host) for host in top)
+    top_path = os.path.join(directory, "config")
+    _write(top_path, "".join(lines))
+    return top_path, paths
+
+
+def merge_config(config) -> str:
+    """Return the config with its Included files inlined as a single file.
+    Include directives are dropped and the blocks which only Included files
+    are left out, an Include inside a Host or Match block becomes
+    unconditional.
+    Args:
+        config (SSHConfig)
+    Returns:
+        str
+    """
+    lines = _global_lines(config.global_options)
+    lines.extend(_inlined_text(host) for host in config.hosts)
+    return "".join(lines)
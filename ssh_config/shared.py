@@ -0,0 +1,380 @@
+"""Flat binary snapshot of a parsed config, shared by worker processes
+
+The parent process parses the config once and writes a snapshot with
+`write_snapshot`. Workers open it with `SharedConfig`, which mmaps the file
+read-only, so the pages are shared between all processes, and reads the
+hosts through SharedHost views instead of building Host objects.
+
+Layout, all integers are native byte order, the snapshot is meant for the
+machine which wrote it:
+
+    header     HEADER struct
+    strings    u32[n_strings + 1], offsets of the strings in the blob
+    hosts      u32[n_hosts * 5], (keyword, name, path, first attr, attr count)
+    attrs      u32[n_attrs * 2], (key, value) string indexes, the global
+               options first, repeated keys for multiple keywords
+    buckets    u32[n_buckets], host index + 1 by crc32 of the name, 0 if empty
+    sources    i64[n_sources * 4], (path, inode, mtime_ns, size) of the files
+    blob       utf-8 encoded strings
+"""
+from array import array
+from typing import Dict, List, Tuple
+import mmap
+import os
+import struct
+import zlib
+
+from ssh_config.client import Host, resolve_options, stat_key
+from ssh_config.keywords import Keywords
+from ssh_config.match import compile_criteria, evaluate
+from ssh_config.patterns import PatternSet, split_patterns
+
+MAGIC = b"SSHCSNAP"
+VERSION = 1
+# magic, version, config path, global attr count and the section sizes
+HEADER = struct.Struct("=8sIIIIIIIII")
+NO_STRING = 0xFFFFFFFF
+HOST_FIELDS = 5
+KEYWORDS = ("Host", "Match")
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _rows(attrs: Dict) -> List[Tuple[str, str]]:
+    """Split the attributes into (key, value) rows, one per value"""
+    rows = []
+    for key, value in attrs.items():
+        for item in (value if isinstance(value, list) else [value]):
+            rows.append((key, str(item)))
+    return rows
+
+
+class _Strings:
+    """Interned strings of a snapshot being written"""
+
+    __slots__ = ["indexes", "offsets", "blob"]
+
+    def __init__(self):
+        self.indexes = {}
+        self.offsets = array("I", [0])
+        self.blob = bytearray()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def intern(self, value) -> int:
+        """Return the index of value, NO_STRING for None"""
+        if value is None:
+            return NO_STRING
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self)
+            self.blob.extend(value.encode())
+            self.offsets.append(len(self.blob))
+        return index
+
+
+def _encode_hosts(hosts, global_options: Dict, strings: _Strings) -> Tuple[array, array, int]:
+    """Return the hosts and attrs sections and the global attr count"""
+    intern = strings.intern
+    # Global options are kept as read, their values are not converted yet
+    attrs = array("I")
+    for key, value in _rows(global_options):
+        attrs.extend((intern(key), intern(value)))
+    global_count = len(attrs) // 2
+
+    table = array("I")
+    for host in hosts:
+        rows = _rows(host.persist_attributes())
+        table.extend((
+            KEYWORDS.index(host.keyword), intern(host.name), intern(host.path),
+            len(attrs) // 2, len(rows),
+        ))
+        for key, value in rows:
+            attrs.extend((intern(key), intern(value)))
+    return table, attrs, global_count
+
+
+def _encode_buckets(hosts) -> array:
+    """Return the open addressing table of the host names"""
+    buckets = array("I", [0]) * _bucket_count(len(hosts))
+    mask = len(buckets) - 1
+    seen = set()
+    for index, host in enumerate(hosts):
+        if host.name in seen:
+            # get() returns the first host with a name
+            continue
+        seen.add(host.name)
+        slot = zlib.crc32(host.name.encode()) & mask
+        while buckets[slot]:
+            slot = (slot + 1) & mask
+        buckets[slot] = index + 1
+    return buckets
+
+
+def write_snapshot(config, path: str):
+    """Write the hosts and global options of config to path.
+    The file is replaced atomically, workers which mapped the previous
+    snapshot keep reading it until they open the new one.
+    Args:
+        config (SSHConfig)
+        path (str): snapshot file
+    """
+    strings = _Strings()
+    hosts = config.hosts
+    table, attrs, global_count = _encode_hosts(hosts, config.global_options, strings)
+    buckets = _encode_buckets(hosts)
+
+    sources = array("q")
+    for source_path, source in config._sources.items():
+        sources.extend((strings.intern(source_path),) + (source[0] or (-1, -1, -1)))
+
+    header = HEADER.pack(
+        MAGIC, VERSION, strings.intern(config.config_path), global_count,
+        len(strings), len(hosts), len(attrs) // 2, len(buckets), len(sources) // 4,
+        len(strings.blob),
+    )
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        for section in (header, strings.offsets, table, attrs, buckets, sources, strings.blob):
+            data = bytes(section)
+            f.write(data)
+            f.write(b"\0" * (_align(len(data)) - len(data)))
+    os.replace(tmp_path, path)
+
+
+def _bucket_count(count: int) -> int:
+    """Power of two with a load factor of at most 1/2"""
+    size = 1
+    while size < count * 2:
+        size <<= 1
+    return size
+
+
+class SharedHost:
+    """Read-only view of a host in a SharedConfig, with the read methods of
+    Host. Values are converted on first access and kept by the view.
+    """
+
+    __slots__ = ["_config", "_index", "_criteria", "_patterns", "_converted"]
+
+    def __init__(self, config, index: int):
+        self._config = config
+        self._index = index
+        self._criteria = None
+        self._patterns = None
+        self._converted = None
+
+    def _field(self, field: int) -> int:
+        return self._config._hosts[self._index * HOST_FIELDS + field]
+
+    @property
+    def keyword(self) -> str:
+        return KEYWORDS[self._field(0)]
+
+    @property
+    def name(self) -> str:
+        return self._config._string(self._field(1))
+
+    @property
+    def path(self):
+        return self._config._string(self._field(2))
+
+    source = None
+
+    @property
+    def criteria(self):
+        """Compiled criteria of a Match block"""
+        if self._criteria is None:
+            self._criteria = compile_criteria(self.name)
+        return self._criteria
+
+    @property
+    def patterns(self):
+        """Compiled patterns of a Host block, None for a Match block"""
+        if self._patterns is None and self.keyword == "Host":
+            self._patterns = PatternSet(split_patterns(self.name))
+        return self._patterns
+
+    def matches(self, context) -> bool:
+        """Evaluate the criteria of a Match block"""
+        return evaluate(self.criteria, context)
+
+    def __repr__(self):
+        return f"Shared{self.keyword}<{self.name}>"
+
+    def __eq__(self, other):
+        return (isinstance(other, SharedHost) and self._config is other._config
+                and self._index == other._index)
+
+    def __hash__(self):
+        return hash((id(self._config), self._index))
+
+    def __getattr__(self, key):
+        """Return the attribute named key, None for a keyword not set
+        Raises:
+            AttributeError: key is not an ssh_config keyword
+        """
+        if not key.startswith("_") and key in Keywords:
+            return self.get(key)
+        raise AttributeError(f"{type(self).__name__} has no attribute {key}")
+
+    def persist_attributes(self) -> Dict:
+        """Return the attributes as written in the config"""
+        return self._config._attributes(self._field(3), self._field(4))
+
+    def _attributes(self) -> Dict:
+        if self._converted is None:
+            self._converted = Keywords.convert_block(self.persist_attributes())
+        return self._converted
+
+    def attributes(self) -> Dict:
+        """Return a copy of the converted attributes"""
+        return {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in self._attributes().items()
+        }
+
+    def get(self, key: str, default=None):
+        """Get value by key name"""
+        return self._attributes().get(key, default)
+
+    def get_all(self, key: str) -> List:
+        """Get all values of a multiple keyword like IdentityFile"""
+        value = self.get(key)
+        if value is None:
+            return []
+        return list(value) if isinstance(value, list) else [value]
+
+    def position(self, key: str = None):
+        """Positions are not kept in snapshots"""
+        return None
+
+    command = Host.command
+
+
+class SharedConfig:
+    """Read-only config mapped from a snapshot written by `write_snapshot`"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): snapshot file
+        Raises:
+            ValueError: the file is not a snapshot of this version
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = self._view = memoryview(self._map)
+        (magic, version, config_path, self._global_count, n_strings, n_hosts, n_attrs,
+         n_buckets, n_sources, blob_size) = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a config snapshot: {path}")
+        offset = _align(HEADER.size)
+        sections = []
+        for count, fmt, size in (
+            (n_strings + 1, "I", 4), (n_hosts * HOST_FIELDS, "I", 4), (n_attrs * 2, "I", 4),
+            (n_buckets, "I", 4), (n_sources * 4, "q", 8),
+        ):
+            sections.append(view[offset:offset + count * size].cast(fmt))
+            offset += _align(count * size)
+        self._offsets, self._hosts, self._attrs, self._buckets, self._sources = sections
+        self._blob = view[offset:offset + blob_size]
+        self.config_path = self._string(config_path)
+        # Views keep their compiled patterns, resolve reuses them
+        self._views = None
+
+    def __repr__(self) -> str:
+        return f"SharedConfig<Path:{self.config_path}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Release the views and unmap the file"""
+        for name in ("_offsets", "_hosts", "_attrs", "_buckets", "_sources", "_blob", "_view"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+                setattr(self, name, None)
+        self._views = None
+        self._map.close()
+
+    def _string(self, index: int):
+        if index == NO_STRING:
+            return None
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def _attributes(self, start: int, count: int) -> Dict:
+        attrs = {}
+        for row in range(start, start + count):
+            key = self._string(self._attrs[row * 2])
+            value = self._string(self._attrs[row * 2 + 1])
+            if key in attrs:
+                current = attrs[key]
+                attrs[key] = (current if isinstance(current, list) else [current]) + [value]
+            else:
+                attrs[key] = value
+        return attrs
+
+    def __len__(self):
+        return len(self._hosts) // HOST_FIELDS
+
+    def __iter__(self):
+        return (SharedHost(self, index) for index in range(len(self)))
+
+    @property
+    def hosts(self) -> Tuple:
+        if self._views is None:
+            self._views = tuple(self)
+        return self._views
+
+    @property
+    def global_options(self) -> Dict:
+        return self._attributes(0, self._global_count)
+
+    def get(self, name: str) -> SharedHost:
+        """Get the first host with name through the hash table
+        Raises:
+            NameError: no host with name
+        """
+        encoded = name.encode()
+        mask = len(self._buckets) - 1
+        slot = zlib.crc32(encoded) & mask
+        while self._buckets[slot]:
+            index = self._buckets[slot] - 1
+            string = self._hosts[index * HOST_FIELDS + 1]
+            if self._blob[self._offsets[string]:self._offsets[string + 1]] == encoded:
+                return SharedHost(self, index)
+            slot = (slot + 1) & mask
+        raise NameError(f"No name found in config, {name}")
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.get(name)
+        except NameError:
+            return False
+        return True
+
+    def changed(self) -> bool:
+        """Check whether one of the config files changed since the snapshot"""
+        for row in range(len(self._sources) // 4):
+            path = self._string(self._sources[row * 4])
+            key = tuple(self._sources[row * 4 + 1:row * 4 + 4])
+            if stat_key(path) != (None if key == (-1, -1, -1) else key):
+                return True
+        return False
+
+    def resolve(self, name: str, user: str = None, expand: bool = False) -> Dict:
+        """Compute the effective options of name, see `SSHConfig.resolve`"""
+        return resolve_options(self.hosts, self.global_options, name, user, expand)
@@ -0,0 +1,212 @@
+"""Expansion of %h, %p, %r, ... tokens and ${ENV} variables like ssh does
+"""
+from functools import lru_cache
+from typing import Dict, Tuple
+import getpass
+import hashlib
+import os
+import re
+import socket
+
+from ssh_config.profile import stats
+
+# Keywords accepting the tokens, see TOKENS in ssh_config(5)
+TOKEN_KEYWORDS = (
+    "CertificateFile", "ControlPath", "IdentityAgent", "IdentityFile",
+    "KnownHostsCommand", "LocalCommand", "LocalForward", "ProxyCommand",
+    "ProxyJump", "RemoteCommand", "RemoteForward", "UserKnownHostsFile",
+)
+# Keywords accepting ${ENV} and ~ as well
+PATH_KEYWORDS = (
+    "CertificateFile", "ControlPath", "IdentityAgent", "IdentityFile",
+    "KnownHostsCommand", "UserKnownHostsFile",
+)
+TOKENS = "%CdhiLlknprju"
+SEGMENT = re.compile(r"%(.)|\$\{([^}]*)\}|%$")
+
+EXPAND_CACHE_SIZE = 65536
+
+
+class Template:
+    """Template compiled into literal, token and environment segments"""
+
+    __slots__ = ["template", "segments", "tokens", "env"]
+
+    def __init__(self, template: str, env: bool = False):
+        """
+        Args:
+            template (str): e.g. '~/.ssh/cm-%C' or '${HOME}/.ssh/%r@%h:%p'
+            env (bool): expand ${ENV} variables
+        Raises:
+            ValueError: % at the end of template
+        """
+        self.template = template
+        segments = []
+        tokens = []
+        envs = []
+        pos = 0
+        for match in SEGMENT.finditer(template):
+            if match.group(2) is not None and not env:
+                continue
+            if match.start() > pos:
+                segments.append((None, template[pos:match.start()]))
+            token, name = match.group(1), match.group(2)
+            if name is not None:
+                segments.append(("$", name))
+                envs.append(name)
+            elif token is None:
+                raise ValueError(f"Incomplete token % in {template}")
+            elif token not in TOKENS:
+                # Tokens known only at connection time, like %T or %f, stay as is
+                segments.append((None, match.group(0)))
+            elif token == "%":
+                segments.append((None, "%"))
+            else:
+                segments.append(("%", token))
+                tokens.append(token)
+            pos = match.end()
+        if pos < len(template):
+            segments.append((None, template[pos:]))
+        self.segments = tuple(segments)
+        self.tokens = tuple(dict.fromkeys(tokens))
+        self.env = tuple(dict.fromkeys(envs))
+
+    def expand(self, values: Dict) -> str:
+        """Expand the template
+        Args:
+            values (dict): {token: value}, e.g. {"h": "example.com"}
+        Raises:
+            ValueError: undefined environment variable
+        """
+        parts = []
+        for kind, value in self.segments:
+            if kind is None:
+                parts.append(value)
+            elif kind == "%":
+                parts.append(values[value])
+            else:
+                if value not in os.environ:
+                    raise ValueError(f"Environment variable {value} is not defined")
+                parts.append(os.environ[value])
+        return "".join(parts)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(template: str, env: bool = False) -> Template:
+    """Compile the template once"""
+    return Template(template, env)
+
+
+@lru_cache(maxsize=EXPAND_CACHE_SIZE)
+def _expand(template: str, env: bool, tokens: Tuple, environ: Tuple) -> str:
+    compiled = compile_template(template, env)
+    return compiled.expand(dict(zip(compiled.tokens, tokens)))
+
+
+def expand(template: str, values: Dict, env: bool = False) -> str:
+    """Expand the template, cached per template and values of its tokens
+    Args:
+        template (str)
+        values (dict): {token: value}, like `TokenValues`
+        env (bool): expand ${ENV} variables
+    Returns:
+        str
+    """
+    if "%" not in template and (not env or "${" not in template):
+        return template
+    compiled = compile_template(template, env)
+    return _expand(
+        template, env,
+        tuple(values[token] for token in compiled.tokens),
+        tuple(os.environ.get(name) for name in compiled.env),
+    )
+
+
+stats.register_cache("templates", compile_template)
+stats.register_cache("expansions", _expand)
+
+
+@lru_cache(maxsize=1)
+def local_hostname() -> str:
+    return socket.gethostname()
+
+
+class TokenValues(dict):
+    """Values of the tokens of a connection, %C is hashed on first use"""
+
+    def __init__(self, name: str, hostname: str = None, port=None, user: str = None,
+                 host_key_alias: str = None, jump: str = None, local_user: str = None):
+        """
+        Args:
+            name (str): host name given on the command line, %n
+            hostname (str or None): HostName, '%h' in it is replaced by name
+            port (int or None): %p, default 22
+            user (str or None): remote user %r, default the local user
+            host_key_alias (str or None): %k, default name
+            jump (str or None): ProxyJump, %j
+            local_user (str or None): %u, default the current user
+        """
+        local_user = local_user or getpass.getuser()
+        hostname = hostname.replace("%h", name) if hostname else name
+        super().__init__({
+            "d": os.path.expanduser("~"),
+            "h": hostname,
+            "i": str(os.getuid()) if hasattr(os, "getuid") else "",
+            "j": jump or "",
+            "k": host_key_alias or name,
+            "L": local_hostname().split(".")[0],
+            "l": local_hostname(),
+            "n": name,
+            "p": str(port or 22),
+            "r": user or local_user,
+            "u": local_user,
+        })
+
+    def __missing__(self, key):
+        if key != "C":
+            raise KeyError(key)
+        digest = hashlib.sha1(
+            "".join(self[token] for token in "lhprj").encode()
+        ).hexdigest()
+        self["C"] = digest
+        return digest
+
+    @classmethod
+    def from_options(cls, options: Dict, name: str, user: str = None):
+        """Create the values from the effective options of a host"""
+        return cls(
+            name,
+            hostname=options.get("HostName"),
+            port=options.get("Port"),
+            user=user or options.get("User"),
+            host_key_alias=options.get("HostKeyAlias"),
+            jump=options.get("ProxyJump"),
+        )
+
+
+def expand_value(key: str, value, values: Dict):
+    """Expand the value of keyword key, each value of a list"""
+    if isinstance(value, list):
+        return [expand_value(key, item, values) for item in value]
+    if key == "HostName":
+        return value.replace("%h", values["n"]).replace("%%", "%")
+    if key not in TOKEN_KEYWORDS or not isinstance(value, str):
+        return value
+    if value.lower() == "none":
+        return value
+    if key in PATH_KEYWORDS:
+        return os.path.expanduser(expand(value, values, env=True))
+    return expand(value, values)
+
+
+def expand_options(options: Dict, name: str, user: str = None) -> Dict:
+    """Expand the tokens of the effective options of a host
+    Args:
+        options (dict): options like the result of `SSHConfig.resolve`
+        name (str): host name given on the command line
+        user (str or None): remote user given on the command line
+    Returns:
+        dict: new options with the values expanded
+    """
+    values = TokenValues.from_options(options, name, user)
+    return {key: expand_value(key, value, values) for key, value in options.items()}
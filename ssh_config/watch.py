@@ -0,0 +1,37 @@
+"""Watch the ssh config files and reload them on change
+"""
+import logging
+import threading
+
+logger = logging.getLogger("ssh_config.watch")
+
+
+class Watcher(threading.Thread):
+    """Thread polling `SSHConfig.reload_if_changed` every interval"""
+
+    def __init__(self, config, interval: float = 1.0):
+        """
+        Args:
+            config (SSHConfig): config to reload
+            interval (float): seconds between polls
+        """
+        super().__init__(name=f"ssh_config-watch-{config.config_path}", daemon=True)
+        self.config = config
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                changes = self.config.reload_if_changed()
+            except Exception:
+                logger.exception("Failed to reload %s", self.config.config_path)
+                continue
+            if changes:
+                logger.debug("Reloaded %s: %r", self.config.config_path, changes)
+
+    def stop(self, timeout: float = None):
+        """Stop watching and wait for the thread to end"""
+        self._stopped.set()
+        if self.is_alive():
+            self.join(timeout)
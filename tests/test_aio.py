@@ -0,0 +1,85 @@
+"""AsyncSSHConfig Unit Testing
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig
+from ssh_config.aio import AsyncSSHConfig
+
+sample = os.path.join(os.path.dirname(__file__), "sample")
+
+
+def make_config(tmp_path, hosts=3000):
+    os.mkdir(tmp_path / "conf.d")
+    (tmp_path / "conf.d" / "web").write_text(
+        "".join(f"Host web{i}\n    HostName 10.0.{i // 256}.{i % 256}\n" for i in range(hosts))
+    )
+    config_path = tmp_path / "config"
+    config_path.write_text(
+        "User admin\nInclude conf.d/*\nHost *.corp\n    Port 2222\n"
+    )
+    return str(config_path)
+
+
+def test_load_same_as_sync(tmp_path):
+    config_path = make_config(tmp_path, hosts=10)
+
+    async def load():
+        return await AsyncSSHConfig.load(config_path)
+
+    config = asyncio.run(load())
+    expected = SSHConfig(config_path)
+    assert [host.name for host in config] == [host.name for host in expected]
+    assert config.config.global_options == expected.global_options
+    assert config.get("web3").HostName == "10.0.0.3"
+    assert config.get("web3").position() == expected.get("web3").position()
+
+
+def test_load_yields_to_loop(tmp_path):
+    config_path = make_config(tmp_path)
+    ticks = []
+
+    async def ticker(done):
+        while not done.is_set():
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        done = asyncio.Event()
+        task = asyncio.create_task(ticker(done))
+        config = await AsyncSSHConfig.load(config_path, chunk_size=100)
+        done.set()
+        await task
+        return config
+
+    config = asyncio.run(main())
+    assert len(config) == 3001
+    # 6000 lines and 3000 hosts in chunks of 100
+    assert len(ticks) >= 90
+
+
+def test_find_resolve_write(tmp_path):
+    config_path = make_config(tmp_path, hosts=20)
+
+    async def main():
+        config = await AsyncSSHConfig.load(config_path, chunk_size=5)
+        found = await config.find("web1*")
+        options = await config.resolve("web1.corp")
+        await config.write(str(tmp_path / "written"))
+        return found, options
+
+    found, options = asyncio.run(main())
+    assert [host.name for host in found] == ["web1"] + [f"web{i}" for i in range(10, 20)]
+    assert options == SSHConfig(config_path).resolve("web1.corp")
+    assert options["User"] == "admin" and options["Port"] == 2222
+    # Written elsewhere, the Included hosts are copied in
+    written = SSHConfig(str(tmp_path / "written"))
+    assert [host.name for host in written] == [host.name for host in SSHConfig(config_path)]
+    assert "Include" not in (tmp_path / "written").read_text()
+
+
+def test_load_sample():
+    config = asyncio.run(AsyncSSHConfig.load(sample))
+    assert config.get("server1").HostName == "203.0.113.76"
@@ -85,6 +85,8 @@ def test_add_config():
     assert result.exit_code ==0
     assert "HostName 1.1.1.1" in result.output
     os.remove(sample_add)
+    if os.path.exists(f"{sample_add}.journal"):
+        os.remove(f"{sample_add}.journal")
 
 
 def test_update_config():
@@ -93,9 +95,15 @@ def test_update_config():
     shutil.copy(sample, sample_update)
     runner = CliRunner()
     result = runner.invoke(cli.cli,
-        ['-f', sample_update, 'update', 'server_cmd_1', 'Port=2202'], input="y")
+        ['-f', sample_update, 'update', 'server_cmd_1', 'HostName=1.2.3.4'], input="y")
     assert result.exit_code ==0
+    # The edited host is shown before the confirmation
+    shown = result.output.split("=" * 25)[1].split("Information is correct")[0]
+    assert "HostName 1.2.3.4" in shown
+    assert "203.0.113.76" not in shown
     os.remove(sample_update)
+    if os.path.exists(f"{sample_update}.journal"):
+        os.remove(f"{sample_update}.journal")
 
 
 def test_rename_config():
@@ -107,6 +115,8 @@ def test_rename_config():
         ['-f', sample_rename, 'rename', 'server_cmd_1', 'server_cmd_rename'], input="y")
     assert result.exit_code ==0
     os.remove(sample_rename)
+    if os.path.exists(f"{sample_rename}.journal"):
+        os.remove(f"{sample_rename}.journal")
 
 def test_remove_config():
     """Test remove ssh host to config"""
@@ -117,3 +127,21 @@ def test_remove_config():
         ['-f', sample_rm, 'remove', 'server1'], input="y")
     assert result.exit_code == 0
     os.remove(sample_rm)
+    if os.path.exists(f"{sample_rm}.journal"):
+        os.remove(f"{sample_rm}.journal")
+
+
+def test_diff_config():
+    """Test diff of two configs"""
+    sample_diff = os.path.join(os.path.dirname(sample), "sample.diff")
+    config = SSHConfig(sample)
+    config.update("server1", {"HostName": "203.0.113.1"})
+    config.write(sample_diff)
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['diff', sample, sample])
+    assert result.exit_code == 0
+    assert result.output == ""
+    result = runner.invoke(cli.cli, ['diff', '--format', 'json', sample, sample_diff])
+    os.remove(sample_diff)
+    assert result.exit_code == 1
+    assert '"HostName": [' in result.output
@@ -11,7 +11,8 @@ from contextlib import redirect_stdout
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from ssh_config import SSHConfig, Host
-from ssh_config.errors import EmptySSHConfig, WrongSSHConfig, HostExistsError
+from ssh_config.client import parse_config
+from ssh_config.errors import EmptySSHConfig, WrongSSHConfig, HostExistsError, ConfigSyntaxError
 
 logging.basicConfig(level=logging.INFO)
 sample = os.path.join(os.path.dirname(__file__), "sample")
@@ -64,6 +65,9 @@ class TestSSHConfig(unittest.TestCase):
         configs.update("server1", {"IdentityFile": "~/.ssh/id_rsa_new"})
         self.assertRaises(AttributeError, configs.update, "server1", [])
         self.assertEqual(configs.get("server1").IdentityFile, "~/.ssh/id_rsa_new")
+        configs.update("server1", {"IdentityFile": None, "ProxyJump": "bastion"})
+        self.assertIsNone(configs.get("server1").IdentityFile)
+        self.assertEqual(configs.get("server1").ProxyJump, "bastion")
 
         attrs = {
             "HostName": "example.com",
@@ -142,6 +146,21 @@ class TestSSHConfig(unittest.TestCase):
             sorted(configs.asdict(), key=lambda h: h['Host']),
         )
 
+    def test_position(self):
+        configs = SSHConfig(sample)
+        host = configs.get("server1")
+        self.assertEqual((sample, 3, 1), host.position())
+        self.assertEqual((sample, 4, 5), host.position("HostName"))
+        self.assertIsNone(host.position("ProxyJump"))
+
+    def test_syntax_error_position(self):
+        with self.assertRaises(ConfigSyntaxError) as context:
+            parse_config("Host server1\n    HostName\n", "config")
+        self.assertEqual(("config", 2, 5), (
+            context.exception.path, context.exception.line, context.exception.column
+        ))
+        self.assertTrue(str(context.exception).startswith("config:2:5: "))
+
 
 if __name__ == "__main__":
     unittest.main()
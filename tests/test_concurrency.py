@@ -0,0 +1,81 @@
+"""SSHConfig concurrent readers and writer Unit Testing
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, Host
+
+READERS = 8
+WRITES = 300
+
+
+def make_config(tmp_path):
+    config_path = str(tmp_path / "config")
+    with open(config_path, "w") as f:
+        for i in range(20):
+            f.write(f"Host server{i}\n    HostName h{2200 + i}\n    Port {2200 + i}\n")
+        f.write("Host *\n    User admin\n")
+    return config_path
+
+
+def test_update_copies_host(tmp_path):
+    config = SSHConfig(make_config(tmp_path))
+    before = config.get("server0")
+    hosts = config.hosts
+    config.update("server0", {"Port": 22})
+    assert before.Port == 2200
+    assert config.get("server0").Port == 22
+    assert hosts[0] is before
+    config.rename("server0", "renamed")
+    assert before.name == "server0"
+    config.remove("renamed")
+    assert len(hosts) == 21 and len(config.hosts) == 20
+
+
+def test_readers_and_writer(tmp_path):
+    config = SSHConfig(make_config(tmp_path))
+    done = threading.Event()
+    errors = []
+
+    def reader():
+        try:
+            while not done.is_set():
+                hosts = config.hosts
+                names = [host.name for host in hosts]
+                assert len(names) == len(set(names))
+                for host in hosts:
+                    if host.Port is not None:
+                        # HostName and Port are always updated together
+                        assert host.HostName == f"h{host.Port}", host
+                options = config.resolve("server1")
+                assert options["HostName"] == f"h{options['Port']}"
+                assert options["User"] == "admin"
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+
+    def writer():
+        try:
+            for i in range(WRITES):
+                port = 3000 + i
+                config.update(f"server{i % 20}", {"Port": port, "HostName": f"h{port}"})
+                config.add(Host(f"extra{i}", {"HostName": f"h{port}", "Port": port}))
+                if i % 2:
+                    config.remove(f"added{i - 1}")
+                config.rename(f"extra{i}", f"added{i}")
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+        finally:
+            done.set()
+
+    threads = [threading.Thread(target=reader) for _ in range(READERS)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert not errors
+    assert config.get(f"server{(WRITES - 1) % 20}").Port == 3000 + WRITES - 1
+    assert len(config.hosts) == 21 + WRITES // 2
@@ -0,0 +1,53 @@
+"""SSHConfig diff Unit Testing
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig
+
+
+sample = os.path.join(os.path.dirname(__file__), "sample")
+
+
+def test_fingerprint():
+    config = SSHConfig(sample)
+    other = SSHConfig(sample)
+    assert config.fingerprint == other.fingerprint
+    host = other.get("server1")
+    assert host.fingerprint == config.get("server1").fingerprint
+
+    host.set("Port", 2222)
+    assert host.fingerprint != config.get("server1").fingerprint
+    assert config.fingerprint != other.fingerprint
+    fingerprint = host.fingerprint
+    host.update({"Port": 22})
+    assert host.fingerprint != fingerprint
+    fingerprint = host.fingerprint
+    host.set_name("server1 server1-alias")
+    assert host.fingerprint != fingerprint
+    host.set_name("server1")
+    assert host.fingerprint == fingerprint
+
+
+def test_diff():
+    config = SSHConfig(sample)
+    other = SSHConfig(sample)
+    assert not config.diff(other)
+
+    other.remove("server1")
+    other.update("server_cmd_1", {"Port": 22, "User": "user"})
+    changes = config.diff(other)
+    assert [host.name for host in changes.removed] == ["server1"]
+    assert changes.asdict() == {
+        "added": [],
+        "removed": ["server1"],
+        "changed": {"server_cmd_1": {"Port": [2202, 22], "User": [None, "user"]}},
+        "locations": {"server1": f"{sample}:3:1", "server_cmd_1": f"{sample}:8:1"},
+    }
+    assert changes.text() == (
+        f"- Host server1 ({sample}:3:1)\n"
+        f"~ Host server_cmd_1 ({sample}:8:1)\n"
+        f"    Port: 2202 -> 22 ({sample}:10:1)\n"
+        "    User: None -> user"
+    )
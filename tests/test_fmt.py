@@ -0,0 +1,130 @@
+"""Formatter Unit Testing
+"""
+import os
+import sys
+
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli
+from ssh_config.fmt import format_config, format_files
+from ssh_config.lint import lint
+
+sample = os.path.join(os.path.dirname(__file__), "sample")
+
+messy = """# managed by hand
+hostname=ignored.example
+  user admin
+
+HOST   web1   web2 # frontends
+  port=2222
+	# key of the web hosts
+  identityfile ~/.ssh/id_web
+  HostName 10.0.0.1
+
+
+  IdentityFile ~/.ssh/id_web_old
+  Include conf.d/web
+  user deploy
+match exec "test  -f /tmp/x"
+ ProxyCommand ssh -W %h:%p -o Foo=bar bastion
+# trailing
+"""
+
+expected = """# managed by hand
+HostName ignored.example
+User admin
+
+Host web1 web2 # frontends
+    HostName 10.0.0.1
+    Port 2222
+    # key of the web hosts
+    IdentityFile ~/.ssh/id_web
+    IdentityFile ~/.ssh/id_web_old
+    Include conf.d/web
+    User deploy
+
+Match exec "test  -f /tmp/x"
+    ProxyCommand ssh -W %h:%p -o Foo=bar bastion
+
+# trailing
+"""
+
+
+def test_format():
+    assert format_config(messy) == expected
+
+
+inline_comments = """Host web1  # frontends
+    LocalCommand echo a#b
+    RemoteCommand "echo # not a comment"
+    User deploy\t# inline
+Match exec "grep -q #x /etc/hosts"
+"""
+
+
+def test_inline_comments():
+    assert format_config(inline_comments) == """Host web1  # frontends
+    User deploy\t# inline
+    LocalCommand echo a#b
+    RemoteCommand "echo # not a comment"
+
+Match exec "grep -q #x /etc/hosts"
+"""
+
+
+def test_inline_comments_parsed_alike(tmp_path):
+    path = tmp_path / "config"
+    path.write_text(inline_comments)
+    host = SSHConfig(str(path)).get("web1")
+    assert host.LocalCommand == "echo a#b"
+    assert host.RemoteCommand == '"echo # not a comment"'
+    assert host.User == "deploy"
+    assert [d.code for d in lint(str(path))] == []
+
+
+def test_idempotent():
+    assert format_config(expected) == expected
+    with open(sample) as f:
+        once = format_config(f.read())
+    assert format_config(once) == once
+
+
+def test_same_config(tmp_path):
+    with open(sample) as f:
+        data = f.read()
+    path = tmp_path / "config"
+    path.write_text(format_config(data))
+    formatted = SSHConfig(str(path))
+    original = SSHConfig(sample)
+    assert formatted.asdict() == original.asdict()
+    assert formatted.global_options == original.global_options
+
+
+def test_format_files(tmp_path):
+    os.mkdir(tmp_path / "conf.d")
+    canonical = tmp_path / "conf.d" / "web"
+    canonical.write_text("Host web3\n    Port 22\n")
+    messy_path = tmp_path / "config"
+    messy_path.write_text("Include conf.d/*\nhost db\n  port 22\n")
+    mtime = os.stat(canonical).st_mtime_ns
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["-f", str(messy_path), "fmt", "--check"])
+    assert result.exit_code == 1
+    assert result.output == f"Would format {messy_path}\n"
+    result = runner.invoke(cli.cli, ["-f", str(messy_path), "fmt"])
+    assert result.exit_code == 0
+    assert messy_path.read_text() == "Include conf.d/*\n\nHost db\n    Port 22\n"
+    assert os.stat(canonical).st_mtime_ns == mtime
+    result = runner.invoke(cli.cli, ["-f", str(messy_path), "fmt", "--check"])
+    assert result.exit_code == 0
+
+
+def test_worker_pool(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"fragment{i}"
+        path.write_text(f"host web{i}\nport 22\n" if i % 2 else f"Host web{i}\n    Port 22\n")
+        paths.append(str(path))
+    assert format_files(paths, workers=2) == [paths[1], paths[3]]
+    assert format_files(paths, check=True, workers=2) == []
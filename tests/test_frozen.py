@@ -0,0 +1,90 @@
+"""Frozen hosts and configs Unit Testing
+"""
+import os
+import pickle
+import sys
+from functools import lru_cache
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, Host
+from ssh_config.frozen import FrozenConfig, FrozenHost
+
+sample = os.path.join(os.path.dirname(__file__), "sample")
+
+
+def test_freeze():
+    config = SSHConfig(sample)
+    frozen = config.freeze()
+    assert isinstance(frozen, FrozenConfig)
+    assert len(frozen) == len(config.hosts)
+    host = frozen.get("server1")
+    assert isinstance(host, FrozenHost)
+    assert host.HostName == "203.0.113.76"
+    assert host.ProxyJump is None
+    with pytest.raises(AttributeError):
+        host.NoSuchKeyword
+    with pytest.raises(AttributeError):
+        host.name = "other"
+    with pytest.raises(AttributeError):
+        frozen.hosts = ()
+
+
+def test_hash_and_equality():
+    first = SSHConfig(sample).freeze()
+    second = SSHConfig(sample).freeze()
+    assert first == second
+    assert hash(first) == hash(second)
+    assert len({first, second}) == 1
+
+    config = SSHConfig(sample)
+    config.update("server1", {"Port": 2222})
+    changed = config.freeze()
+    assert changed != first
+    assert changed.get("server1").Port == 2222
+    assert first.get("server1").Port is None
+
+
+def test_multiple_values_are_tuples():
+    host = FrozenHost.from_host(Host("web", {"IdentityFile": ["~/.ssh/a", "~/.ssh/b"]}))
+    assert host.IdentityFile == ("~/.ssh/a", "~/.ssh/b")
+    assert host.get_all("IdentityFile") == ("~/.ssh/a", "~/.ssh/b")
+    assert host.thaw().get_all("IdentityFile") == ["~/.ssh/a", "~/.ssh/b"]
+    hash(host)
+
+
+def test_pickle():
+    frozen = SSHConfig(sample).freeze()
+    loaded = pickle.loads(pickle.dumps(frozen))
+    assert loaded == frozen
+    assert hash(loaded) == hash(frozen)
+
+
+def test_lru_cache_key():
+    calls = []
+
+    @lru_cache(maxsize=None)
+    def names(config):
+        calls.append(config)
+        return config.names()
+
+    assert names(SSHConfig(sample).freeze()) == names(SSHConfig(sample).freeze())
+    assert len(calls) == 1
+
+
+def test_resolve():
+    config = SSHConfig(sample)
+    frozen = config.freeze()
+    assert frozen.resolve("server_cmd_3") == config.resolve("server_cmd_3")
+    options = frozen.resolve("server_cmd_3")
+    options["Port"] = 1
+    assert frozen.resolve("server_cmd_3")["Port"] == 2202
+
+
+def test_host_getattr():
+    host = Host("web", {"HostName": "10.0.0.1"})
+    assert host.HostName == "10.0.0.1"
+    assert host.User is None
+    with pytest.raises(AttributeError):
+        host.NoSuchKeyword
@@ -0,0 +1,91 @@
+"""IdentityFile inventory Unit Testing
+"""
+import json
+import os
+import sys
+
+import paramiko
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli
+from ssh_config.identity import MISSING, WORLD_READABLE, IdentityManager, load_identity, load_key
+from ssh_config.mux import MuxManager
+
+config_data = """Host web1 web2
+    IdentityFile {tmp}/id_%h
+    IdentityFile {tmp}/id_shared
+Host db1
+    HostName db1.example.com
+    IdentityFile {tmp}/id_shared
+    IdentityFile {tmp}/id_%h
+Host *
+    IdentityFile none
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    key = paramiko.RSAKey.generate(1024)
+    for name in ("id_shared", "id_web1", "id_db1.example.com"):
+        key.write_private_key_file(str(tmp_path / name))
+    os.chmod(tmp_path / "id_db1.example.com", 0o644)
+    path = tmp_path / "config"
+    path.write_text(config_data.format(tmp=tmp_path))
+    return str(path)
+
+
+def test_audit(config_path, tmp_path):
+    manager = IdentityManager(SSHConfig(config_path))
+    assert manager.identities() == {
+        f"{tmp_path}/id_web1": ["web1 web2"],
+        f"{tmp_path}/id_web2": ["web1 web2"],
+        f"{tmp_path}/id_shared": ["web1 web2", "db1"],
+        f"{tmp_path}/id_db1.example.com": ["db1"],
+    }
+    assert manager.audit() == {
+        f"{tmp_path}/id_web2": MISSING,
+        f"{tmp_path}/id_db1.example.com": WORLD_READABLE,
+    }
+
+
+def test_load_key(config_path, tmp_path):
+    path = str(tmp_path / "id_shared")
+    key = load_key(path)
+    assert load_key(path) is key
+    paramiko.RSAKey.generate(1024).write_private_key_file(path)
+    assert load_key(path) is not key
+
+
+def test_load_identity(config_path, tmp_path):
+    assert load_identity([str(tmp_path / "id_web2")]) is None
+    key = load_identity([str(tmp_path / "id_web2"), str(tmp_path / "id_shared")])
+    assert key is load_key(str(tmp_path / "id_shared"))
+
+
+def test_ssh_command_key(config_path, monkeypatch):
+    connected = []
+
+    def client(self, name, password=None):
+        connected.append((name, password))
+        raise paramiko.SSHException("refused")
+
+    def getpass(prompt):
+        raise AssertionError("asked for a password")
+
+    monkeypatch.setattr(MuxManager, "client", client)
+    monkeypatch.setattr(cli.getpass, "getpass", getpass)
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['-f', config_path, 'ssh', 'db1'])
+    assert "Failed to connect to ssh, refused" in result.output
+    assert connected == [("db1", None)]
+
+
+def test_audit_command(config_path, tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['-f', config_path, 'keys', 'audit', '--format', 'json'])
+    assert result.exit_code == 1
+    assert json.loads(result.output)[f"{tmp_path}/id_web2"] == {
+        "problem": MISSING, "hosts": ["web1 web2"],
+    }
@@ -0,0 +1,118 @@
+"""Journal Unit Testing
+"""
+import json
+import os
+import shutil
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli
+from ssh_config.errors import JournalError
+from ssh_config.journal import Journal, apply_patch, make_patch
+
+sample = os.path.join(os.path.dirname(__file__), "sample")
+
+
+def test_patch():
+    before = "Host a\n    Port 22\nHost b\n    User x\n"
+    after = "Host a\n    Port 2222\nHost b\n    User x\nHost c\n"
+    patch = make_patch(before, after)
+    assert apply_patch(before, patch) == after
+    assert apply_patch(before, make_patch(before, "")) == ""
+    assert apply_patch("", make_patch("", after)) == after
+
+
+def test_record_and_undo(tmp_path):
+    path = tmp_path / "config"
+    texts = ["Host a\n    Port 22\n", "Host a\n    Port 2222\n",
+             "Host a\n    Port 2222\nHost b\n", "Host b\n"]
+    path.write_text(texts[0])
+    journal = Journal(str(path))
+    for op, text in zip(("update", "add", "remove"), texts[1:]):
+        before = path.read_text()
+        path.write_text(text)
+        journal.record(op, "a", before, text)
+    assert journal.replay() == texts[3]
+    assert journal.replay(3) == texts[0]
+    entries = journal.entries()
+    # One checkpoint, the edits only store their lines
+    assert [entry["op"] for entry in entries] == ["checkpoint", "update", "add", "remove"]
+    assert "text" not in entries[1]
+
+    undone = journal.undo(2)
+    assert [entry["op"] for entry in undone] == ["remove", "add"]
+    assert path.read_text() == texts[1]
+    history = journal.history()
+    assert [(edit["op"], edit["undone"]) for edit in history] == [
+        ("remove", True), ("add", True), ("update", False)
+    ]
+    # New edits continue from the state after the undo
+    journal.record("add", "c", texts[1], texts[1] + "Host c\n")
+    path.write_text(texts[1] + "Host c\n")
+    assert journal.replay() == texts[1] + "Host c\n"
+    journal.undo(2)
+    assert path.read_text() == texts[0]
+    with pytest.raises(JournalError):
+        journal.undo(1)
+
+
+def test_external_change(tmp_path):
+    path = tmp_path / "config"
+    path.write_text("Host a\n")
+    journal = Journal(str(path))
+    journal.record("add", "b", "Host a\n", "Host a\nHost b\n")
+    path.write_text("Host a\nHost b\nHost edited\n")
+    with pytest.raises(JournalError):
+        journal.undo(1)
+    journal.record("remove", "a", path.read_text(), "Host b\nHost edited\n")
+    path.write_text("Host b\nHost edited\n")
+    assert journal.entries()[-2]["op"] == "checkpoint"
+    assert [edit["checkpointed"] for edit in journal.history()] == [False, True]
+    with pytest.raises(JournalError):
+        journal.undo(2)
+    journal.undo(1)
+    assert path.read_text() == "Host a\nHost b\nHost edited\n"
+
+
+def test_invalid_journal(tmp_path):
+    journal = Journal(str(tmp_path / "config"))
+    assert journal.history() == []
+    with pytest.raises(JournalError):
+        journal.undo(1)
+    with open(journal.path, "w") as f:
+        f.write("{not json\n")
+    with pytest.raises(JournalError):
+        journal.entries()
+
+
+def test_cli_history_undo(tmp_path):
+    path = str(tmp_path / "config")
+    shutil.copy(sample, path)
+    original = open(sample).read()
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["-f", path, "update", "server_cmd_2", "Port=2022"],
+                           input="y")
+    assert result.exit_code == 0
+    result = runner.invoke(cli.cli, ["-f", path, "remove", "server1"], input="y")
+    assert result.exit_code == 0
+    assert oct(os.stat(f"{path}.journal").st_mode & 0o777) == "0o600"
+    lines = open(f"{path}.journal").read().splitlines()
+    assert json.loads(lines[0])["text"] == original
+
+    result = runner.invoke(cli.cli, ["-f", path, "history"])
+    assert result.exit_code == 0
+    assert [line.split()[2:] for line in result.output.splitlines()] == [
+        ["remove", "server1"], ["update", "server_cmd_2"]
+    ]
+    result = runner.invoke(cli.cli, ["-f", path, "undo"], input="y")
+    assert result.exit_code == 0
+    assert SSHConfig(path).get("server1")
+    result = runner.invoke(cli.cli, ["-f", path, "undo", "1"], input="y")
+    assert result.exit_code == 0
+    assert open(path).read() == original
+    result = runner.invoke(cli.cli, ["-f", path, "undo"], input="y")
+    assert result.exit_code == 1
+    assert "can be undone" in result.output
@@ -0,0 +1,53 @@
+"""Keyword registry Unit Testing
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config.errors import KeywordError
+from ssh_config.keywords import Keywords, time_interval
+
+
+def test_registry():
+    keys = [keyword.key for keyword in Keywords]
+    assert len(keys) == len(set(keys)) == len(Keywords)
+    assert keys.count("GlobalKnownHostsFile") == 1
+    assert Keywords.get("hostname").key == "HostName"
+    # The older name is written back as is
+    assert Keywords["pubkeyacceptedkeytypes"].key == "PubkeyAcceptedKeyTypes"
+    assert "serveraliveinterval" in Keywords
+    assert Keywords.canonical("NoSuchKeyword") is None
+    with pytest.raises(KeywordError):
+        Keywords["NoSuchKeyword"]
+
+
+def test_convert_block():
+    raw = {"port": "2202", "hostname": "203.0.113.76", "IdentitiesOnly": "yes", "Unknown": "1"}
+    converted = Keywords.convert_block(raw)
+    assert converted == {"HostName": "203.0.113.76", "Port": 2202, "IdentitiesOnly": True}
+    assert list(converted) == ["HostName", "Port", "IdentitiesOnly"]
+    assert Keywords.persist_block(converted)["IdentitiesOnly"] == "yes"
+    with pytest.raises(KeywordError):
+        Keywords.convert_block(raw, strict=True)
+    for attrs in ({"Port": "70000"}, {"Compression": "maybe"}, {"ControlPersist": "10x"},
+                  {"IdentitiesOnly": "sure"}):
+        with pytest.raises(ValueError):
+            Keywords.convert_block(attrs, validate=True)
+    assert Keywords.convert_block({"ControlPersist": "1h30m", "LogLevel": "debug2"},
+                                  validate=True)
+    for value in ("yes", "no", "ask", "accept-new", "off"):
+        assert Keywords.convert_block({"StrictHostKeyChecking": value}, validate=True) == {
+            "StrictHostKeyChecking": value
+        }
+    with pytest.raises(ValueError):
+        Keywords.convert_block({"StrictHostKeyChecking": "maybe"}, validate=True)
+
+
+def test_converters():
+    assert time_interval("90") == 90
+    assert time_interval("1h30m") == 5400
+    assert time_interval("2W") == 1209600
+    with pytest.raises(ValueError):
+        time_interval("1h 30m")
@@ -0,0 +1,105 @@
+"""known_hosts index Unit Testing
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import sys
+
+import paramiko
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli
+from ssh_config.known_hosts import (
+    MISMATCH, OK, REVOKED, UNKNOWN, KnownHosts, check_host, host_key_policy,
+)
+
+KEY = "AAAAC3NzaC1lZDI1NTE5AAAAIKnown"
+OTHER_KEY = "AAAAC3NzaC1lZDI1NTE5AAAAIOther"
+
+
+def hashed(name, salt=b"0123456789abcdefghij"):
+    digest = hmac.new(salt, name.encode(), hashlib.sha1).digest()
+    return f"|1|{base64.b64encode(salt).decode()}|{base64.b64encode(digest).decode()}"
+
+
+known_hosts_data = f"""# comment
+web1.example.com,203.0.113.1 ssh-ed25519 {KEY}
+[web1.example.com]:2202 ssh-ed25519 {OTHER_KEY}
+{hashed("db1.example.com")} ssh-ed25519 {KEY}
+*.corp,!bad.corp ssh-ed25519 {KEY}
+@revoked old.example.com ssh-ed25519 {OTHER_KEY}
+"""
+
+
+@pytest.fixture
+def known_hosts_path(tmp_path):
+    path = tmp_path / "known_hosts"
+    path.write_text(known_hosts_data)
+    return str(path)
+
+
+def test_lookup(known_hosts_path):
+    known_hosts = KnownHosts().load(known_hosts_path)
+    assert [e.line for e in known_hosts.lookup("WEB1.example.com")] == [2]
+    assert [e.line for e in known_hosts.lookup("web1.example.com", 2202)] == [3]
+    assert [e.line for e in known_hosts.lookup("db1.example.com")] == [4]
+    assert [e.line for e in known_hosts.lookup("web.corp")] == [5]
+    assert known_hosts.lookup("bad.corp") == ()
+    assert known_hosts.verify("203.0.113.1", 22, "ssh-ed25519", KEY) == OK
+    assert known_hosts.verify("db1.example.com", 22, "ssh-ed25519", OTHER_KEY) == MISMATCH
+    assert known_hosts.verify("old.example.com", 22, "ssh-ed25519", OTHER_KEY) == REVOKED
+    assert known_hosts.verify("new.example.com", 22, "ssh-ed25519", KEY) == UNKNOWN
+
+
+def test_check(tmp_path, known_hosts_path):
+    path = tmp_path / "config"
+    path.write_text(f"""Host web1 db1
+    HostName %h.example.com
+    UserKnownHostsFile {known_hosts_path}
+    GlobalKnownHostsFile none
+Host web1-alt
+    HostName web1.example.com
+    Port 2202
+    UserKnownHostsFile {known_hosts_path}
+Host new
+    HostName new.example.com
+    UserKnownHostsFile {known_hosts_path}
+    GlobalKnownHostsFile none
+""")
+    config = SSHConfig(str(path))
+    assert check_host(config, "web1-alt")[:2] == ("[web1.example.com]:2202", OK)
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['-f', str(path), 'hostkeys', 'check', '--format', 'json'])
+    assert result.exit_code == 1
+    output = json.loads(result.output)
+    assert output["db1"] == {"host": "db1.example.com", "status": OK, "keys": ["ssh-ed25519"]}
+    assert output["new"]["status"] == UNKNOWN
+
+
+class FakeKey:
+    def __init__(self, key):
+        self.key = key
+
+    def get_name(self):
+        return "ssh-ed25519"
+
+    def get_base64(self):
+        return self.key
+
+
+def test_policy(known_hosts_path):
+    options = {"UserKnownHostsFile": known_hosts_path, "GlobalKnownHostsFile": "none"}
+    policy = host_key_policy(options)
+    policy.missing_host_key(None, "web1.example.com", FakeKey(KEY))
+    policy.missing_host_key(None, "unknown.example.com", FakeKey(KEY))
+    with pytest.raises(paramiko.SSHException):
+        policy.missing_host_key(None, "[web1.example.com]:2202", FakeKey(KEY))
+    strict = host_key_policy(dict(options, StrictHostKeyChecking="yes"))
+    with pytest.raises(paramiko.SSHException):
+        strict.missing_host_key(None, "unknown.example.com", FakeKey(KEY))
+    accept_new = host_key_policy(dict(options, StrictHostKeyChecking="accept-new"))
+    accept_new.missing_host_key(None, "unknown.example.com", FakeKey(KEY))
@@ -0,0 +1,86 @@
+"""Config linter Unit Testing
+"""
+import json
+import os
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import cli
+from ssh_config.lint import lint
+
+sample = os.path.join(os.path.dirname(__file__), "sample")
+
+config_data = """User admin
+Host web1
+    HostName 10.0.0.1
+    Port 70000
+    Compresion yes
+    Compression maybe
+Host *.corp
+    ServerAliveInterval 30
+Host web1
+    HostName 10.0.0.2
+    Port 22
+    Port 2222
+Host db1.corp web1
+    ServerAliveInterval 10
+    User root
+Match host
+    User nobody
+Match localnetwork 10.0.0.0/8
+    User office
+Host broken
+    Nonsense
+Include missing.d/*
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config"
+    path.write_text(config_data)
+    return str(path)
+
+
+def test_lint(config_path):
+    diagnostics = [(d.line, d.code) for d in lint(config_path)]
+    assert diagnostics == [
+        (4, "invalid-value"),
+        (5, "unknown-keyword"),
+        (6, "invalid-value"),
+        (9, "duplicate-host"),
+        (10, "shadowed"),
+        (11, "shadowed"),
+        (12, "repeated"),
+        (15, "shadowed"),
+        (16, "invalid-match"),
+        (18, "unsupported-match"),
+        (21, "syntax"),
+        (22, "missing-include"),
+    ]
+
+
+def test_lint_sample():
+    assert lint(sample) == []
+
+
+def test_lint_strict_host_key_checking(tmp_path):
+    path = tmp_path / "config"
+    path.write_text("Host web1\n    StrictHostKeyChecking accept-new\n"
+                    "Host web2\n    StrictHostKeyChecking off\n")
+    assert lint(str(path)) == []
+
+
+def test_lint_command(config_path):
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['-f', sample, 'lint'])
+    assert result.exit_code == 0
+    result = runner.invoke(cli.cli, ['-f', config_path, 'lint', '--format', 'json'])
+    assert result.exit_code == 1
+    assert json.loads(result.output)[0] == {
+        "path": config_path, "line": 4, "column": 5, "severity": "error", "code": "invalid-value",
+        "message": "Port: Expected 1 to 65535, not 70000",
+    }
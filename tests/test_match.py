@@ -0,0 +1,113 @@
+"""Match block Unit Testing
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig
+from ssh_config.client import Match
+from ssh_config.errors import ConfigSyntaxError
+from ssh_config.match import ExecCache, ExecCriterion, MatchContext, UnsupportedCriterion
+from ssh_config.match import compile_criteria, evaluate
+
+config_data = """User default
+Host bastion
+    HostName 203.0.113.1
+Match originalhost *.corp,!db.corp user deploy
+    Port 2222
+Match host 10.0.0.* final
+    ForwardAgent yes
+Host *.corp
+    HostName 10.0.0.1
+    Port 22
+Match all
+    ServerAliveInterval 30
+"""
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "config"
+    path.write_text(config_data)
+    return SSHConfig(str(path))
+
+
+def test_compile_criteria():
+    criteria = compile_criteria('host *.corp,!db.corp !user root exec "test -f %h"')
+    assert [repr(c) for c in criteria] == ["host *.corp,!db.corp", "!user root", "exec 'test -f %h'"]
+    context = MatchContext("web.corp", user="deploy", local_user="me")
+    assert evaluate(criteria[:2], context)
+    assert not evaluate(criteria[:2], MatchContext("db.corp", user="deploy"))
+    assert not evaluate(criteria[:2], MatchContext("web.corp", user="root"))
+    with pytest.raises(ValueError):
+        compile_criteria("host")
+    with pytest.raises(ValueError):
+        compile_criteria("localnetwork")
+
+
+def test_unsupported_criteria(tmp_path):
+    criteria = compile_criteria("localnetwork 10.0.0.0/8 !tagged web")
+    assert all(isinstance(c, UnsupportedCriterion) for c in criteria)
+    assert [repr(c) for c in criteria] == ["localnetwork 10.0.0.0/8", "!tagged web"]
+    # Never matching, negated or not
+    assert not criteria[1](MatchContext("web"))
+    path = tmp_path / "config"
+    path.write_text(
+        "Match localnetwork 10.0.0.0/8\n    User office\n"
+        "Host web\n    User deploy\n"
+    )
+    config = SSHConfig(str(path))
+    assert config.resolve("web")["User"] == "deploy"
+    config.write()
+    assert path.read_text().startswith("Match localnetwork 10.0.0.0/8\n")
+
+
+def test_malformed_match(tmp_path):
+    path = tmp_path / "config"
+    for line in ("Match host", 'Match exec "foo'):
+        path.write_text(f"Host bastion\n    HostName 203.0.113.1\n  {line}\n    Port 22\n")
+        with pytest.raises(ConfigSyntaxError) as info:
+            SSHConfig(str(path))
+        assert (info.value.path, info.value.line, info.value.column) == (str(path), 3, 3)
+
+
+def test_parse_match(config, tmp_path):
+    block = config.hosts[1]
+    assert isinstance(block, Match)
+    assert block.name == "originalhost *.corp,!db.corp user deploy"
+    config.write()
+    assert "Match originalhost *.corp,!db.corp user deploy\n" in (tmp_path / "config").read_text()
+
+
+def test_resolve(config):
+    assert config.resolve("web.corp", user="deploy") == {
+        "User": "default",
+        "Port": 2222,
+        "HostName": "10.0.0.1",
+        "ForwardAgent": "yes",
+        "ServerAliveInterval": 30,
+    }
+    assert config.resolve("db.corp", user="deploy")["Port"] == 22
+    assert config.resolve("bastion") == {
+        "User": "default",
+        "HostName": "203.0.113.1",
+        "ServerAliveInterval": 30,
+    }
+
+
+def test_exec_cache(tmp_path):
+    counter = tmp_path / "counter"
+    cache = ExecCache(ttl=60)
+    criterion = ExecCriterion(f"echo %h >> {counter}", cache=cache)
+    context = MatchContext("web.corp")
+    assert criterion(context)
+    assert criterion(context)
+    assert counter.read_text() == "web.corp\n"
+    assert not ExecCriterion("exit 1", negate=False, cache=cache)(context)
+    cache.ttl = 0
+    cache.clear()
+    criterion(context)
+    criterion(context)
+    assert counter.read_text() == "web.corp\n" * 3
@@ -0,0 +1,60 @@
+"""Multiple keyword Unit Testing
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, Host
+from ssh_config.client import parse_config
+
+config_data = """IdentityFile ~/.ssh/id_default
+Host web
+    IdentityFile ~/.ssh/id_web
+    identityfile ~/.ssh/id_web_old
+    LocalForward 8080 localhost:80
+    User web
+Host *
+    IdentityFile ~/.ssh/id_web
+    LocalForward 5432 db:5432
+    User nobody
+"""
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "config"
+    path.write_text(config_data)
+    return SSHConfig(str(path))
+
+
+def test_parse():
+    hosts, global_options = parse_config(config_data)
+    assert hosts[0]["attrs"]["IdentityFile"] == ["~/.ssh/id_web", "~/.ssh/id_web_old"]
+    assert hosts[1]["attrs"]["IdentityFile"] == "~/.ssh/id_web"
+
+
+def test_host(config):
+    host = config.get("web")
+    assert host.IdentityFile == ["~/.ssh/id_web", "~/.ssh/id_web_old"]
+    assert host.get_all("LocalForward") == ["8080 localhost:80"]
+    host.append("LocalForward", "8443 localhost:443")
+    assert host.LocalForward == ["8080 localhost:80", "8443 localhost:443"]
+    assert str(host).count("LocalForward") == 2
+    assert Host("new", {}).get_all("IdentityFile") == []
+
+
+def test_resolve(config):
+    assert config.resolve("web") == {
+        "User": "web",
+        "IdentityFile": ["~/.ssh/id_default", "~/.ssh/id_web", "~/.ssh/id_web_old"],
+        "LocalForward": ["8080 localhost:80", "5432 db:5432"],
+    }
+
+
+def test_write(config):
+    config.write()
+    written = SSHConfig(config.config_path)
+    assert written.get("web").IdentityFile == ["~/.ssh/id_web", "~/.ssh/id_web_old"]
+    assert written.get("web").fingerprint == config.get("web").fingerprint
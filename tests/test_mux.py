@@ -0,0 +1,111 @@
+"""ControlMaster manager Unit Testing
+"""
+import os
+import stat
+import sys
+
+import paramiko
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli
+from ssh_config.mux import MuxManager
+
+config_data = """Host web1 web2
+    HostName %h.example.com
+    ControlMaster auto
+    ControlPath {tmp}/cm-%n
+    ControlPersist 10m
+Host db1
+    HostName 10.0.0.1
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config"
+    path.write_text(config_data.format(tmp=tmp_path))
+    return str(path)
+
+
+@pytest.fixture
+def fake_ssh(tmp_path):
+    """ssh answering -O check/exit with success"""
+    path = tmp_path / "ssh"
+    path.write_text("#!/bin/sh\necho \"$@\" >> %s/ssh.log\n" % tmp_path)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def test_status(config_path, fake_ssh, tmp_path):
+    manager = MuxManager(SSHConfig(config_path), ssh=fake_ssh)
+    assert manager.socket("db1") is None
+    assert manager.persist("web1") == 600
+    (tmp_path / "cm-web1").write_text("")
+    assert manager.status(["web1", "web2", "db1"]) == [
+        ("web1", f"{tmp_path}/cm-web1", True),
+        ("web2", f"{tmp_path}/cm-web2", False),
+    ]
+    assert manager.stop("web1")
+    assert not manager.stop("web2")
+    assert (tmp_path / "ssh.log").read_text().splitlines()[-1].endswith("-O exit web1")
+    assert manager.command("web2") == [fake_ssh, "-F", config_path, "web2"]
+    assert manager.command("db1") is None
+
+
+def test_status_command(config_path):
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['-f', config_path, 'mux', 'status', 'web*'])
+    assert result.exit_code == 0
+    assert result.output.split() == [
+        "web1", "stopped", f"{os.path.dirname(config_path)}/cm-web1",
+        "web2", "stopped", f"{os.path.dirname(config_path)}/cm-web2",
+    ]
+
+
+class FakeTransport:
+    def is_active(self):
+        return True
+
+
+class FakeClient:
+    connections = 0
+
+    def set_missing_host_key_policy(self, policy):
+        pass
+
+    def connect(self, hostname, **kwargs):
+        FakeClient.connections += 1
+
+    def get_transport(self):
+        return FakeTransport()
+
+    def close(self):
+        pass
+
+
+def test_client_pool(config_path, monkeypatch):
+    monkeypatch.setattr(paramiko, "SSHClient", FakeClient)
+    manager = MuxManager(SSHConfig(config_path))
+    client = manager.client("web1")
+    assert manager.client("web1") is client
+    assert manager.client("db1") is not manager.client("db1")
+    assert FakeClient.connections == 3
+    manager.close()
+
+
+def test_ssh_command_uses_pool(config_path, monkeypatch):
+    connected = []
+
+    def client(self, name, password=None):
+        connected.append((name, password))
+        raise paramiko.SSHException("refused")
+
+    monkeypatch.setattr(MuxManager, "client", client)
+    monkeypatch.setattr(cli.getpass, "getpass", lambda prompt: "secret")
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['-f', config_path, 'ssh', 'db1'])
+    assert result.exit_code == 0
+    assert "Failed to connect to ssh, refused" in result.output
+    assert connected == [("db1", "secret")]
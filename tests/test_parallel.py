@@ -0,0 +1,82 @@
+"""Parallel parsing of Include trees Unit Testing
+"""
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig
+from ssh_config import client
+from ssh_config.client import read_config_tree
+from ssh_config.errors import ConfigSyntaxError
+
+
+def make_tree(tmp_path, fragments=80):
+    """config including conf.d/*, every fragment including a nested one"""
+    os.mkdir(tmp_path / "conf.d")
+    os.mkdir(tmp_path / "nested")
+    for i in range(fragments):
+        (tmp_path / "conf.d" / f"{i:03}").write_text(
+            f"Include nested/{i:03}\n"
+            f"Host web{i}\n    HostName 10.0.0.{i}\n"
+            f"Host *.corp\n    User user{i}\n"
+        )
+        (tmp_path / "nested" / f"{i:03}").write_text(
+            f"Host db{i}\n    HostName 10.0.1.{i}\n    Port {2200 + i}\n"
+        )
+    config_path = tmp_path / "config"
+    config_path.write_text(
+        "Include conf.d/*\nHost server1\n    HostName 203.0.113.76\n    Include nested/000\n"
+    )
+    return str(config_path)
+
+
+def summary(hosts):
+    return [(host["host"], host["path"], host["attrs"]) for host in hosts]
+
+
+def test_same_as_serial(tmp_path):
+    config_path = make_tree(tmp_path)
+    serial = read_config_tree(config_path)
+    parallel = read_config_tree(config_path, workers=2)
+    assert summary(parallel[0]) == summary(serial[0])
+    assert parallel[1] == serial[1]
+    assert list(parallel[2]) == list(serial[2])
+
+
+def test_first_match(tmp_path):
+    config = SSHConfig(make_tree(tmp_path), workers=2)
+    assert config.resolve("a.corp")["User"] == "user0"
+    assert config.resolve("db5")["Port"] == 2205
+    assert [host.name for host in config][:3] == ["db0", "web0", "*.corp"]
+
+
+def test_small_tree_is_serial(tmp_path):
+    config_path = make_tree(tmp_path, fragments=3)
+    with mock.patch("concurrent.futures.ProcessPoolExecutor") as executor:
+        hosts, _, _ = read_config_tree(config_path, workers=2)
+    executor.assert_not_called()
+    assert len(hosts) == 3 * 3 + 2
+
+
+def test_reload_parses_changed_files(tmp_path):
+    config_path = make_tree(tmp_path)
+    config = SSHConfig(config_path, workers=2)
+    (tmp_path / "nested" / "010").write_text("Host db10\n    Port 22\n")
+    with mock.patch.object(client, "_parse_file", wraps=client._parse_file) as parse:
+        changes = config.reload_if_changed()
+    assert [new.name for _, new in changes.changed] == ["db10"]
+    assert [call.args[0] for call in parse.call_args_list] == [
+        str(tmp_path / "nested" / "010")
+    ]
+
+
+def test_syntax_error_in_worker(tmp_path):
+    config_path = make_tree(tmp_path)
+    (tmp_path / "conf.d" / "050").write_text("Host web50\n    HostName\n")
+    with pytest.raises(ConfigSyntaxError) as error:
+        read_config_tree(config_path, workers=2)
+    assert error.value.path == str(tmp_path / "conf.d" / "050")
+    assert error.value.line == 2
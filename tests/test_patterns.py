@@ -0,0 +1,98 @@
+"""Patterns Unit Testing
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli
+from ssh_config.client import Host
+from ssh_config.match import match_patterns
+from ssh_config.patterns import (
+    PATTERN_CACHE_SIZE, _compile, compile_patterns, select_hosts, split_patterns,
+)
+
+sample = os.path.join(os.path.dirname(__file__), "sample")
+
+
+def test_wildcards():
+    pattern_set = compile_patterns("web?.*")
+    assert pattern_set.matches("web1.corp")
+    assert not pattern_set.matches("web12.corp")
+    assert not pattern_set.matches("xweb1.corp")
+    assert compile_patterns("*").matches("")
+
+
+def test_negation():
+    pattern_set = compile_patterns("*.corp,!db*.corp")
+    assert pattern_set.matches("web.corp")
+    assert not pattern_set.matches("db1.corp")
+    assert not pattern_set.matches("web.example")
+    # Only negated patterns never match, like ssh
+    assert not compile_patterns("!db*").matches("web")
+
+
+def test_literal_characters():
+    pattern_set = compile_patterns("[host]:22*")
+    assert pattern_set.matches("[host]:2222")
+    assert not pattern_set.matches("h")
+    assert compile_patterns("a.b").matches("a.b")
+    assert not compile_patterns("a.b").matches("axb")
+
+
+def test_ignore_case():
+    assert not compile_patterns("Web*").matches("web1")
+    assert compile_patterns("Web*", ignore_case=True).matches("web1")
+
+
+def test_split_and_cache():
+    assert split_patterns("a*, !ab*  c") == ("a*", "!ab*", "c")
+    assert split_patterns(["a*", "!ab*"]) == ("a*", "!ab*")
+    assert compile_patterns("a*,!ab*") is compile_patterns(["a*", "!ab*"])
+
+
+def test_match_patterns():
+    assert match_patterns(["*.corp", "!db.corp"], "web.corp")
+    assert not match_patterns(["*.corp", "!db.corp"], "db.corp")
+
+
+def test_select_hosts():
+    hosts = [Host("web1 web1.corp", {}), Host("db1", {}), Host("web-old", {})]
+    assert [host.name for host in select_hosts(hosts, "web*,!web-old")] == ["web1 web1.corp"]
+    assert compile_patterns("*.corp").matches_any(["db1", "web1.corp"])
+    assert compile_patterns("db*").filter(["db1", "web1", "db2"]) == ["db1", "db2"]
+
+
+def test_literal_names():
+    pattern_set = compile_patterns("web1 web1.corp")
+    assert pattern_set.literals == {"web1", "web1.corp"}
+    assert pattern_set.matches("web1.corp")
+    assert not pattern_set.matches("web")
+    assert pattern_set.matches_any(["db1", "web1"])
+    assert pattern_set.filter(["web1", "db1"]) == ["web1"]
+    assert compile_patterns("web*").literals is None
+
+
+def test_resolve_many_blocks(tmp_path):
+    count = PATTERN_CACHE_SIZE * 2
+    path = tmp_path / "config"
+    path.write_text("".join(f"Host h{i} h{i}.corp\n    Port {i + 1}\n" for i in range(count))
+                    + "Host h*\n    User admin\n")
+    config = SSHConfig(str(path))
+    frozen = config.freeze()
+    assert config.resolve(f"h{count - 1}")["Port"] == count
+    assert frozen.resolve(f"h{count - 1}")
+    # The blocks keep their compiled patterns, resolving compiles nothing
+    misses = _compile.cache_info().misses
+    for _ in range(3):
+        assert config.resolve(f"h{count - 1}.corp") == {"Port": count, "User": "admin"}
+        assert frozen.resolve(f"h{count - 2}")
+    assert _compile.cache_info().misses == misses
+
+
+def test_host_names_consistent():
+    config = SSHConfig(sample)
+    names = cli.host_names(config, "server*,!server2")
+    assert "server1" in names
+    assert "server2" not in names
+    selected = [host.name for host in select_hosts(config, "server*,!server2")]
+    assert all(name in " ".join(selected) for name in names)
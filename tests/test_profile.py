@@ -0,0 +1,106 @@
+"""Profiling Unit Testing
+"""
+import inspect
+import os
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli, profile
+from ssh_config.profile import Hook, stats
+
+sample = os.path.join(os.path.dirname(__file__), "sample")
+
+
+class RecordingHook(Hook):
+    def __init__(self):
+        self.counts = {}
+        self.timings = []
+
+    def count(self, name, value):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def timing(self, name, seconds):
+        self.timings.append(name)
+
+
+@pytest.fixture
+def enabled():
+    stats.reset()
+    profile.enable()
+    yield stats
+    profile.disable()
+    stats.reset()
+
+
+def test_disabled_collects_nothing():
+    stats.reset()
+    config = SSHConfig(sample)
+    config.resolve("server1")
+    assert stats.timer("parse") is profile.NULL_TIMER
+    assert SSHConfig.stats()["counters"] == {}
+    assert SSHConfig.stats()["timers"] == {}
+
+
+def test_stats(enabled, tmp_path):
+    config = SSHConfig(sample)
+    config.get("server1")
+    config.resolve("server1", expand=True)
+    config.write(str(tmp_path / "config"))
+    result = config.stats(reset=True)
+    counters = result["counters"]
+    assert counters["lines_parsed"] == 22
+    assert counters["files_parsed"] == 1
+    assert counters["file_cache_misses"] == 1
+    assert counters["hosts_built"] == 6
+    assert counters["lookups"] == 1
+    assert counters["keyword_conversions"] > 0
+    assert counters["bytes_written"] == os.path.getsize(tmp_path / "config")
+    assert set(result["timers"]) == {"read", "parse", "resolve", "write"}
+    assert result["timers"]["resolve"]["calls"] == 1
+    assert "templates" in result["caches"]
+    assert SSHConfig.stats()["counters"] == {}
+
+
+def test_reload_cache_hits(enabled, tmp_path):
+    os.mkdir(tmp_path / "conf.d")
+    (tmp_path / "conf.d" / "web").write_text("Host web1\n    HostName 10.0.0.1\n")
+    config_path = tmp_path / "config"
+    config_path.write_text("Include conf.d/*\nHost server1\n    Port 22\n")
+    config = SSHConfig(str(config_path))
+    config_path.write_text("Include conf.d/*\nHost server1\n    Port 2222\n")
+    stats.reset()
+    config.reload_if_changed()
+    counters = stats.snapshot()["counters"]
+    assert counters["file_cache_hits"] == 1
+    assert counters["file_cache_misses"] == 1
+
+
+def test_hook(enabled):
+    hook = RecordingHook()
+    stats.add_hook(hook)
+    try:
+        SSHConfig(sample).resolve("server1")
+    finally:
+        stats.remove_hook(hook)
+    assert hook.counts["hosts_built"] == 6
+    assert "resolve" in hook.timings
+
+
+def test_cli_profile():
+    # click < 8.2 mixes stderr into stdout unless asked not to
+    if "mix_stderr" in inspect.signature(CliRunner).parameters:
+        runner = CliRunner(mix_stderr=False)
+    else:
+        runner = CliRunner()
+    try:
+        result = runner.invoke(cli.cli, ["-f", sample, "--profile", "ls"])
+    finally:
+        profile.disable()
+        stats.reset()
+    assert result.exit_code == 0
+    assert "Timers:" in result.stderr
+    assert "hosts_built" in result.stderr
+    assert "Timers:" not in result.stdout
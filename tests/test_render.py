@@ -0,0 +1,96 @@
+"""Render Unit Testing
+"""
+import json
+import os
+import sys
+
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli
+from ssh_config.render import BlockTemplate, load_records, render_file
+
+template = """Host {{ name }}
+    HostName {{ ip }}
+{% if jump %}
+    ProxyJump {{ jump }}
+{% endif %}
+"""
+
+
+def make_data(tmp_path, count=3):
+    data_path = tmp_path / "hosts.jsonl"
+    with open(data_path, "w") as f:
+        for i in range(count):
+            record = {"name": f"web{i}", "ip": f"10.0.0.{i}", "jump": "bastion" if i else ""}
+            f.write(json.dumps(record) + "\n")
+    template_path = tmp_path / "host.j2"
+    template_path.write_text(template)
+    return str(template_path), str(data_path)
+
+
+def test_load_records(tmp_path):
+    csv_path = tmp_path / "hosts.csv"
+    csv_path.write_text("name,ip\nweb0,10.0.0.0\nweb1,10.0.0.1\n")
+    assert list(load_records(str(csv_path))) == [
+        {"name": "web0", "ip": "10.0.0.0"}, {"name": "web1", "ip": "10.0.0.1"}
+    ]
+    _, data_path = make_data(tmp_path, 2)
+    assert [record["name"] for record in load_records(data_path)] == ["web0", "web1"]
+
+
+def test_render(tmp_path):
+    template_path, data_path = make_data(tmp_path)
+    output = str(tmp_path / "config")
+    count = render_file(BlockTemplate.from_file(template_path), load_records(data_path), output)
+    assert count == 3
+    config = SSHConfig(output)
+    assert [host.name for host in config] == ["web0", "web1", "web2"]
+    assert config.get("web0").ProxyJump is None
+    assert config.get("web2").ProxyJump == "bastion"
+
+
+def test_python_template(tmp_path):
+    _, data_path = make_data(tmp_path, 2)
+    block = BlockTemplate("Host {name}\n    HostName {ip}", "python")
+    output = str(tmp_path / "config")
+    render_file(block, load_records(data_path), output)
+    with open(output) as f:
+        assert f.read() == (
+            "Host web0\n    HostName 10.0.0.0\nHost web1\n    HostName 10.0.0.1\n"
+        )
+
+
+def test_merge(tmp_path):
+    template_path, data_path = make_data(tmp_path, 2)
+    output = tmp_path / "config"
+    output.write_text(
+        "Include conf.d/*\nHost web1\n    HostName old\nHost db\n    HostName 10.0.1.1\n"
+        "Host *\n    User admin\n"
+    )
+    os.chmod(output, 0o600)
+    render_file(
+        BlockTemplate.from_file(template_path), load_records(data_path), str(output),
+        merge=str(output),
+    )
+    assert output.read_text() == (
+        "Include conf.d/*\n"
+        "Host web0\n    HostName 10.0.0.0\n"
+        "Host web1\n    HostName 10.0.0.1\n    ProxyJump bastion\n"
+        "Host db\n    HostName 10.0.1.1\n"
+        "Host *\n    User admin\n"
+    )
+    assert os.stat(output).st_mode & 0o777 == 0o600
+
+
+def test_cli_render(tmp_path):
+    template_path, data_path = make_data(tmp_path, 2)
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["render", template_path, data_path])
+    assert result.exit_code == 0
+    assert result.stdout.startswith("Host web0\n    HostName 10.0.0.0\nHost web1\n")
+
+    (tmp_path / "bad.jsonl").write_text("[1, 2]\n")
+    result = runner.invoke(cli.cli, ["render", template_path, str(tmp_path / "bad.jsonl")])
+    assert result.exit_code == 1
+    assert "Expected a JSON object" in result.output
@@ -0,0 +1,74 @@
+"""Jump host route Unit Testing
+"""
+import json
+import os
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli
+from ssh_config.errors import RouteCycleError, RouteDepthError
+from ssh_config.route import RouteGraph, parse_jump, proxy_command_host
+
+config_data = """Host bastion-eu
+    HostName 203.0.113.1
+Host inner
+    ProxyJump admin@bastion-eu:2222
+Host legacy
+    ProxyCommand ssh -q -A -p 22 inner -W %h:%p
+Host direct.corp
+    ProxyJump none
+Host *.corp
+    ProxyJump bastion-eu,inner
+Host db1.corp
+    ProxyJump legacy
+Host loop1
+    ProxyJump loop2
+Host loop2
+    ProxyJump loop1
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config"
+    path.write_text(config_data)
+    return str(path)
+
+
+def test_parse_jump():
+    assert parse_jump("bastion") == "bastion"
+    assert parse_jump("user@bastion:2222") == "bastion"
+    assert parse_jump("ssh://user@[2001:db8::1]:22") == "2001:db8::1"
+    assert proxy_command_host("ssh -q -A bastion -W %h:%p") == "bastion"
+    assert proxy_command_host("ProxyCommand ssh -o User=x -q bastion nc %h %p") == "bastion"
+    assert proxy_command_host("nc -X 5 -x proxy:1080 %h %p") is None
+
+
+def test_route(config_path):
+    graph = RouteGraph(SSHConfig(config_path).hosts)
+    assert graph.route("bastion-eu") == ("bastion-eu",)
+    assert graph.route("legacy") == ("bastion-eu", "inner", "legacy")
+    assert graph.route("web1.corp") == ("bastion-eu", "inner", "web1.corp")
+    assert graph.route("direct.corp") == ("direct.corp",)
+    # The earlier pattern wins over the later exact block
+    assert graph.route("db1.corp") == ("bastion-eu", "inner", "db1.corp")
+    with pytest.raises(RouteCycleError):
+        graph.route("loop1")
+    assert graph.cycles() == [("loop1", "loop2", "loop1")]
+    with pytest.raises(RouteDepthError):
+        RouteGraph(SSHConfig(config_path).hosts, max_depth=1).route("legacy")
+
+
+def test_routes_command(config_path):
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['-f', config_path, 'route', 'legacy'])
+    assert result.exit_code == 0
+    assert result.output == "bastion-eu -> inner -> legacy\n"
+    result = runner.invoke(cli.cli, ['-f', config_path, 'routes', '--format', 'json'])
+    assert result.exit_code == 1
+    output = json.loads(result.output)
+    assert output["routes"]["inner"] == ["bastion-eu", "inner"]
+    assert sorted(output["errors"]) == ["loop1", "loop2"]
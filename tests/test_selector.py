@@ -0,0 +1,173 @@
+"""Selector Unit Testing
+"""
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli, profile
+from ssh_config.client import Host
+from ssh_config.errors import SelectorError
+from ssh_config.profile import stats
+from ssh_config.selector import compile_selector, tokenize
+
+sample = os.path.join(os.path.dirname(__file__), "sample")
+
+config_data = """\
+Host bastion-eu
+    HostName 198.51.100.1
+Host db-1
+    HostName 10.0.0.1
+    User postgres
+    ProxyJump bastion-eu
+Host db-2
+    HostName 10.0.0.2
+    User postgres
+    Port 5022
+Host db-3
+    HostName 10.0.0.3
+    User admin
+    Port 2222
+Host web-1 web-1.corp
+    HostName 10.0.1.1
+    User deploy
+Match host *.corp
+    User admin
+"""
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "config"
+    path.write_text(config_data)
+    return SSHConfig(str(path))
+
+
+def names(hosts):
+    return [host.name for host in hosts]
+
+
+def test_terms(config):
+    assert names(config.select("db-*")) == ["db-1", "db-2", "db-3"]
+    assert names(config.select("name=db-*,!db-2")) == ["db-1", "db-3"]
+    assert names(config.select("User=postgres")) == ["db-1", "db-2"]
+    assert names(config.select("user=admin")) == ["db-3", "host *.corp"]
+    assert names(config.select("web-1.corp")) == ["web-1 web-1.corp"]
+
+
+def test_request_example(config):
+    selected = config.select("db-* User=postgres not ProxyJump=bastion-eu Port != 22")
+    assert names(selected) == ["db-2"]
+
+
+def test_boolean_operators(config):
+    assert names(config.select("db-1 or web-*")) == ["db-1", "web-1 web-1.corp"]
+    assert names(config.select("(db-1 or db-3) and Port=*")) == ["db-3"]
+    # Name terms only select Host blocks
+    assert names(config.select("not db-* not bastion-*")) == [
+        "web-1 web-1.corp", "host *.corp"
+    ]
+    assert names(config.select("name!=db-* HostName=10.*")) == ["web-1 web-1.corp"]
+
+
+def test_quoted_values():
+    assert tokenize('User="my user" and') == [
+        ("User", False), ("=", False), ("my user", True), ("and", False)
+    ]
+    selector = compile_selector('"and"')
+    assert selector.matches(Host("and", {}))
+
+
+def test_errors():
+    for text in ("(db-*", "db-* )", "User=", "Unknown=1", "not", "= x", 'User="x'):
+        with pytest.raises(SelectorError):
+            compile_selector(text)
+
+
+def test_plan_uses_index(config):
+    stats.reset()
+    profile.enable()
+    try:
+        assert names(config.select("User=postgres Port!=22")) == ["db-1", "db-2"]
+        assert stats.snapshot()["counters"]["selector_candidates"] == 2
+        stats.reset()
+        # A negated term alone cannot be looked up and tests every block
+        config.select("Port!=22")
+        assert stats.snapshot()["counters"]["selector_candidates"] == len(config.hosts)
+    finally:
+        profile.disable()
+        stats.reset()
+
+
+def test_index_follows_changes(config):
+    index = config.host_index()
+    assert config.host_index() is index
+    config.add(Host("db-4", {"User": "postgres"}))
+    assert config.host_index() is not index
+    assert names(config.select("User=postgres")) == ["db-1", "db-2", "db-4"]
+
+
+def test_select_sequence(config):
+    assert names(compile_selector("db-2").select(list(config.hosts))) == ["db-2"]
+
+
+def test_cli_ls():
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["-f", sample, "ls", "-s", "server* Port=2202"])
+    assert result.exit_code == 0
+    assert result.output.split() == ["server_cmd_1", "server_cmd_3"]
+    result = runner.invoke(cli.cli, ["-f", sample, "ls", "-s", "Port=("])
+    assert result.exit_code == 2
+
+
+def test_cli_update_remove(tmp_path):
+    path = str(tmp_path / "config")
+    shutil.copy(sample, path)
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["-f", path, "update", "-s", "User=user", "Port=2200"],
+                           input="y")
+    assert result.exit_code == 0
+    assert names(SSHConfig(path).select("Port=2200")) == [
+        "server_cmd_2", "server_cmd_3", "host_1 host_2"
+    ]
+    result = runner.invoke(cli.cli, ["-f", path, "remove", "-s", "Port=2200"], input="y")
+    assert result.exit_code == 0
+    assert names(SSHConfig(path).select("User=*")) == []
+
+
+def test_cli_exec_requires_select():
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["-f", sample, "exec", "uptime"])
+    assert result.exit_code == 2
+    assert "--select is required" in result.output
+
+
+def test_cli_ping_windows(monkeypatch):
+    commands = []
+
+    def run(args, **kwargs):
+        commands.append(args)
+        return subprocess.CompletedProcess(args, 0)
+
+    monkeypatch.setattr(cli.subprocess, "run", run)
+    monkeypatch.setattr(cli.platform, "system", lambda: "Windows")
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["-f", sample, "ping", "-s", "server_cmd_2", "-c", "3"])
+    assert result.exit_code == 0
+    assert commands == [["ping", "-n", "3", "203.0.113.76"]]
+
+
+def test_cli_export():
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["-f", sample, "export", "-s", "host_*", "--format", "csv",
+                                     "-c", "user,port"])
+    assert result.exit_code == 0
+    assert result.output == "Name,User,Port\nhost_1 host_2,user,2202\n"
+    result = runner.invoke(cli.cli, ["-f", sample, "export", "-s", "server_cmd_2"])
+    assert result.output == (
+        "server_cmd_2 ansible_host=203.0.113.76 ansible_port=22 ansible_user=user\n"
+    )
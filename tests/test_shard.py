@@ -0,0 +1,118 @@
+"""Shard and merge Unit Testing
+"""
+import os
+import sys
+
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig, cli
+from ssh_config.shard import merge_config, plan_shards, shard_config, shard_key
+
+config_data = """User admin
+Host web1.corp.example web2.corp.example
+    HostName 10.0.0.1
+Host db1.lab.example
+    HostName 10.0.1.1
+    Port 2222
+Host bastion
+    HostName 203.0.113.1
+Host *.lab.example
+    ProxyJump bastion
+    Port 22
+Host db2.lab.example
+    Port 2200
+Match user deploy
+    IdentityFile ~/.ssh/deploy
+Host api.corp.example
+    HostName 10.0.0.9
+Host *
+    ServerAliveInterval 30
+"""
+
+names = ["web1.corp.example", "db1.lab.example", "db2.lab.example", "api.corp.example",
+         "bastion", "other"]
+
+
+def make_config(tmp_path):
+    config_path = tmp_path / "config"
+    config_path.write_text(config_data)
+    return SSHConfig(str(config_path))
+
+
+def test_shard_key():
+    assert shard_key("web1.corp.example", "domain", 2) == ("corp.example", "*.corp.example")
+    assert shard_key("bastion", "domain", 2) == ("_rest", "*")
+    assert shard_key("web1", "prefix", 3) == ("web", "web*")
+    assert shard_key("web1", "hash", 4)[1] == "*"
+
+
+def test_plan_keeps_order_dependent_blocks(tmp_path):
+    shards, top = plan_shards(make_config(tmp_path).hosts, "domain", 2)
+    assert {key: [host.name for host in hosts] for key, (_, hosts) in shards.items()} == {
+        "corp.example": ["web1.corp.example web2.corp.example"],
+        "lab.example": ["db1.lab.example"],
+        "_rest": ["bastion"],
+    }
+    # db2 follows *.lab.example, api follows a Match block
+    assert [host.name for host in top] == [
+        "*.lab.example", "db2.lab.example", "user deploy", "api.corp.example", "*"
+    ]
+
+
+def test_shard_resolves_the_same(tmp_path):
+    config = make_config(tmp_path)
+    for by, size in (("domain", 2), ("prefix", 2), ("hash", 3)):
+        top_path, paths = shard_config(config, str(tmp_path / by), by, size)
+        sharded = SSHConfig(top_path)
+        for name in names:
+            for user in (None, "deploy"):
+                expected = config.resolve(name, user)
+                options = sharded.resolve(name, user)
+                options.pop("Include", None)
+                assert options == expected, (by, name, user)
+        for path in paths.values():
+            assert os.path.dirname(path) == str(tmp_path / by / "shards")
+
+
+def test_shard_host_include(tmp_path):
+    os.mkdir(tmp_path / "n")
+    (tmp_path / "n" / "a").write_text("Host db1.x.com\n    HostName 10.0.0.6\n")
+    config_path = tmp_path / "config"
+    config_path.write_text("Host web1.x.com\n    HostName 10.0.0.5\n    Include n/a\n")
+    config = SSHConfig(str(config_path))
+    top_path, paths = shard_config(config, str(tmp_path / "out"), "domain", 2)
+    with open(paths["x.com"]) as f:
+        shard = f.read()
+    assert "Include" not in shard
+    assert shard.count("Host db1.x.com") == 1
+    sharded = SSHConfig(top_path)
+    for name in ("web1.x.com", "db1.x.com"):
+        options, expected = sharded.resolve(name), config.resolve(name)
+        options.pop("Include", None)
+        expected.pop("Include", None)
+        assert options == expected
+
+
+def test_merge_round_trip(tmp_path):
+    config = make_config(tmp_path)
+    top_path, _ = shard_config(config, str(tmp_path / "out"), "domain", 2)
+    merged_path = tmp_path / "merged"
+    merged_path.write_text(merge_config(SSHConfig(top_path)))
+    merged = SSHConfig(str(merged_path))
+    assert "Include" not in merged_path.read_text()
+    for name in names:
+        assert merged.resolve(name) == config.resolve(name)
+
+
+def test_cli(tmp_path):
+    config_path = str(make_config(tmp_path).config_path)
+    runner = CliRunner()
+    output = str(tmp_path / "out")
+    result = runner.invoke(cli.cli, ["-f", config_path, "shard", "--by", "prefix", "3",
+                                     "-o", output])
+    assert result.exit_code == 0
+    assert "including 3 fragments" in result.output
+    result = runner.invoke(cli.cli, ["-f", os.path.join(output, "config"), "merge"])
+    assert result.exit_code == 0
+    assert result.output.startswith("User admin\nHost ")
@@ -0,0 +1,112 @@
+"""Shared config snapshot Unit Testing
+"""
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig
+from ssh_config.keywords import Keywords
+from ssh_config.shared import SharedConfig
+
+sample = os.path.join(os.path.dirname(__file__), "sample")
+
+config_data = """User admin
+Host web1 web2
+    HostName %h.corp
+    IdentityFile ~/.ssh/id_web
+    IdentityFile ~/.ssh/id_web_old
+    ForwardAgent yes
+Match user deploy
+    Port 2222
+Host *
+    ServerAliveInterval 60
+"""
+
+
+def make_snapshot(tmp_path, data=config_data):
+    config_path = tmp_path / "config"
+    config_path.write_text(data)
+    config = SSHConfig(str(config_path))
+    snapshot_path = str(tmp_path / "config.snapshot")
+    config.write_snapshot(snapshot_path)
+    return config, snapshot_path
+
+
+def test_hosts(tmp_path):
+    config, snapshot_path = make_snapshot(tmp_path)
+    with SharedConfig(snapshot_path) as shared:
+        assert [host.name for host in shared] == [host.name for host in config]
+        assert shared.global_options == {"User": "admin"}
+        web = shared.get("web1 web2")
+        assert web.keyword == "Host"
+        assert web.HostName == "%h.corp"
+        assert web.ForwardAgent == "yes"
+        assert web.get_all("IdentityFile") == ["~/.ssh/id_web", "~/.ssh/id_web_old"]
+        assert web.Port is None
+        assert web.attributes() == config.get("web1 web2").attributes()
+        assert shared.get("*").ServerAliveInterval == 60
+        with pytest.raises(NameError):
+            shared.get("web1")
+        with pytest.raises(AttributeError):
+            web.NoSuchKeyword
+
+
+def test_converted_once(tmp_path, monkeypatch):
+    _, snapshot_path = make_snapshot(tmp_path)
+    calls = []
+    convert_block = Keywords.convert_block
+
+    def counting(raw_attrs, *args, **kwargs):
+        calls.append(raw_attrs)
+        return convert_block(raw_attrs, *args, **kwargs)
+
+    monkeypatch.setattr(Keywords, "convert_block", counting)
+    with SharedConfig(snapshot_path) as shared:
+        web = shared.get("web1 web2")
+        assert (web.HostName, web.ForwardAgent, web.Port) == ("%h.corp", "yes", None)
+        web.attributes()["IdentityFile"].append("changed")
+        assert web.get_all("IdentityFile") == ["~/.ssh/id_web", "~/.ssh/id_web_old"]
+    assert len(calls) == 1
+
+
+def test_resolve(tmp_path):
+    config, snapshot_path = make_snapshot(tmp_path)
+    with SharedConfig(snapshot_path) as shared:
+        for name, user in (("web1", None), ("web2", "deploy"), ("other", None)):
+            assert shared.resolve(name, user) == config.resolve(name, user)
+
+
+def test_lookup_many_hosts(tmp_path):
+    data = "".join(f"Host server{i}\n    Port {i + 1}\n" for i in range(500))
+    _, snapshot_path = make_snapshot(tmp_path, data)
+    with SharedConfig(snapshot_path) as shared:
+        assert len(shared) == 500
+        for i in range(500):
+            assert shared[f"server{i}"].Port == i + 1
+
+
+def test_changed(tmp_path):
+    _, snapshot_path = make_snapshot(tmp_path)
+    with SharedConfig(snapshot_path) as shared:
+        assert not shared.changed()
+        (tmp_path / "config").write_text(config_data + "Host new\n    Port 22\n")
+        assert shared.changed()
+
+
+def test_not_a_snapshot():
+    with pytest.raises(ValueError):
+        SharedConfig(sample)
+
+
+def read_hostname(snapshot_path):
+    with SharedConfig(snapshot_path) as shared:
+        return shared.resolve("web1", expand=True)["HostName"]
+
+
+def test_worker_processes(tmp_path):
+    _, snapshot_path = make_snapshot(tmp_path)
+    with multiprocessing.Pool(2) as pool:
+        assert pool.map(read_hostname, [snapshot_path] * 4) == ["web1.corp"] * 4
@@ -0,0 +1,59 @@
+"""Token expansion Unit Testing
+"""
+import hashlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig
+from ssh_config.tokens import TokenValues, compile_template, expand, expand_options
+
+config_data = """Host web
+    HostName %h.example.com
+    User deploy
+    Port 2202
+    ControlPath ~/.ssh/cm-%r@%h:%p
+    IdentityFile ${SSH_CONFIG_TEST_KEYS}/%n
+    ProxyCommand ssh -W %h:%p bastion
+    LocalCommand echo 100%%
+"""
+
+
+def test_compile_template():
+    template = compile_template("%r@%h:%p ${HOME} 100%%", env=True)
+    assert template.tokens == ("r", "h", "p")
+    assert template.env == ("HOME",)
+    assert compile_template("%r@%h:%p ${HOME} 100%%", env=True) is template
+    assert compile_template("${HOME}").segments == ((None, "${HOME}"),)
+    with pytest.raises(ValueError):
+        compile_template("trailing %")
+
+
+def test_expand():
+    values = TokenValues("web", hostname="%h.example.com", port=2202, user="deploy",
+                         local_user="me")
+    assert expand("%r@%h:%p %n %u %%", values) == "deploy@web.example.com:2202 web me %"
+    connection = f"{values['l']}web.example.com2202deploy"
+    assert expand("%C", values) == hashlib.sha1(connection.encode()).hexdigest()
+    with pytest.raises(ValueError):
+        expand("${SSH_CONFIG_TEST_UNDEFINED}", values, env=True)
+    # Tokens known only when connecting are left for ssh
+    assert expand("~/.ssh/%h-%T-%f %I %K %H %t", values) == (
+        "~/.ssh/web.example.com-%T-%f %I %K %H %t"
+    )
+
+
+def test_resolve_expand(tmp_path, monkeypatch):
+    monkeypatch.setenv("SSH_CONFIG_TEST_KEYS", "/keys")
+    path = tmp_path / "config"
+    path.write_text(config_data)
+    options = SSHConfig(str(path)).resolve("web", expand=True)
+    assert options["HostName"] == "web.example.com"
+    assert options["ControlPath"] == os.path.expanduser("~/.ssh/cm-deploy@web.example.com:2202")
+    assert options["IdentityFile"] == ["/keys/web"]
+    assert options["ProxyCommand"] == "ssh -W web.example.com:2202 bastion"
+    assert options["LocalCommand"] == "echo 100%"
+    assert SSHConfig(str(path)).get("web").expanded()["IdentityFile"] == "/keys/web"
+    assert expand_options({"IdentityFile": "none"}, "web") == {"IdentityFile": "none"}
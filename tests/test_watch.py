@@ -0,0 +1,130 @@
+"""SSHConfig reload and watch Unit Testing
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from ssh_config import SSHConfig
+
+
+def write(path, data):
+    with open(path, "w") as f:
+        f.write(data)
+
+
+def make_config(tmp_path):
+    os.mkdir(tmp_path / "conf.d")
+    write(tmp_path / "conf.d" / "web", "Host web1\n    HostName 10.0.0.1\n")
+    write(tmp_path / "conf.d" / "db", "Host db1\n    HostName 10.0.1.1\n")
+    config_path = str(tmp_path / "config")
+    write(config_path, "Include conf.d/*\nHost server1\n    HostName 203.0.113.76\n")
+    return config_path
+
+
+def test_read_include(tmp_path):
+    config = SSHConfig(make_config(tmp_path))
+    assert [host.name for host in config] == ["db1", "web1", "server1"]
+    assert config.get("web1").path == str(tmp_path / "conf.d" / "web")
+
+
+def test_write_keeps_included_hosts(tmp_path):
+    config_path = make_config(tmp_path)
+    config = SSHConfig(config_path)
+    web = tmp_path / "conf.d" / "web"
+    web_text = web.read_text()
+    config.write()
+    with open(config_path) as f:
+        data = f.read()
+    assert "web1" not in data
+    assert data.startswith("Include conf.d/*\n")
+    assert [host.name for host in SSHConfig(config_path)] == ["db1", "web1", "server1"]
+    # Unchanged Included files are not rewritten
+    assert web.read_text() == web_text
+
+
+def test_write_included_host_edit(tmp_path):
+    config_path = make_config(tmp_path)
+    config = SSHConfig(config_path)
+    config.update("web1", {"User": "deploy"})
+    config.remove("db1")
+    config.write()
+    assert (tmp_path / "conf.d" / "web").read_text() == (
+        "Host web1\n    HostName 10.0.0.1\n    User deploy\n"
+    )
+    assert (tmp_path / "conf.d" / "db").read_text() == ""
+    reloaded = SSHConfig(config_path)
+    assert [host.name for host in reloaded] == ["web1", "server1"]
+    assert reloaded.get("web1").User == "deploy"
+
+
+def test_write_global_options(tmp_path):
+    config_path = make_config(tmp_path)
+    config = SSHConfig(config_path)
+    config.global_options["User"] = "zz"
+    config.write()
+    with open(config_path) as f:
+        assert f.read().startswith("Include conf.d/*\nUser zz\n")
+    assert SSHConfig(config_path).global_options["User"] == "zz"
+
+
+def test_write_other_file(tmp_path):
+    config_path = make_config(tmp_path)
+    config = SSHConfig(config_path)
+    web = tmp_path / "conf.d" / "web"
+    web_text = web.read_text()
+    config.update("web1", {"User": "deploy"})
+    os.mkdir(tmp_path / "out")
+    copy_path = str(tmp_path / "out" / "copy")
+    config.write(copy_path)
+    assert web.read_text() == web_text
+    copy = SSHConfig(copy_path)
+    assert [host.name for host in copy] == ["db1", "web1", "server1"]
+    assert copy.get("web1").User == "deploy"
+    # Later writes go to the copy only
+    config.update("db1", {"User": "postgres"})
+    config.write()
+    assert (tmp_path / "conf.d" / "db").read_text() == "Host db1\n    HostName 10.0.1.1\n"
+    assert SSHConfig(copy_path).get("db1").User == "postgres"
+
+
+def test_reload_if_changed(tmp_path):
+    config = SSHConfig(make_config(tmp_path))
+    assert config.reload_if_changed() is None
+
+    server1 = config.get("server1")
+    db1 = config.get("db1")
+    write(tmp_path / "conf.d" / "web", "Host web1\n    HostName 10.0.0.2\nHost web2\n")
+    write(tmp_path / "conf.d" / "cache", "Host cache1\n")
+    os.remove(tmp_path / "conf.d" / "db")
+
+    changes = config.reload_if_changed()
+    assert [host.name for host in changes.added] == ["cache1", "web2"]
+    assert [host.name for host in changes.removed] == ["db1"]
+    assert [(old.HostName, new.HostName) for old, new in changes.changed] == [
+        ("10.0.0.1", "10.0.0.2")
+    ]
+    # Hosts of unchanged files are not parsed again
+    assert config.get("server1") is server1
+    assert db1 not in config.hosts
+    assert config.reload_if_changed() is None
+
+
+def test_watch(tmp_path):
+    config_path = make_config(tmp_path)
+    config = SSHConfig(config_path)
+    received = []
+    reloaded = threading.Event()
+
+    def callback(changes):
+        received.append(changes)
+        reloaded.set()
+
+    watcher = config.watch(callback, interval=0.01)
+    try:
+        write(config_path, "Include conf.d/*\nHost server1\n    HostName 203.0.113.77\n")
+        assert reloaded.wait(5)
+    finally:
+        watcher.stop()
+    assert not watcher.is_alive()
+    assert received[0].changed[0][1].HostName == "203.0.113.77"